@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Archive terminal visa applications out of the VisaApplications table.
+
+Usage:
+    python3 scripts/archive_applications.py [--older-than-days N] [--dry-run] [--table NAME] [--page-size N]
+
+Moves applications that are completed, rejected or rolled back and have not
+been updated for N days (default 90) to the archive table. They stay
+readable by application number; updating one restores it. Schedule it
+nightly to keep the hot table, its scans and the pipeline counters small.
+"""
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from dotenv import load_dotenv
+from util.table_functions import create_table_handler, use_local_tables
+from services.visa_application_service import ARCHIVE_AFTER_DAYS, MAX_BATCH_SIZE, VisaApplicationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive terminal visa applications")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help="Days since the last update before an application is archived")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the applications that would be archived")
+    parser.add_argument("--table", default="VisaApplications", help="Applications table")
+    parser.add_argument("--page-size", type=int, default=MAX_BATCH_SIZE, help="Applications archived per batch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    load_dotenv()
+    connection_string = os.getenv("AZURE_CONNECTION_STRING")
+    if not connection_string and not use_local_tables():
+        print("Error: AZURE_CONNECTION_STRING not found in environment variables")
+        sys.exit(1)
+
+    def report(stats):
+        print(f"\rScanned {stats['scanned']} - archived {stats['archived']} - failed {stats['failed']}", end="", flush=True)
+
+    service = VisaApplicationService(create_table_handler(connection_string), args.table)
+    stats = service.archive_applications(args.older_than_days, args.page_size, args.dry_run, report)
+    print()
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {stats['archived']} of {stats['scanned']} terminal applications not updated for "
+          f"{args.older_than_days} days ({stats['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Export visa applications to CSV, JSONL or Parquet.
+
+Usage:
+    python3 scripts/export_applications.py OUTPUT [--format csv|jsonl|parquet] [--compression NAME]
+                                           [--select COLUMNS] [--filter ODATA] [--table NAME] [--page-size N]
+                                           [--include-archived]
+
+OUTPUT is a file path or '-' for stdout. The format defaults to the file
+extension (e.g. applications.jsonl.gz). Rows are streamed page by page, so
+the export runs in constant memory.
+"""
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from dotenv import load_dotenv
+from util.table_functions import create_table_handler, use_local_tables
+from util.export_functions import EXPORT_COMPRESSIONS, EXPORT_FORMATS
+from services.visa_application_service import VisaApplicationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export visa applications")
+    parser.add_argument("output", help="Output file, or - for stdout")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Export format (default: from the file extension, else csv)")
+    parser.add_argument("--compression", help="gzip or none for csv/jsonl; snappy, zstd, gzip or none for parquet")
+    parser.add_argument("--select", help="Projection name or comma-separated properties (default: all columns)")
+    parser.add_argument("--filter", help="OData filter query")
+    parser.add_argument("--table", default="VisaApplications", help="Applications table")
+    parser.add_argument("--page-size", type=int, default=1000, help="Applications fetched per page")
+    parser.add_argument("--include-archived", action="store_true", help="Also export archived applications")
+    args = parser.parse_args()
+
+    suffixes = Path(args.output).suffixes
+    export_format = args.format or next((suffix[1:] for suffix in suffixes if suffix[1:] in EXPORT_FORMATS), 'csv')
+    compression = args.compression or (
+        'snappy' if export_format == 'parquet' else 'gzip' if suffixes[-1:] == ['.gz'] else 'none'
+    )
+    if compression not in EXPORT_COMPRESSIONS[export_format]:
+        parser.error(f"--compression must be one of {', '.join(EXPORT_COMPRESSIONS[export_format])} for {export_format}")
+    select = args.select
+    if select and ',' in select:
+        select = [column.strip() for column in select.split(',') if column.strip()]
+
+    logging.basicConfig(level=logging.WARNING)
+    load_dotenv()
+    connection_string = os.getenv("AZURE_CONNECTION_STRING")
+    if not connection_string and not use_local_tables():
+        print("Error: AZURE_CONNECTION_STRING not found in environment variables", file=sys.stderr)
+        sys.exit(1)
+
+    def report(stats):
+        print(f"\r{stats['rows']} rows - {stats['rows_per_second']:.0f} rows/sec", end="", flush=True, file=sys.stderr)
+
+    service = VisaApplicationService(create_table_handler(connection_string), args.table)
+    if args.output == '-':
+        stats = service.export_applications(sys.stdout.buffer, export_format, compression, select, args.filter,
+                                            args.page_size, args.include_archived, report)
+    else:
+        with open(args.output, 'wb') as output:
+            stats = service.export_applications(output, export_format, compression, select, args.filter,
+                                                args.page_size, args.include_archived, report)
+    print(file=sys.stderr)
+    print(f"Exported {stats['rows']} applications as {export_format} ({compression}) in {stats['elapsed_seconds']:.2f}s "
+          f"({stats['rows_per_second']:.0f} rows/sec)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
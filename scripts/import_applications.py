@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Bulk import visa applications into the VisaApplications table.
+
+Usage:
+    python3 scripts/import_applications.py [SOURCE] [--table NAME] [--batch-size N]
+                                           [--workers N] [--checkpoint PATH] [--restart]
+
+SOURCE is a .jsonl file, a .csv file or a directory of applicant JSON files
+(default: res/people). An interrupted import resumes from its checkpoint file
+when run again with the same source; pass --restart to start over.
+"""
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from dotenv import load_dotenv
+from config.settings import Settings
+from util.table_functions import create_table_handler, use_local_tables
+from util.import_functions import iter_application_data
+from services.visa_application_service import MAX_BATCH_SIZE, VisaApplicationService
+
+
+def main():
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Bulk import visa applications")
+    parser.add_argument("source", nargs="?", default=settings.PEOPLE_DIR, help="JSONL file, CSV file or people directory")
+    parser.add_argument("--table", default="VisaApplications", help="Target table")
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE, help="Entities per transaction (max 100)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent transactions")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <source>.import-checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    load_dotenv()
+    connection_string = os.getenv("AZURE_CONNECTION_STRING")
+    if not connection_string and not use_local_tables():
+        print("Error: AZURE_CONNECTION_STRING not found in environment variables")
+        sys.exit(1)
+
+    checkpoint_path = args.checkpoint or args.source.rstrip(os.sep) + ".import-checkpoint"
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    def report(stats):
+        print(f"\r{stats['imported']} imported, {stats['failed']} failed, {stats['skipped']} skipped "
+              f"- {stats['rows_per_second']:.0f} rows/sec", end="", flush=True)
+
+    service = VisaApplicationService(create_table_handler(connection_string), args.table)
+    stats = service.import_applications(
+        iter_application_data(args.source),
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        checkpoint_path=checkpoint_path,
+        progress=report
+    )
+    print()
+    if stats['resumed_after'] is not None:
+        print(f"Resumed after record '{stats['resumed_after']}'")
+    print(f"Imported {stats['imported']} applications into '{args.table}' in {stats['elapsed_seconds']:.2f}s "
+          f"({stats['rows_per_second']:.0f} rows/sec)")
+    if stats['failed']:
+        print(f"{stats['failed']} applications failed; run again to retry them from the checkpoint")
+        sys.exit(1)
+
+    # Imports do not maintain the pipeline counters
+    reconciled = service.reconcile_counters()
+    print(f"Reconciled the pipeline counters over {reconciled['scanned']} applications")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Re-key the VisaApplications table to a partition strategy.
+
+Usage:
+    python3 scripts/migrate_partitions.py --strategy NAME [--table NAME] [--page-size N] [--dry-run]
+
+Moves every application whose PartitionKey differs from the one the strategy
+derives and writes the locators the strategy needs. The migration is
+idempotent: an interrupted run can simply be started again. Set
+VISA_PARTITION_STRATEGY to the same strategy once it has completed.
+"""
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from dotenv import load_dotenv
+from util.table_functions import create_table_handler, use_local_tables
+from services.partition_strategy import PARTITION_STRATEGIES, get_partition_strategy
+from services.visa_application_service import VisaApplicationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-key visa applications to a partition strategy")
+    parser.add_argument("--strategy", required=True, choices=sorted(PARTITION_STRATEGIES), help="Target partition strategy")
+    parser.add_argument("--table", default="VisaApplications", help="Applications table")
+    parser.add_argument("--page-size", type=int, default=500, help="Applications read per page")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many applications would move")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    load_dotenv()
+    connection_string = os.getenv("AZURE_CONNECTION_STRING")
+    if not connection_string and not use_local_tables():
+        print("Error: AZURE_CONNECTION_STRING not found in environment variables")
+        sys.exit(1)
+
+    def report(stats):
+        print(f"\r{stats['scanned']} scanned, {stats['moved']} moved, {stats['failed']} failed", end="", flush=True)
+
+    azure_handler = create_table_handler(connection_string)
+    service = VisaApplicationService(azure_handler, args.table, get_partition_strategy(args.strategy))
+    if not args.dry_run:
+        azure_handler.create_tables([service.locator_table])
+    stats = service.repartition(dry_run=args.dry_run, page_size=args.page_size, progress=report)
+    print()
+    verb = "would move" if args.dry_run else "moved"
+    print(f"'{args.strategy}' strategy {verb} {stats['moved']} of {stats['scanned']} applications "
+          f"into {stats['partitions']} partitions")
+    if stats['failed']:
+        print(f"{stats['failed']} applications failed to move; run again to retry them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Rebuild the secondary index tables of the VisaApplications table.
+
+Usage:
+    python3 scripts/rebuild_indexes.py [--table NAME] [--page-size N]
+
+Rewrites the index rows (tables <table>ByStatus, <table>BySurname and
+<table>BySubmissionDay) of every application and removes stale index rows.
+Safe to run at any time.
+"""
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from dotenv import load_dotenv
+from util.table_functions import create_table_handler, use_local_tables
+from services.application_indexes import index_tables
+from services.visa_application_service import VisaApplicationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the visa application index tables")
+    parser.add_argument("--table", default="VisaApplications", help="Applications table")
+    parser.add_argument("--page-size", type=int, default=500, help="Rows read per page")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    load_dotenv()
+    connection_string = os.getenv("AZURE_CONNECTION_STRING")
+    if not connection_string and not use_local_tables():
+        print("Error: AZURE_CONNECTION_STRING not found in environment variables")
+        sys.exit(1)
+
+    def report(stats):
+        print(f"\r{stats['scanned']} applications indexed, {stats['removed']} stale rows removed", end="", flush=True)
+
+    azure_handler = create_table_handler(connection_string)
+    azure_handler.create_tables(index_tables(args.table))
+    stats = VisaApplicationService(azure_handler, args.table).rebuild_indexes(page_size=args.page_size, progress=report)
+    print()
+    print(f"Indexed {stats['scanned']} applications of '{args.table}', removed {stats['removed']} stale index rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Reconcile the pipeline counters of the VisaApplications table.
+
+Usage:
+    python3 scripts/reconcile_counters.py [--table NAME] [--page-size N]
+
+Recounts the per-status totals, urgent and overdue counts from the
+applications and corrects the counters in the aggregates table. Schedule it
+daily: overdue counts change as applications age, not on transitions.
+"""
+import os
+import sys
+import argparse
+import logging
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from dotenv import load_dotenv
+from util.table_functions import create_table_handler, use_local_tables
+from services.visa_application_service import VisaApplicationService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile the visa application pipeline counters")
+    parser.add_argument("--table", default="VisaApplications", help="Applications table")
+    parser.add_argument("--page-size", type=int, default=1000, help="Applications read per page")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    load_dotenv()
+    connection_string = os.getenv("AZURE_CONNECTION_STRING")
+    if not connection_string and not use_local_tables():
+        print("Error: AZURE_CONNECTION_STRING not found in environment variables")
+        sys.exit(1)
+
+    stats = VisaApplicationService(create_table_handler(connection_string), args.table).reconcile_counters(args.page_size)
+    print(f"Recounted {stats['scanned']} applications of '{args.table}'")
+    for status, fields in sorted(stats['drift'].items()):
+        corrections = ", ".join(f"{field} {value:+d}" for field, value in fields.items() if value)
+        print(f"  {status or '(no status)'}: {corrections}")
+    if not stats['drift']:
+        print("Counters were accurate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Application Export Module
+Streams visa applications to a compressed CSV, JSONL or Parquet download
+"""
+
+import io
+import streamlit as st
+
+from services.visa_application_service import APPLICATION_PROJECTIONS, VisaApplicationService
+from util.export_functions import (
+    EXPORT_COMPRESSIONS, EXPORT_FORMATS, export_file_name, export_mime_type
+)
+
+# st.download_button keeps the whole payload in memory (and in the session), so the
+# export is built in memory and capped; larger exports go through scripts/export_applications.py
+DOWNLOAD_MAX_BYTES = 100 * 1024 * 1024
+
+
+class _ExportTooLarge(Exception):
+    """The export outgrew DOWNLOAD_MAX_BYTES"""
+
+
+def application_export_section(azure_handler):
+    """Export visa applications for auditors"""
+    st.subheader("📦 Application Export")
+    st.caption(
+        f"Applications are fetched page by page and written as they arrive. Downloads are limited to "
+        f"{DOWNLOAD_MAX_BYTES // (1024 * 1024)} MB; export larger tables with scripts/export_applications.py."
+    )
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        export_format = st.selectbox("Format", EXPORT_FORMATS, key="export_format")
+    with col2:
+        compression = st.selectbox("Compression", EXPORT_COMPRESSIONS[export_format], key="export_compression")
+    with col3:
+        projection = st.selectbox("Columns", ["All columns", *APPLICATION_PROJECTIONS], key="export_projection")
+    
+    filter_query = st.text_input("OData filter (optional)", placeholder="Status eq 'Submitted'", key="export_filter")
+    include_archived = st.checkbox("Include archived applications", key="export_include_archived")
+    
+    if st.button("Prepare Export", type="primary"):
+        service = VisaApplicationService(azure_handler)
+        progress_text = st.empty()
+        output = io.BytesIO()
+        
+        def report(stats):
+            if output.tell() > DOWNLOAD_MAX_BYTES:
+                raise _ExportTooLarge()
+            progress_text.caption(f"{stats['rows']} applications exported - {stats['rows_per_second']:.0f} rows/sec")
+        
+        try:
+            stats = service.export_applications(
+                output,
+                export_format,
+                compression,
+                select=None if projection == "All columns" else projection,
+                filter_query=filter_query or None,
+                include_archived=include_archived,
+                progress=report
+            )
+        except _ExportTooLarge:
+            st.error(
+                f"The export is larger than {DOWNLOAD_MAX_BYTES // (1024 * 1024)} MB. Narrow it with a filter or "
+                f"a column projection, or run scripts/export_applications.py to write it to a file."
+            )
+            return
+        except Exception as e:
+            st.error(f"Error exporting applications: {str(e)}")
+            return
+        
+        st.success(
+            f"Exported {stats['rows']} applications in {stats['elapsed_seconds']:.1f}s "
+            f"({stats['rows_per_second']:.0f} rows/sec)"
+        )
+        st.download_button(
+            label="⬇️ Download Export",
+            data=output.getvalue(),
+            file_name=export_file_name("VisaCheck_Applications", export_format, compression),
+            mime=export_mime_type(export_format, compression),
+            width="stretch"
+        )
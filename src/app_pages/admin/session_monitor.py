@@ -265,4 +265,66 @@ def session_monitor_section():
         if st.button("🔄 Refresh", help="Refresh the session list"):
             st.rerun()
     else:
-        st.info("No session data to display")
\ No newline at end of file
+        st.info("No session data to display")
+
+def record_cache_section():
+    """Occupancy and hit/miss counters of the shared application record cache"""
+    from services.record_cache import get_record_cache
+    
+    st.subheader("🗂️ Application Record Cache")
+    
+    cache = get_record_cache()
+    stats = cache.stats()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Cached Records", stats['entries'])
+    with col2:
+        st.metric("Memory", f"{format_file_size(stats['bytes'])} / {format_file_size(stats['max_bytes'])}")
+    with col3:
+        st.metric("Hit Ratio", f"{stats['hit_ratio']:.0%}")
+    with col4:
+        st.metric("Evictions", stats['evictions'])
+    
+    st.caption(
+        f"{stats['hits']} hits, {stats['misses']} misses, {stats['expirations']} expired, "
+        f"{stats['invalidations']} invalidated"
+    )
+    
+    if st.button("🧹 Clear Record Cache", type="secondary"):
+        cache.clear()
+        st.success("Record cache cleared")
+        st.rerun()
+
+
+def connection_pool_section():
+    """Connection reuse metrics of the shared Azure Table Storage connection pool"""
+    from util.azure_connection_pool import get_connection_pool
+    from util.azure_entity_cache import get_entity_cache
+    
+    st.subheader("🔌 Azure Connection Pool")
+    
+    stats = get_connection_pool().stats()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Requests", stats['requests'])
+    with col2:
+        st.metric("Connections Opened", stats['connections_opened'])
+    with col3:
+        st.metric("Reuse Ratio", f"{stats['reuse_ratio']:.0%}")
+    with col4:
+        st.metric("Table Clients", stats['table_clients'])
+    
+    st.caption(
+        f"Pool size {stats['pool_size']} per host, keep-alive {stats['keepalive_seconds']}s, "
+        f"{stats['hosts']} host(s)"
+    )
+    
+    entity_cache = get_entity_cache()
+    if entity_cache:
+        cache_stats = entity_cache.stats()
+        st.caption(
+            f"Entity cache: {cache_stats['entries']} entities, {cache_stats['hit_ratio']:.0%} fresh hits, "
+            f"{cache_stats['stale_reads']} stale re-reads ({cache_stats['unchanged']} unchanged)"
+        )
@@ -14,6 +14,9 @@ import pandas as pd
 from util.azure_functions import AzureHandler
 from util.dutch_formatting_functions import format_dutch_number
 
+# Usage log properties read by the usage monitor
+USAGE_LOG_PROJECTION = ['PartitionKey', 'UserName', 'UsageUnit', 'UsageAmount']
+
 
 def get_month_options():
     """Generate list of available months for the dropdown"""
@@ -51,7 +54,7 @@ def parse_usage_logs(azure_handler: AzureHandler, target_month=None, engagement_
             else:
                 filter_query = engagement_filter_query
         
-        usage_logs = azure_handler.retrieve_table_items("UsageLogs", filter_query)
+        usage_logs = azure_handler.retrieve_table_items("UsageLogs", filter_query, select=USAGE_LOG_PROJECTION)
         
         if not usage_logs:
             return [], {}
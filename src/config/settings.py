@@ -19,6 +19,7 @@ class Settings:
         self.RES_DEMO_DIR = os.path.join(self.RES_DIR, 'demo')
         self.RES_IMG_DIR = os.path.join(self.RES_DIR, 'img')
         self.PEOPLE_DIR = os.path.join(self.RES_DIR, 'people')
+        self.PEOPLE_SNAPSHOT_PATH = os.path.join(self.RES_DIR, 'people.snapshot')
         
         # Session-specific directories (only created if session_id provided)
         if self.session_id:
@@ -13,8 +13,10 @@ st.set_page_config(
 from util.session_manager import SessionManager
 from util.session_cleanup import SessionCleanup
 from util.azure_functions import AzureHandler
+from util.table_functions import create_table_handler, use_local_tables
 from util.user_functions import UserHandler
 from util.auth_functions import AuthHandler
+from services.application_repository import get_application_repository
 
 from app_pages.init_page import init_form
 
@@ -54,19 +56,24 @@ def main():
 
     # Initialize the AzureHandler
     connection_string = os.getenv("AZURE_CONNECTION_STRING")
-    if connection_string is None:
+    if connection_string is None and not use_local_tables():
         st.error("Unable to retrieve connection string")
         return
     if table_name_users is None:
         st.error("Unable to retrieve users table name")
         return
 
-    # Create Azure handler (internal caching handles performance)
-    azure_handler = AzureHandler(connection_string)
+    # Create Azure handler (internal caching handles performance; TABLE_BACKEND=local uses SQLite)
+    azure_handler = create_table_handler(connection_string)
     user_handler = UserHandler(azure_handler, table_name_users)
 
     # Initialize singleton background cleanup scheduler
-    SessionCleanup.ensure_scheduler_running()
+    scheduler = SessionCleanup.ensure_scheduler_running()
+
+    # Poll the people directory so new intake files show up without a full rescan
+    if scheduler:
+        reindex_seconds = int(os.getenv("PEOPLE_REINDEX_SECONDS", "30"))
+        get_application_repository().schedule_refresh(scheduler, reindex_seconds)
 
     # Check if an initial admin user has been created, if not prompt user to create user
     if not azure_handler.check_table_exists(table_name_users):
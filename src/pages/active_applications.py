@@ -1,28 +1,10 @@
 """Active Applications Page"""
 import streamlit as st
-import json
 import random
-from pathlib import Path
-from datetime import datetime
 from util.session_manager import SessionManager
+from util.date_functions import BUCKET_COLORS, calculate_days_in_process, format_dates, overdue_buckets
 from config.settings import Settings
-
-
-def load_person_data(file_path):
-    """Load person data from JSON file"""
-    with open(file_path, 'r') as f:
-        return json.load(f)
-
-
-def calculate_days_in_process(submission_date_str):
-    """Calculate days since submission"""
-    try:
-        submission_date = datetime.strptime(submission_date_str, "%Y-%m-%d")
-        today = datetime.now()
-        days = (today - submission_date).days
-        return days
-    except Exception as e:
-        raise ValueError(f"Unable to calculate days in process: invalid date format '{submission_date_str}'. Expected format: YYYY-MM-DD") from e
+from services.application_repository import LazyRecord, get_application_repository
 
 
 def get_days_color(days):
@@ -35,9 +17,9 @@ def get_days_color(days):
         return "green"
 
 
-def get_days_circle_html(days):
-    """Generate HTML for days circle with color"""
-    color = get_days_color(days)
+def get_days_circle_html(days, color=None):
+    """Generate HTML for days circle with color (computed from days when not given)"""
+    color = color or get_days_color(days)
     
     # Color mapping
     color_map = {
@@ -68,60 +50,59 @@ def get_days_circle_html(days):
     return html
 
 
-def get_people_files(people_dir):
-    """Get all people files sorted by filename"""
-    files = list(Path(people_dir).glob("person_*.json"))
-    # Sort by filename for consistent ordering instead of random shuffle
-    files.sort(key=lambda f: f.name)
-    return files
-
-
 def get_total_applications_count(people_dir):
     """Get total count of applications for display"""
-    files = get_people_files(people_dir)
-    return len(files)
+    return get_application_repository(people_dir).count()
 
 
-def get_applications_page(people_dir, page_number=1, per_page=25):
-    """Get applications for a specific page"""
-    files = get_people_files(people_dir)
-    start_idx = (page_number - 1) * per_page
-    end_idx = start_idx + per_page
-    page_files = files[start_idx:end_idx]
+def get_applications_page(people_dir, cursor=None, per_page=25):
+    """
+    Get one page of applications, oldest submission first across all pages
+    
+    Returns a tuple of (applications, cursor of the next page or None on the last page)
+    """
+    repository = get_application_repository(people_dir)
+    page, next_cursor = repository.list_by_submission(cursor, per_page, summaries=True)
+    
+    # Days in process, badge colors and display dates for the whole page at once
+    submission_days = [summary['submission_day'] for summary in page]
+    days_in_process = calculate_days_in_process(submission_days)
+    days_colors = BUCKET_COLORS[overdue_buckets(days_in_process)].tolist()
+    submission_dates = format_dates(submission_days).tolist()
+    days_in_process = days_in_process.tolist()
+    
+    # Random application status
+    status_options = ['To Decide', 'Ready for Matching', 'To Consult', 'Rolled Back', 'Awaiting Approval']
     
     applications = []
-    for file_path in page_files:
-        person_data = load_person_data(file_path)
-        
-        # Calculate days in process
-        submission_date_str = person_data.get('submission_date')
-        if not submission_date_str:
-            continue
-            
-        days_in_process = calculate_days_in_process(submission_date_str)
-        submission_date = datetime.strptime(submission_date_str, "%Y-%m-%d")
-        
-        # Random application status
-        status_options = ['To Decide', 'Ready for Matching', 'To Consult', 'Rolled Back', 'Awaiting Approval']
+    for idx, summary in enumerate(page):
+        application_number = summary['visa_application_number']
         
+        # Rows only carry the displayed columns; the full record is loaded on demand
         application = {
-            'submission_date': submission_date.strftime("%d/%m/%Y"),
-            'days_in_process': days_in_process,
-            'application_number': person_data.get('visa_application_number', 'N/A'),
-            'intake_location': person_data.get('intake_location', 'N/A'),
+            'submission_date': submission_dates[idx],
+            'days_in_process': days_in_process[idx],
+            'days_color': days_colors[idx],
+            'application_number': application_number or 'N/A',
+            'intake_location': summary.get('intake_location') or 'N/A',
             'application_status': random.choice(status_options),
-            'urgent': person_data.get('urgent', False),
-            'case_type': person_data.get('case_type', 'N/A'),
-            'visa_type_requested': person_data.get('visa_type_requested', 'N/A'),
-            'nationality': person_data.get('country_of_nationality', 'N/A'),
-            'person_data': person_data
+            'urgent': summary.get('urgent', False),
+            'case_type': summary.get('case_type') or 'N/A',
+            'visa_type_requested': summary.get('visa_type_requested') or 'N/A',
+            'nationality': summary.get('country_of_nationality') or 'N/A',
+            'person_data': LazyRecord(application_number, people_dir)
         }
         applications.append(application)
     
-    # Sort by days in process (descending - oldest first)
-    applications.sort(key=lambda x: x['days_in_process'], reverse=True)
-    
-    return applications
+    return applications, next_cursor
+
+
+def go_to_next_page(next_cursor):
+    """Remember where the next page starts and move to it"""
+    cursors = st.session_state.page_cursors
+    del cursors[st.session_state.current_page:]
+    cursors.append(next_cursor)
+    st.session_state.current_page += 1
 
 
 def active_applications_page():
@@ -151,9 +132,22 @@ def active_applications_page():
     per_page = 25
     total_pages = (total_count + per_page - 1) // per_page
     
-    # Initialize page number in session state
+    # Initialize page number and keyset cursors (page_cursors[i] starts page i + 1)
     if 'current_page' not in st.session_state:
         st.session_state.current_page = 1
+    if 'page_cursors' not in st.session_state:
+        st.session_state.page_cursors = [None]
+    if st.session_state.current_page > len(st.session_state.page_cursors):
+        st.session_state.current_page = 1
+    
+    # Get applications for current page
+    try:
+        applications, next_cursor = get_applications_page(
+            people_dir, st.session_state.page_cursors[st.session_state.current_page - 1], per_page
+        )
+    except Exception as e:
+        st.error(f"Error loading applications: {str(e)}")
+        return
     
     # Display total count
     st.write(f"**Total Applications:** {total_count}")
@@ -170,22 +164,15 @@ def active_applications_page():
         st.write(f"Page {st.session_state.current_page} of {total_pages}")
     
     with col3:
-        st.write(f"Showing {min(per_page, total_count - (st.session_state.current_page - 1) * per_page)} of {total_count} applications")
+        st.write(f"Showing {len(applications)} of {total_count} applications")
     
     with col4:
-        if st.button("Next →", disabled=st.session_state.current_page >= total_pages):
-            st.session_state.current_page += 1
+        if st.button("Next →", disabled=next_cursor is None):
+            go_to_next_page(next_cursor)
             st.rerun()
     
     st.divider()
     
-    # Get applications for current page
-    try:
-        applications = get_applications_page(people_dir, st.session_state.current_page, per_page)
-    except Exception as e:
-        st.error(f"Error loading applications: {str(e)}")
-        return
-    
     if not applications:
         st.info("No applications found on this page.")
         return
@@ -220,8 +207,7 @@ def active_applications_page():
         
         # Days in Process (with colored circle)
         with cols[1]:
-            days = app['days_in_process']
-            st.markdown(get_days_circle_html(days), unsafe_allow_html=True)
+            st.markdown(get_days_circle_html(app['days_in_process'], app['days_color']), unsafe_allow_html=True)
         
         # Application Number
         with cols[2]:
@@ -314,8 +300,8 @@ def active_applications_page():
         st.write(f"Applications {(st.session_state.current_page - 1) * per_page + 1}-{min(st.session_state.current_page * per_page, total_count)} of {total_count}")
     
     with col4:
-        if st.button("Next →", disabled=st.session_state.current_page >= total_pages, key="bottom_next"):
-            st.session_state.current_page += 1
+        if st.button("Next →", disabled=next_cursor is None, key="bottom_next"):
+            go_to_next_page(next_cursor)
             st.rerun()
     
     # Help section
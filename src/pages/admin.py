@@ -8,8 +8,9 @@ from util.sidebar import sidebar
 # Import admin modules from app_pages
 from app_pages.admin.user_management import user_management_section, get_users_for_engagement
 from app_pages.admin.engagement_management import manage_engagements_section, get_engagements
-from app_pages.admin.session_monitor import session_monitor_section
+from app_pages.admin.session_monitor import session_monitor_section, record_cache_section, connection_pool_section
 from app_pages.admin.usage_monitor import usage_monitor_section
+from app_pages.admin.application_export import application_export_section
 
 def admin_page():
     """Admin page function"""
@@ -30,7 +31,9 @@ def admin_page():
     st.title("Admin Panel")
     
     # Create tabs for different admin functions
-    tab1, tab2, tab3, tab4 = st.tabs(["User Management", "Manage Engagements", "Session Monitor", "Usage Monitor"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["User Management", "Manage Engagements", "Session Monitor", "Usage Monitor", "Application Export"]
+    )
     
     with tab1:
         user_management_section(user_handler, engagements)
@@ -40,10 +43,17 @@ def admin_page():
     
     with tab3:
         session_monitor_section()
+        st.divider()
+        record_cache_section()
+        st.divider()
+        connection_pool_section()
     
     with tab4:
         usage_monitor_section(azure_handler, get_engagements)
     
+    with tab5:
+        application_export_section(azure_handler)
+    
     # Display current engagements for reference
     st.divider()
     st.subheader("System Overview")
@@ -8,11 +8,10 @@ This page allows case managers to:
 """
 
 import streamlit as st
-import json
-from pathlib import Path
-from datetime import datetime
 from util.session_manager import SessionManager
+from util.date_functions import calculate_days_in_process, format_dates
 from config.settings import Settings
+from services.application_repository import get_application_repository
 from services.case_assignment_service import (
     get_orchestrator,
     AgentType,
@@ -20,31 +19,39 @@ from services.case_assignment_service import (
 )
 
 
-def load_pending_applications(people_dir, max_cases=50):
-    """Load pending applications that need assignment"""
-    files = list(Path(people_dir).glob("person_*.json"))[:max_cases]
+def load_pending_applications(people_dir, max_cases=50, filters=None):
+    """
+    Load pending applications that need assignment
+    
+    Args:
+        people_dir: Directory with applicant data
+        max_cases: Maximum number of cases to load
+        filters: Optional column filters for the repository bitmap indexes,
+                 e.g. {'case_type': ['Work Visa'], 'urgent': True}
+    """
+    repository = get_application_repository(people_dir)
+    
+    # Skip applications without a submission date
+    summaries = [
+        summary for summary in repository.filter_summaries(max_cases, **(filters or {}))
+        if summary['submission_day']
+    ]
+    
+    # Days in process and display dates for all cases at once
+    submission_days = [summary['submission_day'] for summary in summaries]
+    days_in_process = calculate_days_in_process(submission_days).tolist()
+    submission_dates = format_dates(submission_days).tolist()
     
     applications = []
-    for file_path in files:
-        with open(file_path, 'r') as f:
-            person_data = json.load(f)
-        
-        # Calculate days in process
-        submission_date_str = person_data.get('submission_date')
-        if not submission_date_str:
-            continue
-        
-        submission_date = datetime.strptime(submission_date_str, "%Y-%m-%d")
-        days_in_process = (datetime.now() - submission_date).days
-        
+    for idx, person_data in enumerate(summaries):
         application = {
             'application_number': person_data.get('visa_application_number', 'N/A'),
             'case_type': person_data.get('case_type', 'N/A'),
             'intake_location': person_data.get('intake_location', 'N/A'),
             'urgent': person_data.get('urgent', False),
-            'days_in_process': days_in_process,
+            'days_in_process': days_in_process[idx],
             'nationality': person_data.get('country_of_nationality', 'N/A'),
-            'submission_date': submission_date.strftime("%d/%m/%Y")
+            'submission_date': submission_dates[idx]
         }
         applications.append(application)
     
@@ -249,8 +256,28 @@ def case_assignment_page():
         # Number of cases to load
         num_cases = st.slider("Number of cases to assign", 5, 100, 25)
         
+        # Optional filters, answered from the repository bitmap indexes
+        repository = get_application_repository(people_dir)
+        with st.expander("🔎 Filter Pending Cases"):
+            filter_col1, filter_col2, filter_col3 = st.columns(3)
+            with filter_col1:
+                case_types = st.multiselect("Case Type", sorted(repository.value_counts('case_type')))
+            with filter_col2:
+                locations = st.multiselect("Intake Location", sorted(repository.value_counts('intake_location')))
+            with filter_col3:
+                nationalities = st.multiselect("Nationality", sorted(repository.value_counts('country_of_nationality')))
+            urgent_only = st.checkbox("Urgent cases only", value=False)
+        
+        filters = {
+            'case_type': case_types or None,
+            'intake_location': locations or None,
+            'country_of_nationality': nationalities or None,
+            'urgent': True if urgent_only else None
+        }
+        st.caption(f"{repository.filter_count(**filters)} applications match the current filters")
+        
         if st.button("🔄 Load Pending Cases", type="primary"):
-            pending_cases = load_pending_applications(people_dir, num_cases)
+            pending_cases = load_pending_applications(people_dir, num_cases, filters)
             st.session_state['pending_cases'] = pending_cases
             st.success(f"✅ Loaded {len(pending_cases)} pending cases")
         
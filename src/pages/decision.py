@@ -1,36 +1,18 @@
 """Application Decision Page - AI-powered decision recommendations"""
 import streamlit as st
-import json
-import os
 from typing import Dict, Any
 from util.session_manager import SessionManager
 from util.azure_openai_functions import OpenAIHandler
 from util.logging_functions import LoggingHandler
 from services.decision_agent_service import DecisionAgentService
 from config.settings import Settings
+from services.application_repository import get_application_repository
 import asyncio
 
 
 def load_person_data(application_number):
-    """Load complete person data from people directory based on application number"""
-    settings = Settings()
-    people_dir = settings.PEOPLE_DIR
-    
-    if not os.path.exists(people_dir):
-        return None
-    
-    for filename in os.listdir(people_dir):
-        if filename.endswith('.json'):
-            try:
-                file_path = os.path.join(people_dir, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if data.get('visa_application_number') == application_number:
-                        return data
-            except Exception:
-                continue
-    
-    return None
+    """Load complete person data from the shared application repository"""
+    return get_application_repository().get(application_number)
 
 
 def get_decision_service():
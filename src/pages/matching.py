@@ -1,23 +1,17 @@
 """Visa Application Matching Page"""
 import streamlit as st
-import json
 import random
-import os
 from pathlib import Path
 from util.session_manager import SessionManager
-
-
-def load_person_data(file_path):
-    """Load person data from JSON file"""
-    with open(file_path, 'r') as f:
-        return json.load(f)
+from services.application_repository import get_application_repository
 
 
 def get_random_people(people_dir, count=5):
-    """Get random people from the people directory"""
-    json_files = list(Path(people_dir).glob("person_*.json"))
-    selected_files = random.sample(json_files, min(count, len(json_files)))
-    return [load_person_data(file) for file in selected_files]
+    """Get random people from the shared application repository"""
+    repository = get_application_repository(people_dir)
+    application_numbers = repository.list_application_numbers()
+    selected_numbers = random.sample(application_numbers, min(count, len(application_numbers)))
+    return [repository.get(number) for number in selected_numbers]
 
 
 def format_date_of_birth(dob):
@@ -1,12 +1,9 @@
 """Application Overview Page - Visual Pipeline & Status Dashboard"""
 import streamlit as st
-import json
-import os
-from pathlib import Path
-from datetime import datetime
+import numpy as np
 from util.session_manager import SessionManager
-from config.settings import Settings
-from collections import Counter
+from util.date_functions import BUCKET_RED, calculate_days_in_process, overdue_buckets
+from services.application_repository import get_application_repository
 
 
 # Define the application workflow stages
@@ -124,65 +121,40 @@ WORKFLOW_STAGES = [
 ]
 
 
-def load_person_data(file_path):
-    """Load person data from JSON file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+# Every status in stage order, and the index of the stage each status belongs to
+ALL_STATUSES = [status for stage in WORKFLOW_STAGES for status in stage['statuses']]
+STATUS_STAGE_INDEX = np.array(
+    [index for index, stage in enumerate(WORKFLOW_STAGES) for _ in stage['statuses']],
+    dtype=np.intp
+)
 
-
-def calculate_days_in_process(submission_date_str):
-    """Calculate days since submission"""
-    try:
-        submission_date = datetime.strptime(submission_date_str, "%Y-%m-%d")
-        today = datetime.now()
-        days = (today - submission_date).days
-        return days
-    except Exception:
-        return 0
+# Number of sample applications shown per stage
+STAGE_SAMPLE_SIZE = 5
 
 
 def get_all_applications():
-    """Load all applications from people directory"""
-    settings = Settings()
-    people_dir = settings.PEOPLE_DIR
-    
-    if not os.path.exists(people_dir):
-        return []
-    
-    applications = []
-    for filename in os.listdir(people_dir):
-        if filename.endswith('.json'):
-            try:
-                file_path = os.path.join(people_dir, filename)
-                person_data = load_person_data(file_path)
-                
-                submission_date_str = person_data.get('submission_date')
-                if not submission_date_str:
-                    continue
-                
-                days_in_process = calculate_days_in_process(submission_date_str)
-                
-                # Random status for demo
-                import random
-                all_statuses = []
-                for stage in WORKFLOW_STAGES:
-                    all_statuses.extend(stage['statuses'])
-                
-                application = {
-                    'application_number': person_data.get('visa_application_number', 'N/A'),
-                    'status': random.choice(all_statuses),
-                    'submission_date': submission_date_str,
-                    'days_in_process': days_in_process,
-                    'urgent': person_data.get('urgent', False),
-                    'case_type': person_data.get('case_type', 'N/A'),
-                    'nationality': person_data.get('country_of_nationality', 'N/A'),
-                    'intake_location': person_data.get('intake_location', 'N/A')
-                }
-                applications.append(application)
-            except Exception:
-                continue
+    """
+    Load all applications from the shared application repository as columns
+    
+    Returns a dict of equally long NumPy arrays: 'row' (repository row id),
+    'status' (index into ALL_STATUSES), 'days_in_process' and 'urgent'.
+    """
+    repository = get_application_repository()
+    columns = repository.column_arrays(['submission_day', 'urgent'])
+    
+    # Skip applications without a submission date
+    has_date = columns['submission_day'] > 0
+    submission_day = columns['submission_day'][has_date]
     
-    return applications
+    # Random status for demo
+    rng = np.random.default_rng()
+    
+    return {
+        'row': columns['row'][has_date],
+        'status': rng.integers(0, len(ALL_STATUSES), size=len(submission_day)),
+        'days_in_process': calculate_days_in_process(submission_day),
+        'urgent': columns['urgent'][has_date].astype(bool)
+    }
 
 
 def map_status_to_stage(status):
@@ -194,22 +166,43 @@ def map_status_to_stage(status):
 
 
 def get_stage_statistics(applications):
-    """Calculate statistics for each stage"""
+    """Calculate statistics for every stage in one grouped pass over the application columns"""
+    stage_count = len(WORKFLOW_STAGES)
+    stage_index = STATUS_STAGE_INDEX[applications['status']]
+    days = applications['days_in_process']
+    
+    totals = np.bincount(stage_index, minlength=stage_count)
+    urgent_counts = np.bincount(stage_index, weights=applications['urgent'], minlength=stage_count)
+    overdue_counts = np.bincount(stage_index, weights=overdue_buckets(days) == BUCKET_RED, minlength=stage_count)
+    day_sums = np.bincount(stage_index, weights=days, minlength=stage_count)
+    
+    # Rows grouped by stage, keeping repository order within each stage
+    order = np.argsort(stage_index, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(totals)[:-1]))
+    
+    repository = get_application_repository()
     stage_stats = {}
     
-    for stage in WORKFLOW_STAGES:
-        stage_apps = [app for app in applications if app['status'] in stage['statuses']]
-        
-        urgent_count = sum(1 for app in stage_apps if app['urgent'])
-        avg_days = sum(app['days_in_process'] for app in stage_apps) / len(stage_apps) if stage_apps else 0
-        overdue_count = sum(1 for app in stage_apps if app['days_in_process'] > 30)
+    for index, stage in enumerate(WORKFLOW_STAGES):
+        total = int(totals[index])
+        sample = order[starts[index]:starts[index] + min(total, STAGE_SAMPLE_SIZE)]
+        summaries = repository.summaries_for_rows(applications['row'][sample])
         
         stage_stats[stage['id']] = {
-            'total': len(stage_apps),
-            'urgent': urgent_count,
-            'avg_days': round(avg_days, 1),
-            'overdue': overdue_count,
-            'applications': stage_apps
+            'total': total,
+            'urgent': int(urgent_counts[index]),
+            'avg_days': round(day_sums[index] / total, 1) if total else 0,
+            'overdue': int(overdue_counts[index]),
+            'days_total': int(day_sums[index]),
+            'applications': [
+                {
+                    'application_number': summary['visa_application_number'],
+                    'days_in_process': int(days[position]),
+                    'urgent': summary['urgent'],
+                    'case_type': summary['case_type']
+                }
+                for position, summary in zip(sample, summaries)
+            ]
         }
     
     return stage_stats
@@ -325,7 +318,7 @@ def render_stage_details(stage, stats):
             st.markdown("**📋 Applications in this stage:**")
             
             # Display up to 5 sample applications
-            for app in stats['applications'][:5]:
+            for app in stats['applications'][:STAGE_SAMPLE_SIZE]:
                 cols = st.columns([2, 1, 1, 1])
                 with cols[0]:
                     st.write(f"**{app['application_number']}**")
@@ -339,20 +332,22 @@ def render_stage_details(stage, stats):
                 with cols[3]:
                     st.write(app['case_type'])
             
-            if stats['total'] > 5:
-                st.caption(f"... and {stats['total'] - 5} more applications")
+            if stats['total'] > STAGE_SAMPLE_SIZE:
+                st.caption(f"... and {stats['total'] - STAGE_SAMPLE_SIZE} more applications")
 
 
-def render_summary_metrics(applications, stage_stats):
+def render_summary_metrics(stage_stats):
     """Render summary metrics at the top"""
     st.markdown("### 📊 Overview Summary")
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
-    total_apps = len(applications)
-    total_urgent = sum(1 for app in applications if app['urgent'])
-    total_overdue = sum(1 for app in applications if app['days_in_process'] > 30)
-    avg_processing_time = sum(app['days_in_process'] for app in applications) / total_apps if total_apps > 0 else 0
+    # Every application is in exactly one stage, so the stage totals add up
+    total_apps = sum(stats['total'] for stats in stage_stats.values())
+    total_urgent = sum(stats['urgent'] for stats in stage_stats.values())
+    total_overdue = sum(stats['overdue'] for stats in stage_stats.values())
+    total_days = sum(stats['days_total'] for stats in stage_stats.values())
+    avg_processing_time = total_days / total_apps if total_apps > 0 else 0
     
     # Calculate AI interventions needed
     ai_intervention_stages = ['ready_for_matching', 'verification', 'decision']
@@ -381,16 +376,14 @@ def render_summary_metrics(applications, stage_stats):
                   help="Average days since submission across all applications")
 
 
-def render_status_distribution(applications):
+def render_status_distribution(stage_stats):
     """Render status distribution chart"""
     st.markdown("### 📈 Status Distribution")
     
-    status_counts = Counter(app['status'] for app in applications)
-    
     # Create chart data
     chart_data = []
     for stage in WORKFLOW_STAGES:
-        count = sum(status_counts.get(status, 0) for status in stage['statuses'])
+        count = stage_stats[stage['id']]['total']
         if count > 0:
             chart_data.append({
                 'Stage': stage['display'],
@@ -504,7 +497,7 @@ def overview_page():
     with st.spinner("Loading application data..."):
         applications = get_all_applications()
     
-    if not applications:
+    if len(applications['row']) == 0:
         st.warning("No applications found in the system.")
         st.info("👉 Go to **Visa Intake** to create new applications.")
         return
@@ -513,7 +506,7 @@ def overview_page():
     stage_stats = get_stage_statistics(applications)
     
     # Render summary metrics
-    render_summary_metrics(applications, stage_stats)
+    render_summary_metrics(stage_stats)
     
     st.divider()
     
@@ -533,7 +526,7 @@ def overview_page():
     st.divider()
     
     # Render status distribution
-    render_status_distribution(applications)
+    render_status_distribution(stage_stats)
     
     st.divider()
     
@@ -0,0 +1,121 @@
+"""Application Bitmap Index
+
+Per-value bitmap indexes over the rows of the application repository. Every
+bitmap is a Python ``int`` used as a bit set (bit ``row`` is set when the row
+holds the value), so combined filters are computed with ``&`` and ``|`` on
+integers and counted with ``int.bit_count()`` instead of looping over records.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+# Columns that can be filtered on, as named in the application summaries
+FILTER_COLUMNS = ('case_type', 'intake_location', 'urgent', 'country_of_nationality', 'status')
+
+
+def iter_rows(bitmap: int, limit: Optional[int] = None) -> Iterator[int]:
+    """Yield the set row ids of a bitmap in ascending order"""
+    if limit is not None and limit <= 0:
+        return
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    found = 0
+    for offset, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (offset << 3) + low.bit_length() - 1
+            byte ^= low
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+
+class BitmapIndex:
+    """Bitmaps per distinct value of each filter column plus a bitmap of live rows"""
+
+    def __init__(self, columns: Sequence[str] = FILTER_COLUMNS):
+        self.columns = tuple(columns)
+        self.live = 0
+        self._bitmaps: Dict[str, Dict[Any, int]] = {column: {} for column in self.columns}
+
+    def load_column(self, column: str, row_count: int, value_ids: Sequence[int],
+                    decode: Callable[[int], Any]) -> None:
+        """
+        Bulk load the bitmaps of a column from a sequence of encoded values
+
+        Args:
+            column: Filter column name
+            row_count: Number of rows in ``value_ids``
+            value_ids: Encoded value per row (e.g. a snapshot string id column)
+            decode: Maps an encoded value to the value used in filters
+        """
+        size = (row_count + 7) // 8
+        groups: Dict[int, bytearray] = {}
+        for row, value_id in enumerate(value_ids):
+            bits = groups.get(value_id)
+            if bits is None:
+                bits = groups[value_id] = bytearray(size)
+            bits[row >> 3] |= 1 << (row & 7)
+
+        bitmaps = self._bitmaps[column]
+        for value_id, bits in groups.items():
+            value = decode(value_id)
+            bitmaps[value] = bitmaps.get(value, 0) | int.from_bytes(bits, 'little')
+
+    def add(self, row: int, values: Dict[str, Any]) -> None:
+        """Index a single row"""
+        bit = 1 << row
+        for column in self.columns:
+            bitmaps = self._bitmaps[column]
+            value = values.get(column)
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+        self.live |= bit
+
+    def discard(self, row: int) -> None:
+        """Remove a row; its value bits are masked out by the live bitmap"""
+        self.live &= ~(1 << row)
+
+    def match(self, filters: Dict[str, Any]) -> int:
+        """
+        Compute the bitmap of live rows matching all filters
+
+        Args:
+            filters: Column -> value, or a collection of values (any of them matches).
+                     Columns mapped to None are ignored.
+
+        Returns:
+            Bitmap of matching rows
+        """
+        result = self.live
+        for column, wanted in filters.items():
+            if wanted is None:
+                continue
+            if column not in self._bitmaps:
+                raise ValueError(f"Unknown filter column '{column}'")
+            bitmaps = self._bitmaps[column]
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                column_bitmap = 0
+                for value in wanted:
+                    column_bitmap |= bitmaps.get(value, 0)
+            else:
+                column_bitmap = bitmaps.get(wanted, 0)
+            result &= column_bitmap
+            if not result:
+                break
+        return result
+
+    def count(self, filters: Dict[str, Any]) -> int:
+        """Count the live rows matching all filters"""
+        return self.match(filters).bit_count()
+
+    def value_counts(self, column: str, bitmap: Optional[int] = None) -> Dict[Any, int]:
+        """Count rows per value of a column, restricted to a bitmap (default: all live rows)"""
+        bitmap = self.live if bitmap is None else bitmap
+        counts = {}
+        for value, value_bitmap in self._bitmaps[column].items():
+            count = (value_bitmap & bitmap).bit_count()
+            if count:
+                counts[value] = count
+        return counts
+
+    def values(self, column: str) -> Iterable[Any]:
+        """Return the distinct values of a column present in live rows"""
+        return self.value_counts(column).keys()
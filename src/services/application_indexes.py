@@ -0,0 +1,72 @@
+"""Secondary Indexes for the VisaApplications table
+
+Each index is a table, named after the applications table it indexes (e.g.
+'VisaApplicationsByStatus'), whose PartitionKey is the normalized value of one
+application property and whose RowKey is the application number, so finding
+applications by status, surname or submission day is a partition (or
+partition range) query instead of a scan of the applications table.
+
+Index rows are written after the application itself; Table Storage
+transactions cannot span tables. Lookups therefore check every hit against
+the application and drop stale rows, and ``VisaApplicationService.rebuild_indexes``
+repairs an index from scratch.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from services.partition_strategy import sanitize_key
+
+
+def _normalize_status(value: Any) -> Optional[str]:
+    return sanitize_key(str(value or '')) or None
+
+
+def _normalize_surname(value: Any) -> Optional[str]:
+    return sanitize_key(str(value or '').lower()) or None
+
+
+def _normalize_day(value: Any) -> Optional[str]:
+    day = str(value or '')[:10]
+    return day if re.match(r"\d{4}-\d{2}-\d{2}$", day) else None
+
+
+class SecondaryIndex:
+    """An index table over one application property"""
+
+    def __init__(self, table_name: str, field: str, normalize: Callable[[Any], Optional[str]]):
+        self.table_name = table_name
+        self.field = field
+        self.normalize = normalize
+
+    def key(self, entity: Dict[str, Any]) -> Optional[str]:
+        """Return the index PartitionKey of an application entity, None when it is not indexed"""
+        return self.normalize(entity.get(self.field))
+
+    def entry(self, entity: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the index row of an application entity, None when it is not indexed"""
+        key = self.key(entity)
+        if key is None:
+            return None
+        return {'PartitionKey': key, 'RowKey': entity['RowKey']}
+
+
+# Index name -> (suffix of the index table name, indexed property, normalizer)
+INDEX_DEFINITIONS = {
+    'status': ('ByStatus', 'Status', _normalize_status),
+    'surname': ('BySurname', 'Surname', _normalize_surname),
+    'submission_day': ('BySubmissionDay', 'SubmissionDate', _normalize_day),
+}
+
+
+def application_indexes(table_name: str) -> Dict[str, SecondaryIndex]:
+    """Return the secondary indexes of an applications table, by index name"""
+    return {
+        name: SecondaryIndex(f"{table_name}{suffix}", field, normalize)
+        for name, (suffix, field, normalize) in INDEX_DEFINITIONS.items()
+    }
+
+
+def index_tables(table_name: str) -> List[str]:
+    """Return the index tables to create next to an applications table"""
+    return [index.table_name for index in application_indexes(table_name).values()]
@@ -0,0 +1,600 @@
+"""Application Repository
+
+Shared, process-wide access to the applicant records stored as JSON files in
+the people directory (``res/people``). The records are served from a compact,
+memory-mapped snapshot of the directory (see ``application_snapshot``), so
+listing pages read fixed-width columns and point lookups decode a single
+record instead of walking and parsing every file. Decoded records are kept in
+the process-wide record cache (see ``record_cache``), so sessions opening the
+same application share a single decode.
+
+Files that are added, changed or removed after the snapshot was built are
+picked up by ``refresh``, which compares per-file mtimes and only parses the
+files that changed. Those changes live in a small in-memory overlay on top of
+the snapshot until the overlay grows large enough to be compacted into a new
+snapshot.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from bisect import bisect_right
+from collections.abc import Mapping
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from services.application_index import FILTER_COLUMNS, BitmapIndex, iter_rows
+from services.application_snapshot import ApplicationSnapshot, build_snapshot, date_to_day, summarize_record
+from services.record_cache import RecordCache, get_record_cache
+
+logger = logging.getLogger(__name__)
+
+# An indexed application is either a snapshot row (int) or an overlay application number (str)
+RowRef = Union[int, str]
+
+# Numeric snapshot columns exposed as arrays, with how to derive them from an overlay record
+NUMERIC_COLUMNS = {
+    'submission_day': lambda record: date_to_day(record.get('submission_date')),
+    'urgent': lambda record: 1 if record.get('urgent') else 0,
+}
+
+# Keyset pagination cursor: (submission day ordinal, application number) of the last row shown
+SubmissionCursor = Tuple[int, str]
+
+
+class ApplicationRepository:
+    """Index of applicant records keyed by visa application number"""
+
+    # Rebuild the snapshot once the overlay exceeds this share of the snapshot rows
+    COMPACTION_RATIO = 0.1
+    COMPACTION_MIN_CHANGES = 1000
+
+    def __init__(self, people_dir: str, snapshot_path: Optional[str] = None,
+                 record_cache: Optional[RecordCache] = None):
+        self.people_dir = people_dir
+        self.snapshot_path = snapshot_path or people_dir.rstrip(os.sep) + '.snapshot'
+        self.record_cache = record_cache if record_cache is not None else get_record_cache()
+        self.generation = 0
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._snapshot: Optional[ApplicationSnapshot] = None
+        self._reset_overlay()
+        self.reload()
+
+    def _reset_overlay(self) -> None:
+        # Snapshot rows superseded by a changed or removed file
+        self._removed_rows = set()
+        # Records parsed from files added or changed since the snapshot was built
+        self._overlay: Dict[str, Dict[str, Any]] = {}
+        self._overlay_files: Dict[str, str] = {}
+        self._overlay_by_submission: Optional[List[Tuple[SubmissionCursor, str]]] = None
+        # Overlay entries get row ids after the snapshot rows so they can be bitmap indexed
+        self._overlay_rows: Dict[str, int] = {}
+        self._overlay_row_refs: Dict[int, str] = {}
+        self._next_row = len(self._snapshot) if self._snapshot is not None else 0
+        # Built on the first filter query, then maintained by refresh
+        self._bitmap_index: Optional[BitmapIndex] = None
+        # File name -> (mtime in ns, row reference); built on the first refresh
+        self._files: Optional[Dict[str, Tuple[int, RowRef]]] = None
+        self._dir_mtime_ns = 0
+
+    def reload(self, rebuild: bool = False) -> None:
+        """
+        Open the snapshot of the people directory and catch up with later file changes
+
+        An existing snapshot is reused even when the directory changed since it
+        was built; only the changed files are parsed afterwards. The snapshot
+        is rebuilt when missing, unreadable or when ``rebuild`` is set.
+
+        Args:
+            rebuild: Rebuild the snapshot from the JSON files
+        """
+        with self._refresh_lock:
+            snapshot = None
+            if not rebuild and os.path.exists(self.snapshot_path):
+                try:
+                    snapshot = ApplicationSnapshot(self.snapshot_path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable snapshot '{self.snapshot_path}': {str(e)}")
+
+            if snapshot is None:
+                snapshot = self._build_snapshot()
+
+            self._install_snapshot(snapshot)
+            logger.info(f"Loaded {len(snapshot)} applications from '{snapshot.snapshot_path}'")
+
+            if not snapshot.is_fresh(self.people_dir):
+                self._refresh(full_scan=True)
+
+    def _build_snapshot(self) -> ApplicationSnapshot:
+        """Compile the people directory, falling back to a temporary file if the configured path is read-only"""
+        try:
+            build_snapshot(self.people_dir, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Unable to write snapshot '{self.snapshot_path}': {str(e)}")
+            self.snapshot_path = os.path.join(tempfile.gettempdir(), f"people-{zlib.crc32(self.people_dir.encode('utf-8')):08x}.snapshot")
+            build_snapshot(self.people_dir, self.snapshot_path)
+        return ApplicationSnapshot(self.snapshot_path)
+
+    def _install_snapshot(self, snapshot: ApplicationSnapshot) -> None:
+        # The previous snapshot is not closed: concurrent readers may still use it
+        with self._lock:
+            self._snapshot = snapshot
+            self._reset_overlay()
+            self.generation += 1
+            self.invalidate()
+
+    def refresh(self, full_scan: bool = False) -> int:
+        """
+        Apply files added, changed or removed since the last refresh
+
+        Without ``full_scan`` the directory is only listed when its mtime
+        changed, which covers files being created, deleted or atomically
+        replaced. A full scan also stats every file to catch in-place edits.
+        Only the files that changed are parsed.
+
+        Args:
+            full_scan: Stat every file even if the directory mtime is unchanged
+
+        Returns:
+            The number of changed files
+        """
+        with self._refresh_lock:
+            changes = self._refresh(full_scan)
+
+            with self._lock:
+                overlay_size = len(self._overlay) + len(self._removed_rows)
+                threshold = max(self.COMPACTION_MIN_CHANGES, int(len(self._snapshot) * self.COMPACTION_RATIO))
+            if overlay_size > threshold:
+                logger.info(f"Compacting {overlay_size} overlay changes into a new snapshot")
+                self._install_snapshot(self._build_snapshot())
+
+            return changes
+
+    def _refresh(self, full_scan: bool) -> int:
+        try:
+            dir_mtime_ns = os.stat(self.people_dir).st_mtime_ns
+        except OSError:
+            return 0
+        if not full_scan and self._files is not None and dir_mtime_ns == self._dir_mtime_ns:
+            return 0
+
+        if self._files is None:
+            self._files = self._snapshot_files()
+
+        current: Dict[str, int] = {}
+        with os.scandir(self.people_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json'):
+                    try:
+                        current[entry.name] = entry.stat().st_mtime_ns
+                    except OSError:
+                        continue
+
+        removed = [name for name in self._files if name not in current]
+        changed = sorted(name for name, mtime_ns in current.items()
+                         if name not in self._files or self._files[name][0] != mtime_ns)
+
+        # Parse outside the lock so readers are only blocked while the overlay is updated
+        parsed: Dict[str, Optional[Dict[str, Any]]] = {}
+        for filename in changed:
+            try:
+                with open(os.path.join(self.people_dir, filename), 'r', encoding='utf-8') as f:
+                    parsed[filename] = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable applicant file '{filename}': {str(e)}")
+                parsed[filename] = None
+
+        with self._lock:
+            for filename in removed + changed:
+                self._drop_file(filename)
+
+            for filename in changed:
+                person_data = parsed[filename] or {}
+                application_number = person_data.get('visa_application_number')
+                if application_number and self._find(application_number) is not None:
+                    logger.warning(f"Duplicate application number '{application_number}' in '{filename}', skipping")
+                    application_number = None
+                if not application_number:
+                    # Remember the mtime so the file is not parsed again until it changes
+                    self._files[filename] = (current[filename], '')
+                    continue
+                self._overlay[application_number] = person_data
+                self._overlay_files[application_number] = filename
+                row = self._next_row
+                self._next_row += 1
+                self._overlay_rows[application_number] = row
+                self._overlay_row_refs[row] = application_number
+                if self._bitmap_index is not None:
+                    self._bitmap_index.add(row, summarize_record(person_data))
+                self._files[filename] = (current[filename], application_number)
+
+            self._dir_mtime_ns = dir_mtime_ns
+            if removed or changed:
+                self._overlay_by_submission = None
+                self.generation += 1
+
+        if removed or changed:
+            logger.info(f"Reindexed '{self.people_dir}': {len(changed)} added or changed, {len(removed)} removed")
+        return len(removed) + len(changed)
+
+    def _snapshot_files(self) -> Dict[str, Tuple[int, RowRef]]:
+        snapshot = self._snapshot
+        file_names = snapshot.column('file_name')
+        mtimes = snapshot.column('file_mtime_ns')
+        return {snapshot.string(file_names[row]): (mtimes[row], row) for row in range(len(snapshot))}
+
+    def _drop_file(self, filename: str) -> None:
+        _, ref = self._files.pop(filename, (0, ''))
+        if isinstance(ref, int):
+            self._removed_rows.add(ref)
+            self.invalidate(self._snapshot.application_number(ref))
+            row = ref
+        elif ref:
+            self._overlay.pop(ref, None)
+            self._overlay_files.pop(ref, None)
+            row = self._overlay_rows.pop(ref)
+            del self._overlay_row_refs[row]
+        else:
+            return
+        if self._bitmap_index is not None:
+            self._bitmap_index.discard(row)
+
+    def schedule_refresh(self, scheduler, interval_seconds: int) -> None:
+        """
+        Poll the people directory for changes from a background scheduler
+
+        Args:
+            scheduler: A running APScheduler ``BackgroundScheduler``
+            interval_seconds: Seconds between two refreshes
+        """
+        job_id = f"people_reindex_{zlib.crc32(self.people_dir.encode('utf-8')):08x}"
+        if scheduler.get_job(job_id):
+            return
+        scheduler.add_job(
+            self.refresh,
+            'interval',
+            seconds=interval_seconds,
+            max_instances=1,  # Prevent overlapping runs
+            id=job_id,
+            name='People Directory Reindex'
+        )
+        logger.info(f"Polling '{self.people_dir}' for changes every {interval_seconds} seconds")
+
+    def _find(self, application_number: str) -> Optional[RowRef]:
+        if application_number in self._overlay:
+            return application_number
+        row = self._snapshot.find(application_number)
+        if row is None or row in self._removed_rows:
+            return None
+        return row
+
+    def _iter_refs(self) -> Iterator[RowRef]:
+        """Snapshot rows in file name order, followed by overlay entries in file name order"""
+        removed = self._removed_rows
+        for row in range(len(self._snapshot)):
+            if row not in removed:
+                yield row
+        yield from sorted(self._overlay, key=self._overlay_files.__getitem__)
+
+    def _slice_refs(self, offset: int, limit: Optional[int]) -> List[RowRef]:
+        if limit is not None and not self._removed_rows and offset + limit <= len(self._snapshot):
+            return list(range(offset, offset + limit))
+        end = None if limit is None else offset + limit
+        return list(islice(self._iter_refs(), offset, end))
+
+    def _record(self, ref: RowRef) -> Dict[str, Any]:
+        if isinstance(ref, str):
+            return self._overlay[ref]
+        snapshot = self._snapshot
+        return self.record_cache.get_or_load(
+            (self.people_dir, snapshot.application_number(ref)),
+            lambda: (snapshot.record(ref), snapshot.column('record_length')[ref])
+        )
+
+    def invalidate(self, application_number: Optional[str] = None) -> None:
+        """
+        Drop cached records of this repository
+
+        Args:
+            application_number: Only drop this application (default: all)
+        """
+        if application_number is None:
+            self.record_cache.invalidate_where(lambda key: key[0] == self.people_dir)
+        else:
+            self.record_cache.invalidate((self.people_dir, application_number))
+
+    def _summary(self, ref: RowRef) -> Dict[str, Any]:
+        return summarize_record(self._overlay[ref]) if isinstance(ref, str) else self._snapshot.summary(ref)
+
+    def _iter_by_submission(self, after: SubmissionCursor) -> Iterator[Tuple[SubmissionCursor, RowRef]]:
+        """Merge the presorted snapshot rows and the overlay in (submission day, application number) order"""
+        snapshot = self._snapshot
+        rows = snapshot.rows_by_submission()
+        position = bisect_right(rows, after, key=snapshot.submission_key)
+
+        if self._overlay_by_submission is None:
+            self._overlay_by_submission = sorted(
+                ((date_to_day(record.get('submission_date')), number), number)
+                for number, record in self._overlay.items()
+            )
+        overlay = self._overlay_by_submission
+        overlay_position = bisect_right(overlay, (after, chr(0x10FFFF)))
+
+        removed = self._removed_rows
+        while True:
+            while position < len(rows) and rows[position] in removed:
+                position += 1
+            base_key = snapshot.submission_key(rows[position]) if position < len(rows) else None
+            overlay_key = overlay[overlay_position][0] if overlay_position < len(overlay) else None
+            if base_key is None and overlay_key is None:
+                return
+            if overlay_key is None or (base_key is not None and base_key < overlay_key):
+                yield base_key, rows[position]
+                position += 1
+            else:
+                yield overlay_key, overlay[overlay_position][1]
+                overlay_position += 1
+
+    def list_by_submission(self, after: Optional[SubmissionCursor] = None, limit: int = 25,
+                           summaries: bool = False) -> Tuple[List[Dict[str, Any]], Optional[SubmissionCursor]]:
+        """
+        Page through applications oldest submission first using keyset pagination
+
+        Rows are ordered globally by (submission date, application number);
+        applications without a valid submission date are not listed.
+
+        Args:
+            after: Cursor returned with the previous page (None for the first page)
+            limit: Page size
+            summaries: Return listing summaries instead of full records
+
+        Returns:
+            Tuple of (applications on the page, cursor for the next page or None on the last page)
+        """
+        with self._lock:
+            page = list(islice(self._iter_by_submission(after or (0, chr(0x10FFFF))), limit + 1))
+            read = self._summary if summaries else self._record
+            applications = [read(ref) for _, ref in page[:limit]]
+            next_cursor = page[limit - 1][0] if len(page) > limit else None
+            return applications, next_cursor
+
+    def _get_bitmap_index(self) -> BitmapIndex:
+        if self._bitmap_index is None:
+            snapshot = self._snapshot
+            row_count = len(snapshot)
+            index = BitmapIndex(FILTER_COLUMNS)
+            for column in FILTER_COLUMNS:
+                decode = bool if column == 'urgent' else snapshot.string
+                index.load_column(column, row_count, snapshot.column(column), decode)
+            index.live = (1 << row_count) - 1
+            for row in self._removed_rows:
+                index.discard(row)
+            for number, row in self._overlay_rows.items():
+                index.add(row, summarize_record(self._overlay[number]))
+            self._bitmap_index = index
+        return self._bitmap_index
+
+    def _row_ref(self, row: int) -> RowRef:
+        return row if row < len(self._snapshot) else self._overlay_row_refs[row]
+
+    def filter_count(self, **filters: Any) -> int:
+        """
+        Count applications matching all filters using the bitmap indexes
+
+        Filters are keyword arguments on the columns in ``FILTER_COLUMNS``
+        (``case_type``, ``intake_location``, ``urgent``,
+        ``country_of_nationality``, ``status``). A value matches exactly; a
+        list, tuple or set matches any of its values; None is ignored.
+        """
+        with self._lock:
+            return self._get_bitmap_index().count(filters)
+
+    def filter_summaries(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        List summaries of applications matching all filters (see ``filter_count``)
+
+        Args:
+            limit: Maximum number of summaries to return (all when None)
+            **filters: Column filters
+
+        Returns:
+            Matching summaries ordered by row (snapshot rows first)
+        """
+        with self._lock:
+            bitmap = self._get_bitmap_index().match(filters)
+            return [self._summary(self._row_ref(row)) for row in iter_rows(bitmap, limit)]
+
+    def value_counts(self, column: str, **filters: Any) -> Dict[Any, int]:
+        """Count applications matching the filters per distinct value of a column"""
+        with self._lock:
+            index = self._get_bitmap_index()
+            return index.value_counts(column, index.match(filters))
+
+    def column_arrays(self, names: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Return numeric columns of all applications as NumPy arrays
+
+        Snapshot columns are wrapped without copying the memory map; removed
+        rows are dropped and overlay entries appended. The result always
+        contains a ``row`` array whose ids can be passed to ``summaries_for_rows``.
+
+        Args:
+            names: Columns from ``NUMERIC_COLUMNS`` (``submission_day``, ``urgent``)
+
+        Returns:
+            Column name -> array, all of the same length
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            removed = np.fromiter(self._removed_rows, dtype=np.int64, count=len(self._removed_rows))
+            overlay_numbers = list(self._overlay_rows)
+
+            def combine(base: np.ndarray, overlay_values: List[int]) -> np.ndarray:
+                if len(removed):
+                    base = np.delete(base, removed)
+                if overlay_values:
+                    base = np.concatenate((base, np.asarray(overlay_values, dtype=base.dtype)))
+                return base
+
+            arrays = {'row': combine(np.arange(len(snapshot), dtype=np.int64),
+                                     [self._overlay_rows[number] for number in overlay_numbers])}
+            for name in names:
+                derive = NUMERIC_COLUMNS[name]
+                arrays[name] = combine(np.asarray(snapshot.column(name)),
+                                       [derive(self._overlay[number]) for number in overlay_numbers])
+            return arrays
+
+    def summaries_for_rows(self, rows: Sequence[int]) -> List[Dict[str, Any]]:
+        """Return the summaries of row ids obtained from ``column_arrays``"""
+        with self._lock:
+            summaries = []
+            for row in rows:
+                row = int(row)
+                # Overlay rows removed by a refresh since the arrays were taken are skipped
+                if row < len(self._snapshot) or row in self._overlay_row_refs:
+                    summaries.append(self._summary(self._row_ref(row)))
+            return summaries
+
+    def get(self, application_number: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve an applicant record by application number
+
+        Args:
+            application_number: The visa application number
+
+        Returns:
+            The applicant record or None if not found. Records are shared
+            through the record cache and must not be modified.
+        """
+        with self._lock:
+            ref = self._find(application_number)
+            return self._record(ref) if ref is not None else None
+
+    def get_file_name(self, application_number: str) -> Optional[str]:
+        """Return the name of the JSON file an application was loaded from"""
+        with self._lock:
+            ref = self._find(application_number)
+            if ref is None:
+                return None
+            return self._overlay_files[ref] if isinstance(ref, str) else self._snapshot.value('file_name', ref)
+
+    def list_application_numbers(self) -> List[str]:
+        """Return all application numbers ordered by file name (files added since the snapshot last)"""
+        with self._lock:
+            snapshot = self._snapshot
+            return [ref if isinstance(ref, str) else snapshot.application_number(ref) for ref in self._iter_refs()]
+
+    def list_applications(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List full applicant records ordered by file name (files added since the snapshot last)
+
+        Args:
+            offset: Number of records to skip
+            limit: Maximum number of records to return (all when None)
+
+        Returns:
+            List of applicant records
+        """
+        with self._lock:
+            return [self._record(ref) for ref in self._slice_refs(offset, limit)]
+
+    def list_summaries(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List the listing fields of applications in the same order as ``list_applications``
+
+        Summaries carry ``visa_application_number``, ``case_type``,
+        ``visa_type_requested``, ``submission_date`` (ISO string),
+        ``submission_day`` (day ordinal, 0 when missing), ``intake_location``,
+        ``urgent``, ``country_of_nationality`` and ``status`` and are read
+        straight from the snapshot columns without decoding full records.
+        """
+        with self._lock:
+            return [self._summary(ref) for ref in self._slice_refs(offset, limit)]
+
+    def count(self) -> int:
+        """Return the number of indexed applications"""
+        with self._lock:
+            return len(self._snapshot) - len(self._removed_rows) + len(self._overlay)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __contains__(self, application_number: str) -> bool:
+        with self._lock:
+            return self._find(application_number) is not None
+
+
+# Process-wide repositories, one per people directory
+_repositories: Dict[str, ApplicationRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def get_application_repository(people_dir: Optional[str] = None) -> ApplicationRepository:
+    """Get or create the shared repository for the given (default: configured) people directory"""
+    from config.settings import Settings
+    settings = Settings()
+    if people_dir is None:
+        people_dir = settings.PEOPLE_DIR
+
+    key = os.path.abspath(str(people_dir))
+    with _repositories_lock:
+        repository = _repositories.get(key)
+        if repository is None:
+            snapshot_path = settings.PEOPLE_SNAPSHOT_PATH if key == os.path.abspath(settings.PEOPLE_DIR) else None
+            repository = ApplicationRepository(key, snapshot_path)
+            _repositories[key] = repository
+        return repository
+
+
+class LazyRecord(Mapping):
+    """
+    Read-only view of an applicant record that is loaded from the shared
+    repository on first access.
+
+    Page rows and session state hold these instead of full records, so they
+    only carry the application number until a page actually reads a field.
+    The loaded record is never pickled along with the proxy.
+    """
+
+    __slots__ = ('application_number', 'people_dir', '_record')
+
+    def __init__(self, application_number: str, people_dir: Optional[str] = None):
+        self.application_number = application_number
+        self.people_dir = people_dir
+        self._record: Optional[Dict[str, Any]] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the record has been loaded"""
+        return self._record is not None
+
+    def _load(self) -> Dict[str, Any]:
+        if self._record is None:
+            record = get_application_repository(self.people_dir).get(self.application_number)
+            self._record = record if record is not None else {}
+        return self._record
+
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __getstate__(self) -> Tuple[str, Optional[str]]:
+        return self.application_number, self.people_dir
+
+    def __setstate__(self, state: Tuple[str, Optional[str]]) -> None:
+        self.application_number, self.people_dir = state
+        self._record = None
+
+    def __repr__(self) -> str:
+        return f"LazyRecord({self.application_number!r}, loaded={self.loaded})"
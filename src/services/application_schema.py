@@ -0,0 +1,170 @@
+"""Visa Application Schema
+
+The single declaration of the fields of a visa application: the snake_case
+key used by forms, imports and JSON, the PascalCase property stored in the
+VisaApplications table, the type and the default. The field mappings of
+``VisaApplicationService`` (creation, updatable fields, export columns) are
+derived from it, as are the converters below.
+
+``ApplicationRecord`` holds one application in ``__slots__`` (one slot per
+field) rather than a dict, for pages and jobs that keep many applications in
+memory.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Optional
+
+
+class SchemaField:
+    """One field of the visa application schema"""
+
+    __slots__ = ('key', 'property', 'type', 'default', 'updatable')
+
+    def __init__(self, key: str, property: str, type: type = str, default: Any = '', updatable: bool = True):
+        self.key = key
+        self.property = property
+        self.type = type
+        self.default = default
+        self.updatable = updatable
+
+
+APPLICATION_SCHEMA = (
+    SchemaField('application_number', 'ApplicationNumber', updatable=False),
+    SchemaField('case_type', 'CaseType'),
+    SchemaField('visa_type_requested', 'VisaTypeRequested'),
+    SchemaField('application_type', 'ApplicationType'),
+    SchemaField('submission_date', 'SubmissionDate'),
+    SchemaField('intake_location', 'IntakeLocation'),
+    SchemaField('applicant_is_minor', 'ApplicantIsMinor', bool, False),
+    SchemaField('is_urgent', 'IsUrgent', bool, False),
+    SchemaField('given_name', 'GivenName'),
+    SchemaField('surname', 'Surname'),
+    SchemaField('variation_in_birth_certificate', 'VariationInBirthCertificate', bool, False),
+    SchemaField('gender', 'Gender'),
+    SchemaField('country_of_nationality', 'CountryOfNationality'),
+    SchemaField('street_number', 'StreetNumber'),
+    SchemaField('unit_number', 'UnitNumber'),
+    SchemaField('postal_code', 'PostalCode'),
+    SchemaField('city', 'City'),
+    SchemaField('country', 'Country'),
+    SchemaField('date_of_birth', 'DateOfBirth'),
+    SchemaField('state_of_birth', 'StateOfBirth'),
+    SchemaField('place_of_birth', 'PlaceOfBirth'),
+    SchemaField('country_of_birth', 'CountryOfBirth'),
+    SchemaField('residency_status_in_australia', 'ResidencyStatusInAustralia'),
+    SchemaField('civil_status', 'CivilStatus'),
+    SchemaField('packaged_member_of_eu', 'PackagedMemberOfEU', bool, False),
+    SchemaField('occupation', 'Occupation'),
+    SchemaField('status', 'Status', default='Draft'),
+    # Maintained by VisaApplicationService
+    SchemaField('created_at', 'CreatedAt', default=None, updatable=False),
+    SchemaField('updated_at', 'UpdatedAt', default=None, updatable=False),
+    SchemaField('created_by', 'CreatedBy', default='system', updatable=False),
+)
+
+# Application data keys -> entity properties
+FIELD_PROPERTIES = {field.key: field.property for field in APPLICATION_SCHEMA}
+# Application data keys that update_application maps to entity properties
+UPDATABLE_FIELDS = {field.key: field.property for field in APPLICATION_SCHEMA if field.updatable}
+# Entity properties of every field, in schema order
+SCHEMA_PROPERTIES = [field.property for field in APPLICATION_SCHEMA]
+BOOLEAN_PROPERTIES = [field.property for field in APPLICATION_SCHEMA if field.type is bool]
+
+# (key, property, default) triples the converters loop over
+_FIELDS = tuple((field.key, field.property, field.default) for field in APPLICATION_SCHEMA)
+
+
+def data_to_entity(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map application data (snake_case keys) to entity properties; missing fields get their defaults"""
+    return {prop: data.get(key, default) for key, prop, default in _FIELDS}
+
+
+def data_to_patch(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map the updatable fields present in application data to entity properties"""
+    return {prop: data[key] for key, prop in UPDATABLE_FIELDS.items() if key in data}
+
+
+def entity_to_data(entity: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an application entity to application data (snake_case keys)"""
+    return {key: entity.get(prop, default) for key, prop, default in _FIELDS}
+
+
+def entity_to_json(entity: Dict[str, Any]) -> str:
+    """Serialize an application entity as a JSON object with snake_case keys"""
+    return json.dumps(entity_to_data(entity), default=str)
+
+
+def entity_from_json(text: str) -> Dict[str, Any]:
+    """Parse a JSON object with snake_case keys to entity properties"""
+    return data_to_entity(json.loads(text))
+
+
+class ApplicationRecord:
+    """
+    A visa application with one slot per schema field
+
+    Besides the fields (as snake_case attributes) a record keeps the
+    PartitionKey and ETag of the entity it was loaded from, so it can be
+    passed back to ``VisaApplicationService.update_application`` as the
+    original of a conditional update.
+    """
+
+    __slots__ = ('partition_key', 'etag', *(field.key for field in APPLICATION_SCHEMA))
+
+    def __init__(self, partition_key: Optional[str] = None, etag: Optional[str] = None, **values: Any):
+        unknown = set(values) - FIELD_PROPERTIES.keys()
+        if unknown:
+            raise TypeError(f"Unknown application fields: {', '.join(sorted(unknown))}")
+        self.partition_key = partition_key
+        self.etag = etag
+        for key, _, default in _FIELDS:
+            setattr(self, key, values.get(key, default))
+
+    @classmethod
+    def from_entity(cls, entity: Dict[str, Any]) -> 'ApplicationRecord':
+        """Create a record from a table entity (as returned by get_application)"""
+        record = cls.__new__(cls)
+        record.partition_key = entity.get('PartitionKey')
+        record.etag = (getattr(entity, 'metadata', None) or {}).get('etag')
+        for key, prop, default in _FIELDS:
+            setattr(record, key, entity.get(prop, default))
+        if not record.application_number:
+            record.application_number = entity.get('RowKey', '')
+        return record
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'ApplicationRecord':
+        """Create a record from application data; keys outside the schema are ignored"""
+        record = cls.__new__(cls)
+        record.partition_key = record.etag = None
+        for key, _, default in _FIELDS:
+            setattr(record, key, data.get(key, default))
+        return record
+
+    @classmethod
+    def from_json(cls, text: str) -> 'ApplicationRecord':
+        return cls.from_data(json.loads(text))
+
+    def to_entity(self) -> Dict[str, Any]:
+        """Return the entity properties, with PartitionKey and RowKey when known"""
+        entity = {prop: getattr(self, key) for key, prop, _ in _FIELDS}
+        if self.partition_key is not None:
+            entity['PartitionKey'] = self.partition_key
+        if self.application_number:
+            entity['RowKey'] = self.application_number
+        return entity
+
+    def to_data(self, keys: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Return the application data (snake_case keys), optionally only the given keys"""
+        return {key: getattr(self, key) for key in (keys or FIELD_PROPERTIES)}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_data(), default=str)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ApplicationRecord):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in FIELD_PROPERTIES)
+
+    def __repr__(self) -> str:
+        return f"ApplicationRecord(application_number={self.application_number!r}, status={self.status!r})"
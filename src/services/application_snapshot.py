@@ -0,0 +1,351 @@
+"""Application Snapshot
+
+Compact, memory-mapped snapshot of the applicant corpus in the people directory.
+
+``build_snapshot`` compiles every ``*.json`` file into a single binary file made
+of fixed-width columns (string ids, date ordinals, flags), a string table and
+the compact JSON of every record. ``ApplicationSnapshot`` opens that file with
+``mmap`` so listing columns and single records can be read without parsing the
+whole corpus or holding it on the Python heap.
+
+File layout (all integers little-endian)::
+
+    header   magic, version, row count, string count, source directory
+             mtime/file count and the offset of every section below
+    records  compact UTF-8 JSON of each record, back to back
+    strings  uint64 offsets[string count + 1] followed by UTF-8 bytes
+    columns  one fixed-width array per column, ``row count`` entries each
+    sorted   uint32 row ids ordered by application number
+    by_date  uint32 row ids ordered by (submission day, application number)
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'VCSNAP01'
+SNAPSHOT_VERSION = 3
+
+# (column name, struct/memoryview format); string columns hold string table ids
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('application_number', 'I'),
+    ('file_name', 'I'),
+    ('file_mtime_ns', 'q'),
+    ('case_type', 'I'),
+    ('visa_type_requested', 'I'),
+    ('intake_location', 'I'),
+    ('country_of_nationality', 'I'),
+    ('submission_day', 'i'),
+    ('urgent', 'B'),
+    ('status', 'I'),
+    ('record_offset', 'Q'),
+    ('record_length', 'I'),
+)
+STRING_COLUMNS = ('application_number', 'file_name', 'case_type', 'visa_type_requested',
+                  'intake_location', 'country_of_nationality', 'status')
+
+# magic, version, rows, strings, source mtime, source files, then one offset per section
+_HEADER = struct.Struct('<8sIIIqI' + 'Q' * (4 + len(COLUMNS)))
+
+
+def _align(offset: int, size: int = 8) -> int:
+    return (offset + size - 1) // size * size
+
+
+def date_to_day(value: Optional[str]) -> int:
+    """Convert an ISO ``YYYY-MM-DD`` date to a day ordinal (0 when missing or invalid)"""
+    if not value:
+        return 0
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def day_to_date(day: int) -> str:
+    """Convert a day ordinal back to an ISO date string ('' for 0)"""
+    return date.fromordinal(day).isoformat() if day > 0 else ''
+
+
+def get_source_state(people_dir: str) -> Tuple[int, int]:
+    """Return the (directory mtime in ns, JSON file count) used to detect stale snapshots"""
+    try:
+        mtime_ns = os.stat(people_dir).st_mtime_ns
+        file_count = sum(1 for name in os.listdir(people_dir) if name.endswith('.json'))
+    except OSError:
+        return 0, 0
+    return mtime_ns, file_count
+
+
+def build_snapshot(people_dir: str, snapshot_path: str) -> int:
+    """
+    Compile the JSON files in the people directory into a snapshot file
+
+    The snapshot is written to a temporary file and moved into place, so
+    readers never observe a partially written snapshot.
+
+    Args:
+        people_dir: Directory containing the applicant JSON files
+        snapshot_path: Destination path of the snapshot
+
+    Returns:
+        The number of applications written
+    """
+    source_mtime_ns, source_files = get_source_state(people_dir)
+
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: Any) -> int:
+        value = '' if value is None else str(value)
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = string_ids[value] = len(strings)
+            strings.append(value)
+        return string_id
+
+    columns: Dict[str, List[int]] = {name: [] for name, _ in COLUMNS}
+    seen = set()
+
+    snapshot_dir = os.path.dirname(os.path.abspath(snapshot_path))
+    os.makedirs(snapshot_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.people-', suffix='.snapshot', dir=snapshot_dir)
+
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(b'\0' * _HEADER.size)
+            records_offset = out.tell()
+
+            filenames = sorted(os.listdir(people_dir)) if os.path.isdir(people_dir) else []
+            for filename in filenames:
+                if not filename.endswith('.json'):
+                    continue
+
+                file_path = os.path.join(people_dir, filename)
+                try:
+                    mtime_ns = os.stat(file_path).st_mtime_ns
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        person_data = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable applicant file '{filename}': {str(e)}")
+                    continue
+
+                application_number = person_data.get('visa_application_number')
+                if not application_number:
+                    continue
+                if application_number in seen:
+                    logger.warning(f"Duplicate application number '{application_number}' in '{filename}', skipping")
+                    continue
+                seen.add(application_number)
+
+                payload = json.dumps(person_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                columns['record_offset'].append(out.tell() - records_offset)
+                columns['record_length'].append(len(payload))
+                out.write(payload)
+
+                columns['application_number'].append(intern(application_number))
+                columns['file_name'].append(intern(filename))
+                columns['file_mtime_ns'].append(mtime_ns)
+                columns['case_type'].append(intern(person_data.get('case_type')))
+                columns['visa_type_requested'].append(intern(person_data.get('visa_type_requested')))
+                columns['intake_location'].append(intern(person_data.get('intake_location')))
+                columns['country_of_nationality'].append(intern(person_data.get('country_of_nationality')))
+                columns['submission_day'].append(date_to_day(person_data.get('submission_date')))
+                columns['urgent'].append(1 if person_data.get('urgent') else 0)
+                columns['status'].append(intern(person_data.get('status')))
+
+            row_count = len(columns['application_number'])
+
+            # String table
+            out.write(b'\0' * (_align(out.tell()) - out.tell()))
+            strings_offset = out.tell()
+            encoded = [value.encode('utf-8') for value in strings]
+            offsets = [0]
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            out.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+            out.writelines(encoded)
+
+            # Fixed-width columns
+            column_offsets = []
+            for name, fmt in COLUMNS:
+                out.write(b'\0' * (_align(out.tell()) - out.tell()))
+                column_offsets.append(out.tell())
+                out.write(struct.pack(f'<{row_count}{fmt}', *columns[name]))
+
+            # Primary key order for binary search
+            out.write(b'\0' * (_align(out.tell()) - out.tell()))
+            sorted_offset = out.tell()
+            number_ids = columns['application_number']
+            sorted_rows = sorted(range(row_count), key=lambda row: strings[number_ids[row]])
+            out.write(struct.pack(f'<{row_count}I', *sorted_rows))
+
+            # Secondary order for oldest-first listings
+            by_date_offset = out.tell()
+            days = columns['submission_day']
+            by_date_rows = sorted(range(row_count), key=lambda row: (days[row], strings[number_ids[row]]))
+            out.write(struct.pack(f'<{row_count}I', *by_date_rows))
+
+            out.seek(0)
+            out.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, row_count, len(strings),
+                                   source_mtime_ns, source_files,
+                                   records_offset, strings_offset, sorted_offset, by_date_offset,
+                                   *column_offsets))
+
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    logger.info(f"Built snapshot '{snapshot_path}' with {row_count} applications")
+    return row_count
+
+
+class ApplicationSnapshot:
+    """Read-only, memory-mapped view of a snapshot built by ``build_snapshot``"""
+
+    def __init__(self, snapshot_path: str):
+        if sys.byteorder != 'little':
+            raise RuntimeError("Application snapshots are only supported on little-endian platforms")
+
+        self.snapshot_path = snapshot_path
+        with open(snapshot_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        try:
+            (magic, version, self.row_count, self.string_count, self.source_mtime_ns, self.source_files,
+             records_offset, strings_offset, sorted_offset, by_date_offset,
+             *column_offsets) = _HEADER.unpack_from(self._mmap, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"Not a version {SNAPSHOT_VERSION} application snapshot: '{snapshot_path}'")
+
+            self._records_offset = records_offset
+            offsets_size = (self.string_count + 1) * 8
+            self._string_offsets = self._view[strings_offset:strings_offset + offsets_size].cast('Q')
+            self._string_data_offset = strings_offset + offsets_size
+
+            self._columns: Dict[str, memoryview] = {}
+            for (name, fmt), offset in zip(COLUMNS, column_offsets):
+                size = struct.calcsize(fmt) * self.row_count
+                self._columns[name] = self._view[offset:offset + size].cast(fmt)
+            self._sorted_rows = self._view[sorted_offset:sorted_offset + 4 * self.row_count].cast('I')
+            self._by_date_rows = self._view[by_date_offset:by_date_offset + 4 * self.row_count].cast('I')
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __enter__(self) -> 'ApplicationSnapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map"""
+        for name in ('_sorted_rows', '_by_date_rows', '_string_offsets'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        for view in getattr(self, '_columns', {}).values():
+            view.release()
+        self._columns = {}
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def is_fresh(self, people_dir: str) -> bool:
+        """Check whether the snapshot still matches the people directory it was built from"""
+        return (self.source_mtime_ns, self.source_files) == get_source_state(people_dir)
+
+    def string(self, string_id: int) -> str:
+        """Decode an entry of the string table"""
+        start = self._string_data_offset + self._string_offsets[string_id]
+        end = self._string_data_offset + self._string_offsets[string_id + 1]
+        return str(self._mmap[start:end], 'utf-8')
+
+    def column(self, name: str) -> memoryview:
+        """Return a zero-copy view of a fixed-width column"""
+        return self._columns[name]
+
+    def value(self, name: str, row: int) -> Any:
+        """Return the decoded value of a column for a row"""
+        value = self._columns[name][row]
+        return self.string(value) if name in STRING_COLUMNS else value
+
+    def application_number(self, row: int) -> str:
+        return self.string(self._columns['application_number'][row])
+
+    def find(self, application_number: str) -> Optional[int]:
+        """Binary search the row of an application number"""
+        low, high = 0, self.row_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.application_number(self._sorted_rows[middle]) < application_number:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.row_count:
+            row = self._sorted_rows[low]
+            if self.application_number(row) == application_number:
+                return row
+        return None
+
+    def rows_by_submission(self) -> memoryview:
+        """Return row ids ordered by (submission day, application number)"""
+        return self._by_date_rows
+
+    def submission_key(self, row: int) -> Tuple[int, str]:
+        """Return the (submission day, application number) sort key of a row"""
+        return self._columns['submission_day'][row], self.application_number(row)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Decode the full applicant record stored for a row"""
+        start = self._records_offset + self._columns['record_offset'][row]
+        end = start + self._columns['record_length'][row]
+        return json.loads(str(self._mmap[start:end], 'utf-8'))
+
+    def summary(self, row: int) -> Dict[str, Any]:
+        """Return the listing fields of a row without decoding the full record"""
+        return {
+            'visa_application_number': self.application_number(row),
+            'case_type': self.value('case_type', row),
+            'visa_type_requested': self.value('visa_type_requested', row),
+            'submission_date': day_to_date(self._columns['submission_day'][row]),
+            'submission_day': self._columns['submission_day'][row],
+            'intake_location': self.value('intake_location', row),
+            'urgent': bool(self._columns['urgent'][row]),
+            'country_of_nationality': self.value('country_of_nationality', row),
+            'status': self.value('status', row),
+        }
+
+
+def summarize_record(person_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the same listing fields as ``ApplicationSnapshot.summary`` for a parsed record"""
+    submission_day = date_to_day(person_data.get('submission_date'))
+    return {
+        'visa_application_number': person_data.get('visa_application_number') or '',
+        'case_type': person_data.get('case_type') or '',
+        'visa_type_requested': person_data.get('visa_type_requested') or '',
+        'submission_date': day_to_date(submission_day),
+        'submission_day': submission_day,
+        'intake_location': person_data.get('intake_location') or '',
+        'urgent': bool(person_data.get('urgent')),
+        'country_of_nationality': person_data.get('country_of_nationality') or '',
+        'status': person_data.get('status') or '',
+    }
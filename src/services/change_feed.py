@@ -0,0 +1,143 @@
+"""Change Feed for visa applications
+
+Every create, update and delete of a visa application appends a change row
+to a change-log table. RowKeys are time-ordered change ids (nanoseconds since
+the epoch plus a random suffix), partitioned by hour, so reading the changes
+after a cursor is a single range query in commit order.
+
+Consumers keep the cursor of the last change they applied and call
+``changes_since(cursor)`` to receive only newer changes. Changes younger than
+``CHANGE_FEED_SETTLE_SECONDS`` are held back so a change written by another
+instance with a slightly earlier clock is not skipped.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Changes younger than this are not returned yet (clock skew between instances)
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "2"))
+
+CHANGE_CREATE = 'create'
+CHANGE_UPDATE = 'update'
+CHANGE_DELETE = 'delete'
+# Bulk imports: created or overwritten, previous values unknown
+CHANGE_UPSERT = 'upsert'
+# Moved to or from the archive table, unchanged otherwise
+CHANGE_ARCHIVE = 'archive'
+CHANGE_RESTORE = 'restore'
+
+_last_change_ns = 0
+_change_id_lock = threading.Lock()
+
+
+def _change_ns(change_id: str) -> int:
+    return int(change_id.split('-', 1)[0])
+
+
+def _hour_partition(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).strftime('%Y%m%d%H')
+
+
+def new_change_id() -> str:
+    """Return a change id that sorts after every change id issued by this process"""
+    global _last_change_ns
+    with _change_id_lock:
+        _last_change_ns = max(time.time_ns(), _last_change_ns + 1)
+        ns = _last_change_ns
+    return f"{ns:020d}-{uuid.uuid4().hex[:8]}"
+
+
+def _cursor_at(ns: int) -> str:
+    """Return a cursor that sorts after every change id up to ``ns``"""
+    return f"{ns:020d}-~"
+
+
+class ChangeFeed:
+    """Append-only change log of visa applications"""
+
+    def __init__(self, azure_handler, table_name: str):
+        self.azure_handler = azure_handler
+        self.table_name = table_name
+
+    def append(self, operation: str, changes: List[Dict[str, Any]]) -> None:
+        """
+        Record changes of applications
+
+        Args:
+            operation: One of the CHANGE_* operations
+            changes: Dictionaries with PartitionKey and RowKey of the application, the
+                     changed properties and optionally 'previous' (their former values)
+
+        Failures are logged rather than raised: the applications are already saved.
+        """
+        entries = []
+        for change in changes:
+            change_id = new_change_id()
+            properties = {key: value for key, value in change.items() if key not in ('PartitionKey', 'RowKey', 'previous')}
+            entries.append({
+                'PartitionKey': _hour_partition(_change_ns(change_id)),
+                'RowKey': change_id,
+                'ApplicationNumber': change['RowKey'],
+                'Partition': change['PartitionKey'],
+                'Operation': operation,
+                'Changes': json.dumps(properties, default=str),
+                'Previous': json.dumps(change.get('previous') or {}, default=str),
+            })
+        if not entries:
+            return
+        try:
+            results = self.azure_handler.upsert_entities(self.table_name, entries, max_workers=1)
+            failed = [result for result in results if not result['success']]
+            if failed:
+                logger.error(f"Failed to record {len(failed)} application changes: {failed[0]['error']}")
+        except Exception as e:
+            logger.error(f"Error recording application changes: {str(e)}")
+
+    def latest_cursor(self) -> str:
+        """Return the cursor of the current end of the feed, to follow only changes from now on"""
+        return _cursor_at(time.time_ns() - int(CHANGE_FEED_SETTLE_SECONDS * 1e9))
+
+    def changes_since(self, cursor: Optional[str] = None, limit: int = 1000) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Read the changes after a cursor in commit order
+
+        Args:
+            cursor: Cursor returned by the previous call (None for the start of the feed)
+            limit: Maximum number of changes to return
+
+        Returns:
+            Tuple of (changes, cursor to pass to the next call). Each change has
+            cursor, application_number, partition, operation, changes, previous and timestamp.
+        """
+        horizon = self.latest_cursor()
+        filters = [f"RowKey lt '{horizon}'"]
+        if cursor:
+            filters[:0] = [f"PartitionKey ge '{_hour_partition(_change_ns(cursor))}'", f"RowKey gt '{cursor}'"]
+        entries = []
+        # Cross-partition range queries can return empty pages before the first match
+        for page, _ in self.azure_handler.iter_table_pages(self.table_name, ' and '.join(filters), page_size=limit):
+            if page:
+                entries = page
+                break
+
+        changes = [
+            {
+                'cursor': entry['RowKey'],
+                'application_number': entry['ApplicationNumber'],
+                'partition': entry.get('Partition'),
+                'operation': entry['Operation'],
+                'changes': json.loads(entry.get('Changes') or '{}'),
+                'previous': json.loads(entry.get('Previous') or '{}'),
+                'timestamp': datetime.fromtimestamp(_change_ns(entry['RowKey']) / 1e9, tz=timezone.utc),
+            }
+            for entry in entries
+        ]
+        return changes, changes[-1]['cursor'] if changes else (cursor or '')
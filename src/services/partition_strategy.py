@@ -0,0 +1,89 @@
+"""Partition Strategies for the VisaApplications table
+
+A partition strategy derives the PartitionKey of a visa application entity
+from its properties. The default keeps every application in the single
+'VisaApplication' partition; ``IntakeMonthPartitionStrategy`` spreads them
+over one partition per intake location and submission month so writes are
+not capped by a single hot partition.
+
+Strategies that spread applications over several partitions need a locator
+to find an application by number alone; ``VisaApplicationService`` keeps one
+in a companion table (see ``requires_locator``).
+"""
+
+import os
+import re
+from typing import Any, Dict, Optional, Tuple
+
+# Partition used by the single-partition layout
+DEFAULT_PARTITION = 'VisaApplication'
+
+# Characters not allowed in Table Storage keys, plus whitespace
+_KEY_UNSAFE = re.compile(r"[/\\#?\s\x00-\x1f\x7f-\x9f]+")
+
+
+def sanitize_key(value: str) -> str:
+    """Make a value safe for use in a PartitionKey or RowKey"""
+    return _KEY_UNSAFE.sub('-', value.strip()).strip('-')
+
+
+class PartitionStrategy:
+    """Derives the PartitionKey of an application entity"""
+
+    name = 'base'
+    # Whether application numbers must be mapped to partitions to locate entities
+    requires_locator = True
+    # Properties the PartitionKey is derived from
+    partition_fields: Tuple[str, ...] = ()
+
+    def partition_key(self, entity: Dict[str, Any]) -> str:
+        """Return the PartitionKey for an entity with VisaApplications properties"""
+        raise NotImplementedError
+
+
+class SinglePartitionStrategy(PartitionStrategy):
+    """All applications in one partition (the original layout)"""
+
+    name = 'single'
+    requires_locator = False
+
+    def __init__(self, partition: str = DEFAULT_PARTITION):
+        self.partition = partition
+
+    def partition_key(self, entity: Dict[str, Any]) -> str:
+        return self.partition
+
+
+class IntakeMonthPartitionStrategy(PartitionStrategy):
+    """One partition per intake location and submission month, e.g. 'Chennai-FO_2025-10'"""
+
+    name = 'intake_month'
+    partition_fields = ('IntakeLocation', 'SubmissionDate')
+
+    def partition_key(self, entity: Dict[str, Any]) -> str:
+        location = sanitize_key(str(entity.get('IntakeLocation') or '')) or 'Unknown'
+        submission_date = str(entity.get('SubmissionDate') or '')
+        month = submission_date[:7] if re.match(r"\d{4}-\d{2}", submission_date) else 'Undated'
+        return f"{location}_{month}"
+
+
+PARTITION_STRATEGIES = {
+    SinglePartitionStrategy.name: SinglePartitionStrategy,
+    IntakeMonthPartitionStrategy.name: IntakeMonthPartitionStrategy,
+}
+
+
+def get_partition_strategy(name: Optional[str] = None) -> PartitionStrategy:
+    """
+    Create a partition strategy by name
+
+    Args:
+        name: Strategy name (default: VISA_PARTITION_STRATEGY or 'single')
+
+    Returns:
+        The partition strategy
+    """
+    name = (name or os.getenv("VISA_PARTITION_STRATEGY") or SinglePartitionStrategy.name).strip().lower()
+    if name not in PARTITION_STRATEGIES:
+        raise ValueError(f"Unknown partition strategy '{name}', expected one of: {', '.join(PARTITION_STRATEGIES)}")
+    return PARTITION_STRATEGIES[name]()
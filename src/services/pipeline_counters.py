@@ -0,0 +1,172 @@
+"""Pipeline Counters for visa applications
+
+Materialized per-status totals in an aggregates table, maintained by
+``VisaApplicationService`` on every status transition, so pipeline statistics
+are read with a single partition query instead of a scan of all applications.
+
+Each status has ``COUNTER_SHARDS`` counter rows; a write updates one random
+shard with an ETag-conditional merge, so concurrent transitions rarely
+contend on the same entity. Readers sum the shards.
+
+Counters per status: Total, Urgent, Overdue (more than 30 days in process),
+and Dated and SubmissionDaySum (day ordinals) from which the average days in
+process follow for any day. Overdue changes with time rather than with
+transitions, so transitions leave it alone and only ``reconcile`` (scheduled
+e.g. daily) sets it; it is exact as of the last reconciliation. ``reconcile``
+also corrects any other drift.
+"""
+
+import logging
+import random
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.partition_strategy import sanitize_key
+from util.azure_entity_cache import entity_etag
+from util.table_functions import ResourceModifiedError
+
+logger = logging.getLogger(__name__)
+
+COUNTER_SHARDS = 8
+PIPELINE_PARTITION = 'Pipeline'
+COUNTER_FIELDS = ['Total', 'Urgent', 'Overdue', 'Dated', 'SubmissionDaySum']
+# Application properties the counters are derived from
+COUNTED_PROPERTIES = ('Status', 'IsUrgent', 'SubmissionDate')
+# Days in process after which an application is overdue (see util.date_functions.BUCKET_RED)
+OVERDUE_AFTER_DAYS = 30
+# Counters that only reconcile sets: deltas computed at transition time would use
+# that day's age and drift (or go negative) as the application ages
+RECONCILED_FIELDS = ('Overdue',)
+MAX_COUNTER_ATTEMPTS = 5
+# Stored as doubles: sums of day ordinals outgrow Int32 (exact up to 2**53)
+_DOUBLE_FIELDS = {'SubmissionDaySum'}
+
+
+def _stored(field: str, value: int) -> Any:
+    return float(value) if field in _DOUBLE_FIELDS else value
+
+
+def _loaded(value: Any) -> int:
+    return int(round(float(value or 0)))
+
+
+def _submission_ordinal(value: Any) -> int:
+    """Day ordinal of a submission date ('YYYY-MM-DD...'), 0 when missing or invalid"""
+    try:
+        return date.fromisoformat(str(value or '')[:10]).toordinal()
+    except ValueError:
+        return 0
+
+
+def application_counts(entity: Dict[str, Any], today: Optional[date] = None) -> Tuple[str, Dict[str, int]]:
+    """Return the status of an application entity and its contribution to that status' counters"""
+    submission_day = _submission_ordinal(entity.get('SubmissionDate'))
+    today_ordinal = (today or date.today()).toordinal()
+    return str(entity.get('Status') or ''), {
+        'Total': 1,
+        'Urgent': int(bool(entity.get('IsUrgent'))),
+        'Overdue': int(bool(submission_day) and today_ordinal - submission_day > OVERDUE_AFTER_DAYS),
+        'Dated': int(bool(submission_day)),
+        'SubmissionDaySum': submission_day,
+    }
+
+
+def transition_deltas(transitions: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> Dict[str, Dict[str, int]]:
+    """
+    Sum the counter changes of application writes
+
+    Fields in RECONCILED_FIELDS are left at zero.
+
+    Args:
+        transitions: (entity before, entity after) pairs; None for created or deleted applications
+
+    Returns:
+        Status -> counter deltas
+    """
+    deltas: Dict[str, Dict[str, int]] = {}
+    for before, after in transitions:
+        for entity, sign in ((before, -1), (after, 1)):
+            if entity is None:
+                continue
+            status, counts = application_counts(entity)
+            status_deltas = deltas.setdefault(status, dict.fromkeys(COUNTER_FIELDS, 0))
+            for field, value in counts.items():
+                if field not in RECONCILED_FIELDS:
+                    status_deltas[field] += sign * value
+    return {status: fields for status, fields in deltas.items() if any(fields.values())}
+
+
+class PipelineCounters:
+    """Sharded per-status counters in an aggregates table"""
+
+    def __init__(self, azure_handler, table_name: str):
+        self.azure_handler = azure_handler
+        self.table_name = table_name
+
+    def apply(self, deltas: Dict[str, Dict[str, int]]) -> None:
+        """
+        Add counter deltas (from ``transition_deltas``)
+
+        Failures are logged rather than raised; the next reconciliation corrects them.
+        """
+        for status, fields in deltas.items():
+            row_key = f"{sanitize_key(status) or '-'}|{random.randrange(COUNTER_SHARDS):02d}"
+            try:
+                self._apply_shard(row_key, status, fields)
+            except Exception as e:
+                logger.error(f"Error updating pipeline counters of status '{status}': {str(e)}")
+
+    def _apply_shard(self, row_key: str, status: str, fields: Dict[str, int]) -> None:
+        for attempt in range(MAX_COUNTER_ATTEMPTS):
+            shard = self.azure_handler.retrieve_entity(self.table_name, PIPELINE_PARTITION, row_key, use_cache=False)
+            if shard is None:
+                entity = {'PartitionKey': PIPELINE_PARTITION, 'RowKey': row_key, 'Status': status,
+                          **{field: _stored(field, fields.get(field, 0)) for field in COUNTER_FIELDS}}
+                if self.azure_handler.insert_entities(self.table_name, [entity], max_workers=1)[0]['success']:
+                    return
+                continue  # Created concurrently
+            entity = {'PartitionKey': PIPELINE_PARTITION, 'RowKey': row_key,
+                      **{field: _stored(field, _loaded(shard.get(field)) + fields.get(field, 0)) for field in COUNTER_FIELDS}}
+            try:
+                self.azure_handler.update_entity(self.table_name, entity, etag=entity_etag(shard))
+                return
+            except ResourceModifiedError:
+                continue
+        raise RuntimeError(f"Counter shard '{row_key}' kept changing after {MAX_COUNTER_ATTEMPTS} attempts")
+
+    def read(self) -> Dict[str, Dict[str, int]]:
+        """
+        Read the counters of all statuses
+
+        Returns:
+            Status -> Total, Urgent, Overdue, Dated and SubmissionDaySum summed over the shards
+        """
+        shards = self.azure_handler.retrieve_table_items(self.table_name, f"PartitionKey eq '{PIPELINE_PARTITION}'") or []
+        counters: Dict[str, Dict[str, int]] = {}
+        for shard in shards:
+            status_counters = counters.setdefault(shard.get('Status') or '', dict.fromkeys(COUNTER_FIELDS, 0))
+            for field in COUNTER_FIELDS:
+                status_counters[field] += _loaded(shard.get(field))
+        return counters
+
+    def reconcile(self, exact: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        """
+        Correct the counters to exact totals (e.g. from a full scan)
+
+        The difference is applied as a delta to one shard, so counter updates
+        of concurrent writers are not overwritten.
+
+        Returns:
+            Status -> the corrections that were applied
+        """
+        current = self.read()
+        drift = {}
+        for status in set(current) | set(exact):
+            fields = {
+                field: exact.get(status, {}).get(field, 0) - current.get(status, {}).get(field, 0)
+                for field in COUNTER_FIELDS
+            }
+            if any(fields.values()):
+                drift[status] = fields
+        self.apply(drift)
+        return drift
@@ -0,0 +1,174 @@
+"""Record Cache
+
+Process-wide cache of decoded applicant records, shared by every Streamlit
+session. Entries are evicted least recently used first once the configured
+memory budget is exceeded and expire after a time to live. Owners invalidate
+entries explicitly when the underlying data changes, and the hit/miss counters
+are exposed through ``stats`` for monitoring.
+
+Cached records are shared between sessions and must be treated as read-only.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Defaults, overridable with RECORD_CACHE_MAX_MB and RECORD_CACHE_TTL_SECONDS
+DEFAULT_MAX_MB = 64
+DEFAULT_TTL_SECONDS = 600
+
+
+class RecordCache:
+    """Thread-safe LRU cache bounded by an approximate memory budget and a TTL"""
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_bytes: Memory budget; entries are weighed by the size given to ``put``
+            ttl_seconds: Seconds an entry stays valid (None: no expiry)
+            clock: Monotonic time source
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Key -> (value, size, expiry time), least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """
+        Cache a value, evicting least recently used entries to stay within budget
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            size: Approximate size of the value in bytes
+        """
+        if size > self.max_bytes:
+            return
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else float('inf')
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Optional[Tuple[Any, int]]]) -> Optional[Any]:
+        """
+        Return a cached value or load and cache it
+
+        Args:
+            key: Cache key
+            load: Returns (value, size in bytes), or None when there is nothing to cache
+
+        Returns:
+            The cached or loaded value, or None
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        loaded = load()
+        if loaded is None:
+            return None
+        value, size = loaded
+        self.put(key, value, size)
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop a single entry; returns whether it was cached"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self.invalidations += 1
+            return True
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches the predicate; returns the number dropped"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters and occupancy for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide record cache
+_record_cache: Optional[RecordCache] = None
+_record_cache_lock = threading.Lock()
+
+
+def get_record_cache() -> RecordCache:
+    """Get or create the shared record cache, configured from the environment"""
+    global _record_cache
+    with _record_cache_lock:
+        if _record_cache is None:
+            max_mb = float(os.getenv("RECORD_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+            ttl_seconds = float(os.getenv("RECORD_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+            _record_cache = RecordCache(int(max_mb * 1024 * 1024), ttl_seconds if ttl_seconds > 0 else None)
+            logger.info(f"Record cache: {max_mb:g} MB budget, TTL {ttl_seconds:g} seconds")
+        return _record_cache
@@ -1,70 +1,241 @@
 """Service layer for Visa Application management"""
+import heapq
+import json
 import logging
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Callable, Tuple, Union, BinaryIO
+from datetime import datetime, timedelta
 import uuid
+import zlib
+
+from services.application_indexes import SecondaryIndex, application_indexes
+from services.application_schema import (
+    BOOLEAN_PROPERTIES, SCHEMA_PROPERTIES, UPDATABLE_FIELDS, ApplicationRecord, data_to_entity, data_to_patch
+)
+from services.change_feed import (
+    CHANGE_ARCHIVE, CHANGE_CREATE, CHANGE_DELETE, CHANGE_RESTORE, CHANGE_UPDATE, CHANGE_UPSERT, ChangeFeed
+)
+from services.partition_strategy import PartitionStrategy, get_partition_strategy
+from services.pipeline_counters import COUNTED_PROPERTIES, PipelineCounters, application_counts, transition_deltas
+from util.azure_entity_cache import entity_etag, get_entity_cache
+from util.export_functions import export_pages
+from util.table_functions import (
+    ResourceModifiedError, ResourceNotFoundError, decode_continuation_token, encode_continuation_token
+)
 
 logger = logging.getLogger(__name__)
 
+# Azure Table Storage accepts at most 100 operations per transaction
+MAX_BATCH_SIZE = 100
+
+# The locator table maps application numbers to partitions, spread over this many partitions
+LOCATOR_BUCKETS = 16
+# Locator table partition listing the partitions of the applications table
+PARTITION_REGISTRY = 'Partitions'
+
+# Attempts of a conditional update before giving up on concurrent modifications
+MAX_UPDATE_ATTEMPTS = 3
+
+# Terminal statuses of the Completed, Rejected and Rolled Back stages (see WORKFLOW_STAGES in pages/overview.py)
+ARCHIVABLE_STATUSES = [
+    'Completed', 'Closed', 'Archived',
+    'Rolled Back', 'Returned', 'Revision Required',
+    'Rejected', 'Declined', 'Refused',
+]
+
+# Days since the last update after which terminal applications are archived
+ARCHIVE_AFTER_DAYS = 90
+
+# Columns of a full export, in order
+EXPORT_COLUMNS = SCHEMA_PROPERTIES
+
+# Named column projections for list views; pass the name as ``select`` to list_applications
+APPLICATION_PROJECTIONS = {
+    # Active Applications table
+    'active_applications': [
+        'RowKey', 'ApplicationNumber', 'SubmissionDate', 'IntakeLocation', 'IsUrgent',
+        'CaseType', 'VisaTypeRequested', 'CountryOfNationality', 'Status'
+    ],
+    # Case assignment queue
+    'case_assignment': [
+        'RowKey', 'ApplicationNumber', 'CaseType', 'IntakeLocation', 'IsUrgent',
+        'SubmissionDate', 'CountryOfNationality', 'Status'
+    ],
+    # Overview pipeline statistics
+    'overview': ['RowKey', 'SubmissionDate', 'IsUrgent', 'Status'],
+}
+
+
+class ApplicationConflictError(Exception):
+    """A concurrent save changed the same fields of a visa application"""
+    
+    def __init__(self, application_number: str, fields: List[str]):
+        super().__init__(f"Visa application {application_number} was modified concurrently: {', '.join(fields)}")
+        self.application_number = application_number
+        self.fields = fields
+
+
+class ApplicationExistsError(ValueError):
+    """A visa application with the same application number already exists"""
+    
+    def __init__(self, application_number: str):
+        super().__init__(f"Visa application already exists: {application_number}")
+        self.application_number = application_number
+
 
 class VisaApplicationService:
     """Service for managing visa applications in Azure Table Storage"""
     
-    def __init__(self, azure_handler, table_name: str = "VisaApplications"):
+    def __init__(self, azure_handler, table_name: str = "VisaApplications",
+                 partition_strategy: Optional[PartitionStrategy] = None):
         self.azure_handler = azure_handler
         self.table_name = table_name
+        # Defaults to the strategy configured with VISA_PARTITION_STRATEGY
+        self.partition_strategy = partition_strategy or get_partition_strategy()
+        # Companion table mapping application numbers to partitions (see _locate)
+        self.locator_table = f"{table_name}Keys"
+        self._partitions: Optional[set] = None
+        self._partitions_lock = threading.Lock()
+        # Change log of all writes, see changes_since
+        self.change_feed = ChangeFeed(azure_handler, f"{table_name}Changes")
+        # Per-status pipeline counters of the hot table, see pipeline_counters
+        self.counters = PipelineCounters(azure_handler, f"{table_name}Aggregates")
+        # Terminal applications moved out of the hot table, see archive_applications
+        self.archive_table = f"{table_name}Archive"
+        # Secondary index tables, see find_by_status and friends
+        self.indexes = application_indexes(table_name)
+    
+    @staticmethod
+    def _locator_entity(application_number: str, partition_key: str) -> Dict[str, Any]:
+        """Map an application number to its partition, bucketed to spread locator writes"""
+        bucket = zlib.crc32(application_number.encode('utf-8')) % LOCATOR_BUCKETS
+        return {'PartitionKey': f"{bucket:02d}", 'RowKey': application_number, 'Partition': partition_key}
+    
+    def _locate_many(self, application_numbers: List[str]) -> List[Optional[str]]:
+        """Return the partition of each application, None for unknown applications"""
+        if not self.partition_strategy.requires_locator:
+            return [self.partition_strategy.partition_key({})] * len(application_numbers)
+        locators = self.azure_handler.retrieve_entities_many(
+            self.locator_table,
+            [(self._locator_entity(number, '')['PartitionKey'], number) for number in application_numbers]
+        )
+        return [locator['Partition'] if locator else None for locator in locators]
+    
+    def _locate(self, application_number: str) -> Optional[str]:
+        """Return the partition of an application, None for unknown applications"""
+        if not self.partition_strategy.requires_locator:
+            return self.partition_strategy.partition_key({})
+        key = self._locator_entity(application_number, '')
+        locator = self.azure_handler.retrieve_entity(self.locator_table, key['PartitionKey'], application_number)
+        return locator['Partition'] if locator else None
+    
+    def _register(self, entities: List[Dict[str, Any]]) -> None:
+        """
+        Record the partitions of application entities before they are written,
+        so they can be found by number and are included in cross-partition queries
+        """
+        if not self.partition_strategy.requires_locator or not entities:
+            return
+        new_partitions = {entity['PartitionKey'] for entity in entities} - set(self.partitions())
+        operations = [self._locator_entity(entity['RowKey'], entity['PartitionKey']) for entity in entities]
+        operations.extend({'PartitionKey': PARTITION_REGISTRY, 'RowKey': partition} for partition in new_partitions)
+        results = self.azure_handler.upsert_entities(self.locator_table, operations, max_workers=1)
+        failed = [result for result in results if not result['success']]
+        if failed:
+            raise RuntimeError(f"Failed to register {len(failed)} application locators: {failed[0]['error']}")
+        with self._partitions_lock:
+            self._partitions.update(new_partitions)
+    
+    def _claim(self, entity: Dict[str, Any]) -> bool:
+        """
+        Reserve the application number of a new application entity
+        
+        With a locator the create-only locator insert is the claim, so a number
+        cannot be created again in another partition. A locator without an
+        application (left by an interrupted create) may be taken over.
         
-    def create_application(self, application_data: Dict[str, Any]) -> str:
+        Returns:
+            True when the locator was written by the claim
+        
+        Raises:
+            ApplicationExistsError: The number is taken, in the hot table or the archive
+        """
+        application_number = entity['RowKey']
+        if self.partition_strategy.requires_locator:
+            locator = self._locator_entity(application_number, entity['PartitionKey'])
+            if self.azure_handler.insert_entity(self.locator_table, locator):
+                return True
+            taken = self.get_application(application_number) is not None
+        else:
+            # A duplicate in the hot table is refused by the insert itself
+            taken = self.azure_handler.retrieve_entity(self.archive_table, entity['PartitionKey'],
+                                                       application_number) is not None
+        if taken:
+            raise ApplicationExistsError(application_number)
+        return False
+    
+    def partitions(self) -> List[str]:
+        """
+        List the partitions of the applications table
+        
+        Returns:
+            Sorted PartitionKeys, read once per service from the locator table's registry
+        """
+        if not self.partition_strategy.requires_locator:
+            return [self.partition_strategy.partition_key({})]
+        with self._partitions_lock:
+            if self._partitions is None:
+                registry = self.azure_handler.retrieve_table_items(
+                    self.locator_table, f"PartitionKey eq '{PARTITION_REGISTRY}'", select=['RowKey']
+                )
+                self._partitions = {entity['RowKey'] for entity in registry or []}
+            return sorted(self._partitions)
+    
+    @staticmethod
+    def _partition_filter(partition_key: str, filter_query: Optional[str] = None) -> str:
+        """Restrict an optional OData filter to one partition"""
+        partition_filter = "PartitionKey eq '{}'".format(partition_key.replace("'", "''"))
+        return f"{partition_filter} and ({filter_query})" if filter_query else partition_filter
+    
+    def _build_entity(self, application_number: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map application data to a VisaApplications table entity (see services.application_schema)"""
+        now = datetime.utcnow().isoformat()
+        entity = data_to_entity(application_data)
+        entity.update(RowKey=application_number, ApplicationNumber=application_number, CreatedAt=now, UpdatedAt=now)
+        entity['PartitionKey'] = self.partition_strategy.partition_key(entity)
+        return entity
+    
+    def create_application(self, application_data: Union[Dict[str, Any], ApplicationRecord]) -> str:
         """
         Create a new visa application
         
         Args:
-            application_data: Dictionary containing visa application details
+            application_data: Dictionary containing visa application details, or an ApplicationRecord
             
         Returns:
             The application number (RowKey) of the created application
+            
+        Raises:
+            ApplicationExistsError: The application number is already taken
         """
         try:
+            if isinstance(application_data, ApplicationRecord):
+                application_data = application_data.to_data()
             # Generate unique application number if not provided
             application_number = application_data.get('application_number') or str(uuid.uuid4())
+            entity = self._build_entity(application_number, application_data)
             
-            # Prepare entity for Azure Table Storage
-            entity = {
-                'PartitionKey': 'VisaApplication',
-                'RowKey': application_number,
-                'ApplicationNumber': application_number,
-                'CaseType': application_data.get('case_type', ''),
-                'VisaTypeRequested': application_data.get('visa_type_requested', ''),
-                'ApplicationType': application_data.get('application_type', ''),
-                'SubmissionDate': application_data.get('submission_date', ''),
-                'IntakeLocation': application_data.get('intake_location', ''),
-                'ApplicantIsMinor': application_data.get('applicant_is_minor', False),
-                'IsUrgent': application_data.get('is_urgent', False),
-                'GivenName': application_data.get('given_name', ''),
-                'Surname': application_data.get('surname', ''),
-                'VariationInBirthCertificate': application_data.get('variation_in_birth_certificate', False),
-                'Gender': application_data.get('gender', ''),
-                'CountryOfNationality': application_data.get('country_of_nationality', ''),
-                'StreetNumber': application_data.get('street_number', ''),
-                'UnitNumber': application_data.get('unit_number', ''),
-                'PostalCode': application_data.get('postal_code', ''),
-                'City': application_data.get('city', ''),
-                'Country': application_data.get('country', ''),
-                'DateOfBirth': application_data.get('date_of_birth', ''),
-                'StateOfBirth': application_data.get('state_of_birth', ''),
-                'PlaceOfBirth': application_data.get('place_of_birth', ''),
-                'CountryOfBirth': application_data.get('country_of_birth', ''),
-                'ResidencyStatusInAustralia': application_data.get('residency_status_in_australia', ''),
-                'CivilStatus': application_data.get('civil_status', ''),
-                'PackagedMemberOfEU': application_data.get('packaged_member_of_eu', False),
-                'Occupation': application_data.get('occupation', ''),
-                'CreatedAt': datetime.utcnow().isoformat(),
-                'UpdatedAt': datetime.utcnow().isoformat(),
-                'CreatedBy': application_data.get('created_by', 'system'),
-                'Status': application_data.get('status', 'Draft')
-            }
-            
-            self.azure_handler.insert_entity(self.table_name, entity)
+            if not self._claim(entity) or entity['PartitionKey'] not in self.partitions():
+                self._register([entity])
+            # The index rows, change and counters follow only a confirmed insert
+            if not self.azure_handler.insert_entity(self.table_name, entity):
+                raise ApplicationExistsError(application_number)
+            self._propagate(CHANGE_CREATE, [entity], [(None, entity)], indexed=[entity])
             logger.info(f"Created visa application: {application_number}")
             return application_number
             
@@ -76,6 +247,9 @@ class VisaApplicationService:
         """
         Retrieve a visa application by application number
         
+        Archived applications are read from the archive table; they have an
+        'ArchivedAt' property.
+        
         Args:
             application_number: The application number (RowKey)
             
@@ -83,63 +257,154 @@ class VisaApplicationService:
             Dictionary containing application details or None if not found
         """
         try:
+            partition_key = self._locate(application_number)
+            if partition_key is None:
+                return None
             entity = self.azure_handler.retrieve_entity(
                 self.table_name,
-                'VisaApplication',
+                partition_key,
                 application_number
             )
+            if entity is None:
+                entity = self.azure_handler.retrieve_entity(self.archive_table, partition_key, application_number)
             return entity
         except Exception as e:
             logger.error(f"Error retrieving visa application: {str(e)}")
             raise
     
-    def update_application(self, application_number: str, application_data: Dict[str, Any]) -> None:
+    def get_application_record(self, application_number: str) -> Optional[ApplicationRecord]:
+        """Retrieve a visa application as a compact ApplicationRecord, None if not found"""
+        entity = self.get_application(application_number)
+        return ApplicationRecord.from_entity(entity) if entity is not None else None
+    
+    def get_applications(self, application_numbers: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieve many visa applications concurrently
+        
+        Args:
+            application_numbers: The application numbers (RowKeys)
+            
+        Returns:
+            Application dictionaries in the given order, None for missing applications
+        """
+        try:
+            partition_keys = self._locate_many(application_numbers)
+            located = [
+                (partition_key, application_number)
+                for partition_key, application_number in zip(partition_keys, application_numbers)
+                if partition_key is not None
+            ]
+            entities = self.azure_handler.retrieve_entities_many(self.table_name, located)
+            
+            # Fall through to the archive for the rest
+            missing = [key for key, entity in zip(located, entities) if entity is None]
+            if missing:
+                archived = iter(self.azure_handler.retrieve_entities_many(self.archive_table, missing))
+                entities = [entity if entity is not None else next(archived) for entity in entities]
+            
+            entities = iter(entities)
+            return [next(entities) if partition_key is not None else None for partition_key in partition_keys]
+        except Exception as e:
+            logger.error(f"Error retrieving visa applications: {str(e)}")
+            raise
+    
+    def update_application(self, application_number: str, application_data: Union[Dict[str, Any], ApplicationRecord],
+                           original: Optional[Union[Dict[str, Any], ApplicationRecord]] = None) -> Optional[str]:
         """
         Update an existing visa application
         
+        Only the fields that differ from the stored application are sent, as a
+        MERGE conditional on its ETag (If-Match). Pass the application as it was
+        loaded for editing (from ``get_application`` or ``get_application_record``)
+        as ``original``: the save is then a single round trip and saves made since
+        the application was loaded are detected. Without it the current
+        application is read first. When another save got in first, the
+        application is reloaded and the update retried, unless that save
+        changed one of the same fields differently.
+        
         Args:
             application_number: The application number (RowKey)
-            application_data: Dictionary containing updated application details
+            application_data: Dictionary containing updated application details, or an ApplicationRecord
+            original: Optional application entity (or record) the update is based on
+            
+        Returns:
+            The new ETag of the application (None when it moved partitions)
+            
+        Raises:
+            ValueError: The application does not exist
+            ApplicationConflictError: A concurrent save changed the same fields
         """
         try:
-            # Retrieve existing entity
-            existing_entity = self.get_application(application_number)
-            if not existing_entity:
-                raise ValueError(f"Application not found: {application_number}")
-            
-            # Update entity with new data
-            existing_entity.update({
-                'CaseType': application_data.get('case_type', existing_entity.get('CaseType')),
-                'VisaTypeRequested': application_data.get('visa_type_requested', existing_entity.get('VisaTypeRequested')),
-                'ApplicationType': application_data.get('application_type', existing_entity.get('ApplicationType')),
-                'SubmissionDate': application_data.get('submission_date', existing_entity.get('SubmissionDate')),
-                'IntakeLocation': application_data.get('intake_location', existing_entity.get('IntakeLocation')),
-                'ApplicantIsMinor': application_data.get('applicant_is_minor', existing_entity.get('ApplicantIsMinor')),
-                'IsUrgent': application_data.get('is_urgent', existing_entity.get('IsUrgent')),
-                'GivenName': application_data.get('given_name', existing_entity.get('GivenName')),
-                'Surname': application_data.get('surname', existing_entity.get('Surname')),
-                'VariationInBirthCertificate': application_data.get('variation_in_birth_certificate', existing_entity.get('VariationInBirthCertificate')),
-                'Gender': application_data.get('gender', existing_entity.get('Gender')),
-                'CountryOfNationality': application_data.get('country_of_nationality', existing_entity.get('CountryOfNationality')),
-                'StreetNumber': application_data.get('street_number', existing_entity.get('StreetNumber')),
-                'UnitNumber': application_data.get('unit_number', existing_entity.get('UnitNumber')),
-                'PostalCode': application_data.get('postal_code', existing_entity.get('PostalCode')),
-                'City': application_data.get('city', existing_entity.get('City')),
-                'Country': application_data.get('country', existing_entity.get('Country')),
-                'DateOfBirth': application_data.get('date_of_birth', existing_entity.get('DateOfBirth')),
-                'StateOfBirth': application_data.get('state_of_birth', existing_entity.get('StateOfBirth')),
-                'PlaceOfBirth': application_data.get('place_of_birth', existing_entity.get('PlaceOfBirth')),
-                'CountryOfBirth': application_data.get('country_of_birth', existing_entity.get('CountryOfBirth')),
-                'ResidencyStatusInAustralia': application_data.get('residency_status_in_australia', existing_entity.get('ResidencyStatusInAustralia')),
-                'CivilStatus': application_data.get('civil_status', existing_entity.get('CivilStatus')),
-                'PackagedMemberOfEU': application_data.get('packaged_member_of_eu', existing_entity.get('PackagedMemberOfEU')),
-                'Occupation': application_data.get('occupation', existing_entity.get('Occupation')),
-                'UpdatedAt': datetime.utcnow().isoformat(),
-                'Status': application_data.get('status', existing_entity.get('Status'))
-            })
-            
-            self.azure_handler.update_entity(self.table_name, existing_entity)
-            logger.info(f"Updated visa application: {application_number}")
+            if isinstance(application_data, ApplicationRecord):
+                application_data = application_data.to_data(UPDATABLE_FIELDS)
+            patch = data_to_patch(application_data)
+            base, etag = original, None
+            if isinstance(original, ApplicationRecord):
+                # Only records loaded from the table know their partition and ETag
+                base, etag = (original.to_entity(), original.etag) if original.partition_key is not None else (None, None)
+            if base is None:
+                # The save is conditional on the ETag of the base, and the new partition,
+                # index rows, change and pipeline counters are derived from it
+                base = self.get_application(application_number)
+                if not base:
+                    raise ValueError(f"Application not found: {application_number}")
+            if base.get('ArchivedAt') and any(base.get(field) != value for field, value in patch.items()):
+                # Archived applications move back to the hot table before they change
+                self.restore_application(application_number)
+                base, etag = self.get_application(application_number), None
+            if etag is None:
+                etag = entity_etag(base)
+            
+            for attempt in range(MAX_UPDATE_ATTEMPTS):
+                patch = {field: value for field, value in patch.items() if base.get(field) != value}
+                if not patch:
+                    logger.info(f"No changes to visa application: {application_number}")
+                    return etag
+                
+                partition_key = base['PartitionKey']
+                entity = {'PartitionKey': partition_key, 'RowKey': application_number, **patch,
+                          'UpdatedAt': datetime.utcnow().isoformat()}
+                new_partition_key = partition_key
+                if set(patch) & set(self.partition_strategy.partition_fields):
+                    new_partition_key = self.partition_strategy.partition_key({**base, **entity})
+                
+                try:
+                    if new_partition_key != partition_key:
+                        # A changed intake location or submission date moves the application
+                        self._move({**base, **entity}, new_partition_key, etag=etag)
+                        self._propagate(
+                            CHANGE_UPDATE,
+                            [{**entity, 'PartitionKey': new_partition_key, 'previous': self._previous(base, patch)}],
+                            [(base, {**base, **entity})],
+                            indexed=[entity], previous=[base]
+                        )
+                        logger.info(f"Updated visa application: {application_number}")
+                        return None
+                    
+                    etag = self.azure_handler.update_entity(self.table_name, entity, etag=etag)
+                    self._propagate(CHANGE_UPDATE, [{**entity, 'previous': self._previous(base, patch)}],
+                                    [(base, {**base, **entity})], indexed=[entity], previous=[base])
+                    logger.info(f"Updated visa application: {application_number}")
+                    return etag
+                except (ResourceNotFoundError, ResourceModifiedError):
+                    # Saved, moved or archived since the base was loaded
+                    current = self.get_application(application_number)
+                    if not current:
+                        raise ValueError(f"Application not found: {application_number}")
+                    if current.get('ArchivedAt'):
+                        self.restore_application(application_number)
+                        current = self.get_application(application_number)
+                    conflicts = [
+                        field for field, value in patch.items()
+                        if current.get(field) not in (base.get(field), value)
+                    ]
+                    if conflicts:
+                        raise ApplicationConflictError(application_number, conflicts)
+                    logger.info(f"Visa application {application_number} was modified concurrently, "
+                                f"retrying update (attempt {attempt + 2})")
+                    base, etag = current, entity_etag(current)
+            
+            raise ApplicationConflictError(application_number, list(patch))
             
         except Exception as e:
             logger.error(f"Error updating visa application: {str(e)}")
@@ -153,33 +418,847 @@ class VisaApplicationService:
             application_number: The application number (RowKey)
         """
         try:
+            # Read first: the pipeline counters need the status of the deleted application
+            existing_entity = self.get_application(application_number)
+            if existing_entity is None:
+                logger.warning(f"Visa application not found: {application_number}")
+                return
+            partition_key = existing_entity['PartitionKey']
+            archived = bool(existing_entity.get('ArchivedAt'))
             self.azure_handler.delete_entity(
-                'VisaApplication',
-                self.table_name,
+                partition_key,
+                self.archive_table if archived else self.table_name,
                 application_number
             )
+            if self.partition_strategy.requires_locator:
+                key = self._locator_entity(application_number, partition_key)
+                self.azure_handler.delete_entity(key['PartitionKey'], self.locator_table, application_number)
+            self._propagate(
+                CHANGE_DELETE,
+                [{'PartitionKey': partition_key, 'RowKey': application_number,
+                  'previous': {'Status': existing_entity.get('Status')}}],
+                # The counters only cover the hot table
+                [] if archived else [(existing_entity, None)],
+                unindexed=[existing_entity]
+            )
             logger.info(f"Deleted visa application: {application_number}")
         except Exception as e:
             logger.error(f"Error deleting visa application: {str(e)}")
             raise
     
-    def list_applications(self, filter_query: Optional[str] = None) -> List[Dict[str, Any]]:
+    def update_statuses(self, statuses: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Update the status of many visa applications in transactional batches
+        
+        Args:
+            statuses: Application number (RowKey) -> new status
+            
+        Returns:
+            Per-application results from ``AzureHandler.update_entities``
+        """
+        updated_at = datetime.utcnow().isoformat()
+        application_numbers = list(statuses)
+        # The previous statuses are needed for the pipeline counters
+        previous = dict(zip(application_numbers, self.get_applications(application_numbers)))
+        for application_number, entity in previous.items():
+            if entity and entity.get('ArchivedAt'):
+                self.restore_application(application_number)
+        partition_keys = [entity['PartitionKey'] if entity else None for entity in previous.values()]
+        entities = [
+            {'PartitionKey': partition_key, 'RowKey': application_number,
+             'Status': statuses[application_number], 'UpdatedAt': updated_at}
+            for partition_key, application_number in zip(partition_keys, application_numbers)
+            if partition_key is not None
+        ]
+        results = self.azure_handler.update_entities(self.table_name, entities)
+        updated_entities = [entity for entity, result in zip(entities, results) if result['success']]
+        self._propagate(
+            CHANGE_UPDATE,
+            [{**entity, 'previous': {'Status': previous[entity['RowKey']].get('Status')}} for entity in updated_entities],
+            [(previous[entity['RowKey']], {**previous[entity['RowKey']], **entity}) for entity in updated_entities],
+            indexed=updated_entities, previous=[previous[entity['RowKey']] for entity in updated_entities]
+        )
+        updated = iter(results)
+        results = [
+            next(updated) if partition_key is not None else
+            {'PartitionKey': None, 'RowKey': application_number, 'success': False, 'error': 'Application not found'}
+            for partition_key, application_number in zip(partition_keys, application_numbers)
+        ]
+        failed = [result['RowKey'] for result in results if not result['success']]
+        if failed:
+            logger.error(f"Failed to update the status of {len(failed)} visa applications: {', '.join(failed[:10])}")
+        logger.info(f"Updated the status of {len(results) - len(failed)} visa applications")
+        return results
+    
+    @staticmethod
+    def _previous(base: Optional[Dict[str, Any]], patch: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the former values of the patched fields, when the previous entity is known"""
+        return {field: base.get(field) for field in patch} if base is not None else {}
+    
+    def changes_since(self, cursor: Optional[str] = None, limit: int = 1000) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Read the application changes recorded after a cursor
+        
+        Consumers such as overview aggregates, the assignment queue and caches
+        apply these deltas instead of reloading all applications. Start from
+        ``latest_change_cursor()`` after a full load.
+        
+        Args:
+            cursor: Cursor returned by the previous call (None for the start of the feed)
+            limit: Maximum number of changes to return
+            
+        Returns:
+            Tuple of (changes in commit order, cursor for the next call), see ``ChangeFeed.changes_since``
+        """
+        return self.change_feed.changes_since(cursor, limit)
+    
+    def latest_change_cursor(self) -> str:
+        """Return the cursor of the current end of the change feed"""
+        return self.change_feed.latest_cursor()
+    
+    def sync_entity_cache(self, cursor: str) -> str:
+        """
+        Drop cached applications that were changed (e.g. by another instance) since a cursor
+        
+        Args:
+            cursor: Cursor returned by the previous call or latest_change_cursor
+            
+        Returns:
+            Cursor for the next call
+        """
+        cache = get_entity_cache()
+        account = getattr(self.azure_handler, 'account', None)  # Only AzureHandler reads through the cache
+        if account is None:
+            cache = None
+        while True:
+            changes, cursor = self.changes_since(cursor)
+            if cache:
+                for change in changes:
+                    for table_name in (self.table_name, self.archive_table):
+                        cache.invalidate(account, table_name, change['partition'], change['application_number'])
+            if len(changes) < 1000:
+                return cursor
+    
+    def archive_applications(self, older_than_days: int = ARCHIVE_AFTER_DAYS, page_size: int = MAX_BATCH_SIZE,
+                             dry_run: bool = False,
+                             progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Move terminal applications out of the hot table into the archive table
+        
+        Applications with a status in ARCHIVABLE_STATUSES that have not been
+        updated for ``older_than_days`` are copied to the archive table (same
+        keys, plus 'ArchivedAt') and then deleted from the hot table, page by
+        page. Reads by application number fall through to the archive, so
+        archived applications stay available; the hot table, its scans and the
+        pipeline counters only cover the open ones.
+        
+        An interrupted run leaves at most a copy in both tables, which the next
+        run resolves. Schedule it e.g. nightly.
+        
+        Args:
+            older_than_days: Days since the last update before an application is archived
+            page_size: Applications archived per batch
+            dry_run: Only count the applications that would be archived
+            progress: Optional callback receiving the running statistics after every page
+            
+        Returns:
+            Statistics: scanned, archived, failed
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+        statuses = ' or '.join(f"Status eq {self._quote(status)}" for status in ARCHIVABLE_STATUSES)
+        filter_query = f"({statuses}) and UpdatedAt lt '{cutoff}'"
+        
+        stats = {'scanned': 0, 'archived': 0, 'failed': 0}
+        # Continuation tokens hold the next keys, so deleting the rows already read is safe
+        for page in self.iter_application_pages(filter_query, page_size=page_size):
+            stats['scanned'] += len(page)
+            if dry_run:
+                stats['archived'] += len(page)
+            else:
+                archived_at = datetime.utcnow().isoformat()
+                copies = [dict(entity, ArchivedAt=archived_at) for entity in page]
+                results = self.azure_handler.upsert_entities(self.archive_table, copies, max_workers=1)
+                # Only delete the hot rows whose archive copy was written
+                written = [entity for entity, result in zip(page, results) if result['success']]
+                deleted = {
+                    result['RowKey'] for result in self.azure_handler.delete_entities(
+                        self.table_name,
+                        [{'PartitionKey': entity['PartitionKey'], 'RowKey': entity['RowKey']} for entity in written]
+                    )
+                    if result['success']
+                }
+                archived = [entity for entity in written if entity['RowKey'] in deleted]
+                self._propagate(
+                    CHANGE_ARCHIVE,
+                    [{'PartitionKey': entity['PartitionKey'], 'RowKey': entity['RowKey'], 'ArchivedAt': archived_at}
+                     for entity in archived],
+                    [(entity, None) for entity in archived]
+                )
+                stats['archived'] += len(archived)
+                stats['failed'] += len(page) - len(archived)
+            if progress:
+                progress(dict(stats))
+        
+        logger.info(f"Archived {stats['archived']} of {stats['scanned']} terminal applications of "
+                    f"'{self.table_name}' not updated for {older_than_days} days, {stats['failed']} failed")
+        return stats
+    
+    def restore_application(self, application_number: str) -> bool:
+        """
+        Move an archived application back to the hot table
+        
+        Args:
+            application_number: The application number (RowKey)
+            
+        Returns:
+            True when the application was restored, False when it is not archived
+        """
+        partition_key = self._locate(application_number)
+        if partition_key is None:
+            return False
+        archived = self.azure_handler.retrieve_entity(self.archive_table, partition_key, application_number,
+                                                      use_cache=False)
+        if archived is None:
+            return False
+        entity = {key: value for key, value in archived.items() if key != 'ArchivedAt'}
+        result = self.azure_handler.upsert_entities(self.table_name, [entity], max_workers=1)[0]
+        if not result['success']:
+            raise RuntimeError(f"Failed to restore application {application_number}: {result['error']}")
+        self.azure_handler.delete_entity(partition_key, self.archive_table, application_number)
+        self._propagate(CHANGE_RESTORE, [{'PartitionKey': partition_key, 'RowKey': application_number}],
+                        [(None, entity)])
+        logger.info(f"Restored archived visa application: {application_number}")
+        return True
+    
+    def pipeline_counters(self) -> Dict[str, Dict[str, int]]:
+        """
+        Read the pipeline counters of all statuses in one partition query
+        
+        Returns:
+            Status -> Total, Urgent, Overdue, Dated and SubmissionDaySum (see ``services.pipeline_counters``)
+        """
+        return self.counters.read()
+    
+    def reconcile_counters(self, page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Recount the pipeline counters from the applications and correct any drift
+        
+        Overdue counts only change through this job as applications age, so run
+        it periodically (e.g. daily) as well as after imports.
+        
+        Args:
+            page_size: Applications read per page
+            
+        Returns:
+            Statistics: scanned, drift (status -> corrections applied)
+        """
+        exact: Dict[str, Dict[str, int]] = {}
+        scanned = 0
+        for page, _ in self.azure_handler.iter_table_pages(self.table_name, None, select=list(COUNTED_PROPERTIES),
+                                                           page_size=page_size):
+            for entity in page:
+                status, counts = application_counts(entity)
+                status_counts = exact.setdefault(status, dict.fromkeys(counts, 0))
+                for field, value in counts.items():
+                    status_counts[field] += value
+            scanned += len(page)
+        
+        drift = self.counters.reconcile(exact)
+        logger.info(f"Reconciled the pipeline counters of '{self.table_name}' over {scanned} applications, "
+                    f"{len(drift)} statuses corrected")
+        return {'scanned': scanned, 'drift': drift}
+    
+    def _propagate(self, operation: str, changes: List[Dict[str, Any]],
+                   transitions: List[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+                   indexed: Optional[List[Dict[str, Any]]] = None,
+                   previous: Optional[List[Optional[Dict[str, Any]]]] = None,
+                   unindexed: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Record a write of applications in the secondary indexes, the change feed
+        and the pipeline counters
+        
+        These are separate tables, so their writes (one per index table, one for
+        the change feed, one per counter shard) are issued concurrently instead of
+        one round trip after another. All of them are best effort and log their
+        failures: the applications themselves are already saved.
+        
+        Args:
+            operation: Change feed operation (CHANGE_*)
+            changes: Change feed entries, see ChangeFeed.append
+            transitions: (entity before, entity after) pairs for the pipeline counters
+            indexed: Written entities (or patches) to index, see _index
+            previous: The indexed entities as they were before the write
+            unindexed: Removed entities whose index rows are deleted
+        """
+        writes = self._index_writes(indexed, previous) if indexed else []
+        if unindexed:
+            writes.extend(self._unindex_writes(unindexed))
+        if changes:
+            writes.append(partial(self.change_feed.append, operation, changes))
+        writes.extend(
+            partial(self.counters.apply, {status: fields}) for status, fields in transition_deltas(transitions).items()
+        )
+        self._run_concurrently(writes)
+    
+    @staticmethod
+    def _run_concurrently(writes: List[Callable[[], None]]) -> None:
+        if len(writes) <= 1:
+            for write in writes:
+                write()
+            return
+        with ThreadPoolExecutor(max_workers=len(writes)) as executor:
+            for future in [executor.submit(write) for write in writes]:
+                future.result()
+    
+    def _index(self, entities: List[Dict[str, Any]],
+               previous: Optional[List[Optional[Dict[str, Any]]]] = None) -> None:
+        """
+        Write the secondary index rows of written application entities
+        
+        Only indexes whose property is present in an entity are touched, so
+        patches can be passed as they were sent. With the entities as they were
+        before the write, outdated index rows are removed as well; otherwise
+        lookups drop them when they come across them. Failures are logged, not
+        raised: the application itself is already saved and rebuild_indexes
+        repairs the indexes.
+        """
+        self._run_concurrently(self._index_writes(entities, previous))
+    
+    def _index_writes(self, entities: List[Dict[str, Any]],
+                      previous: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[Callable[[], None]]:
+        """Return the writes of _index, one per index table to change"""
+        writes = []
+        for index in self.indexes.values():
+            entries, outdated = [], []
+            for position, entity in enumerate(entities):
+                if index.field not in entity:
+                    continue
+                entry = index.entry(entity)
+                if entry:
+                    entries.append(entry)
+                old_key = index.key(previous[position]) if previous and previous[position] else None
+                if old_key is not None and old_key != index.key(entity):
+                    outdated.append({'PartitionKey': old_key, 'RowKey': entity['RowKey']})
+            if entries or outdated:
+                writes.append(partial(self._write_index, index, entries, outdated))
+        return writes
+    
+    def _unindex_writes(self, entities: List[Dict[str, Any]]) -> List[Callable[[], None]]:
+        """Return the deletes of the index rows of removed application entities, one per index table"""
+        writes = []
+        for index in self.indexes.values():
+            entries = [entry for entry in map(index.entry, entities) if entry]
+            if entries:
+                writes.append(partial(self._write_index, index, [], entries))
+        return writes
+    
+    def _write_index(self, index: SecondaryIndex, entries: List[Dict[str, Any]],
+                     outdated: List[Dict[str, Any]]) -> None:
+        """Upsert the rows of one index table (batched per partition) and delete its outdated rows"""
+        try:
+            results = self.azure_handler.upsert_entities(index.table_name, entries, max_workers=1) if entries else []
+            if outdated:
+                results += self.azure_handler.delete_entities(index.table_name, outdated, max_workers=1)
+            failed = [result for result in results if not result['success']]
+            if failed:
+                logger.error(f"Failed to update {len(failed)} rows of index '{index.table_name}': {failed[0]['error']}")
+        except Exception as e:
+            logger.error(f"Error updating index '{index.table_name}': {str(e)}")
+    
+    def _find(self, index: SecondaryIndex, filter_query: str) -> List[Dict[str, Any]]:
+        """Return the applications an index query points to, dropping stale index rows"""
+        entries = self.azure_handler.retrieve_table_items(index.table_name, filter_query, select=['PartitionKey', 'RowKey']) or []
+        applications = self.get_applications([entry['RowKey'] for entry in entries])
+        
+        found, stale = [], []
+        for entry, application in zip(entries, applications):
+            if application is not None and index.key(application) == entry['PartitionKey']:
+                found.append(application)
+            else:
+                stale.append({'PartitionKey': entry['PartitionKey'], 'RowKey': entry['RowKey']})
+        if stale:
+            logger.info(f"Removing {len(stale)} stale rows from index '{index.table_name}'")
+            self.azure_handler.delete_entities(index.table_name, stale, max_workers=1)
+        return found
+    
+    @staticmethod
+    def _quote(value: str) -> str:
+        return "'{}'".format(value.replace("'", "''"))
+    
+    def find_by_status(self, status: str) -> List[Dict[str, Any]]:
+        """
+        Find visa applications by status through the status index
+        
+        Args:
+            status: Application status, e.g. 'Submitted'
+            
+        Returns:
+            Application dictionaries in application number order
+        """
+        index = self.indexes['status']
+        key = index.normalize(status)
+        if key is None:
+            return []
+        return self._find(index, f"PartitionKey eq {self._quote(key)}")
+    
+    def find_by_surname(self, surname: str, prefix: bool = False) -> List[Dict[str, Any]]:
+        """
+        Find visa applications by surname (case-insensitive) through the surname index
+        
+        Args:
+            surname: Surname, or the start of surnames with ``prefix``
+            prefix: Match all surnames starting with ``surname``
+            
+        Returns:
+            Application dictionaries in surname order
+        """
+        index = self.indexes['surname']
+        key = index.normalize(surname)
+        if key is None:
+            return []
+        if not prefix:
+            return self._find(index, f"PartitionKey eq {self._quote(key)}")
+        upper = key[:-1] + chr(ord(key[-1]) + 1)
+        return self._find(index, f"PartitionKey ge {self._quote(key)} and PartitionKey lt {self._quote(upper)}")
+    
+    def find_by_submission_day(self, start: str, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find visa applications submitted on a day or in a range of days through the submission day index
+        
+        Args:
+            start: First day (YYYY-MM-DD)
+            end: Optional last day, inclusive (default: ``start``)
+            
+        Returns:
+            Application dictionaries in submission day order
+        """
+        index = self.indexes['submission_day']
+        first, last = index.normalize(start), index.normalize(end or start)
+        if first is None or last is None:
+            raise ValueError("Submission days must be given as YYYY-MM-DD")
+        if first == last:
+            return self._find(index, f"PartitionKey eq {self._quote(first)}")
+        return self._find(index, f"PartitionKey ge {self._quote(first)} and PartitionKey le {self._quote(last)}")
+    
+    def rebuild_indexes(self, page_size: int = 500,
+                        progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Repair the secondary indexes
+        
+        Rewrites the index rows of every application, then removes index rows
+        whose application no longer exists or no longer has the indexed value.
+        Safe to run while the application is in use.
+        
+        Args:
+            page_size: Rows read per page
+            progress: Optional callback receiving the running statistics after every page
+            
+        Returns:
+            Statistics: scanned (applications), removed (stale index rows)
+        """
+        stats = {'scanned': 0, 'removed': 0}
+        for page, _ in self.azure_handler.iter_table_pages(self.table_name, None, page_size=page_size):
+            self._index(page)
+            stats['scanned'] += len(page)
+            if progress:
+                progress(dict(stats))
+        
+        for index in self.indexes.values():
+            for page, _ in self.azure_handler.iter_table_pages(index.table_name, None, select=['PartitionKey', 'RowKey'],
+                                                               page_size=page_size):
+                applications = self.get_applications([entry['RowKey'] for entry in page])
+                stale = [
+                    {'PartitionKey': entry['PartitionKey'], 'RowKey': entry['RowKey']}
+                    for entry, application in zip(page, applications)
+                    if application is None or index.key(application) != entry['PartitionKey']
+                ]
+                if stale:
+                    results = self.azure_handler.delete_entities(index.table_name, stale, max_workers=1)
+                    stats['removed'] += sum(1 for result in results if result['success'])
+                if progress:
+                    progress(dict(stats))
+        
+        logger.info(f"Rebuilt the indexes of '{self.table_name}': {stats['scanned']} applications indexed, "
+                    f"{stats['removed']} stale index rows removed")
+        return stats
+    
+    def list_applications(self, filter_query: Optional[str] = None,
+                          select: Optional[Union[str, List[str]]] = None,
+                          partitions: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         List all visa applications with optional filtering
         
+        With several partitions the filter is run on every partition in
+        parallel and the results are merged in application number order.
+        
         Args:
             filter_query: Optional OData filter query
+            select: Optional projection: a name from APPLICATION_PROJECTIONS or a list of
+                    properties. Only these properties are retrieved.
+            partitions: Optional partitions to query (default: all partitions)
             
         Returns:
             List of application dictionaries
         """
         try:
-            if filter_query:
-                entities = self.azure_handler.retrieve_table_items(self.table_name, filter_query)
-            else:
-                entities = self.azure_handler.retrieve_table_items(self.table_name, "PartitionKey eq 'VisaApplication'")
+            select = self._resolve_projection(select)
+            filters = [self._partition_filter(partition, filter_query) for partition in partitions or self.partitions()]
+            
+            if len(filters) == 1:
+                entities = self.azure_handler.retrieve_table_items(self.table_name, filters[0], select=select)
+                return list(entities) if entities else []
             
-            return list(entities) if entities else []
+            results = self.azure_handler.query_many(self.table_name, filters, select=select)
+            # Each partition is returned in RowKey order
+            return list(heapq.merge(*results, key=lambda entity: entity.get('RowKey') or ''))
         except Exception as e:
             logger.error(f"Error listing visa applications: {str(e)}")
             raise
+    
+    def list_applications_page(self, filter_query: Optional[str] = None,
+                               select: Optional[Union[str, List[str]]] = None, page_size: int = 25,
+                               continuation_token: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List one page of visa applications in a single round trip
+        
+        Partitions are read one after another in PartitionKey order; a page
+        that ends a partition is filled up from the next one.
+        
+        Args:
+            filter_query: Optional OData filter query
+            select: Optional projection, as for list_applications
+            page_size: Number of applications per page
+            continuation_token: Token returned with the previous page (None for the first page)
+            
+        Returns:
+            Tuple of (applications, token of the next page or None on the last page)
+        """
+        try:
+            select = self._resolve_projection(select)
+            partitions = self.partitions()
+            position = decode_continuation_token(continuation_token) or {}
+            partition_token = position.get('Token')
+            remaining = [partition for partition in partitions if partition >= position.get('Partition', '')]
+            
+            page: List[Dict[str, Any]] = []
+            while remaining and len(page) < page_size:
+                partition = remaining[0]
+                entities, partition_token = self.azure_handler.retrieve_table_page(
+                    self.table_name,
+                    self._partition_filter(partition, filter_query),
+                    select=select,
+                    page_size=page_size - len(page),
+                    continuation_token=partition_token
+                )
+                page.extend(entities)
+                if partition_token is None:
+                    remaining.pop(0)
+            
+            if not remaining:
+                return page, None
+            return page, encode_continuation_token({'Partition': remaining[0], 'Token': partition_token})
+        except Exception as e:
+            logger.error(f"Error listing visa applications: {str(e)}")
+            raise
+    
+    def iter_application_pages(self, filter_query: Optional[str] = None,
+                               select: Optional[Union[str, List[str]]] = None,
+                               page_size: int = 25) -> Iterator[List[Dict[str, Any]]]:
+        """Yield visa applications page by page, fetching each page on demand"""
+        continuation_token = None
+        while True:
+            page, continuation_token = self.list_applications_page(filter_query, select, page_size, continuation_token)
+            yield page
+            if continuation_token is None:
+                return
+    
+    def _move(self, entity: Dict[str, Any], partition_key: str, etag: Optional[str] = None) -> None:
+        """
+        Re-key an application entity to another partition
+        
+        The entity is written to its new partition before the old one is
+        deleted, so an interruption leaves a duplicate rather than a loss;
+        running the move (or repartition) again resolves it.
+        
+        With an ETag the move is conditional: the old entity is first updated
+        with If-Match (raising ResourceModifiedError or ResourceNotFoundError
+        when a concurrent save changed or moved it, before anything is written)
+        and only deleted if it is still unchanged; otherwise the new copy is
+        removed again and ResourceModifiedError raised.
+        """
+        old_partition_key = entity['PartitionKey']
+        if etag:
+            etag = self.azure_handler.update_entity(self.table_name, entity, etag=etag)
+        moved = dict(entity, PartitionKey=partition_key)
+        self._register([moved])
+        result = self.azure_handler.upsert_entities(self.table_name, [moved], max_workers=1)[0]
+        if not result['success']:
+            raise RuntimeError(f"Failed to move application {entity['RowKey']} to partition '{partition_key}': {result['error']}")
+        try:
+            self.azure_handler.delete_entity(old_partition_key, self.table_name, entity['RowKey'], etag=etag)
+        except ResourceModifiedError:
+            self.azure_handler.delete_entity(partition_key, self.table_name, entity['RowKey'])
+            self._register([entity])
+            raise
+    
+    def repartition(self, dry_run: bool = False, page_size: int = 500,
+                    progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Re-key all applications to this service's partition strategy
+        
+        Scans the whole table and moves every application whose PartitionKey
+        differs from the one the strategy derives, in per-partition batches.
+        Locators are (re)written for every application, so the migration is
+        idempotent and an interrupted run can simply be started again.
+        
+        Args:
+            dry_run: Only count the applications that would move
+            page_size: Applications read per page
+            progress: Optional callback receiving the running statistics after every page
+            
+        Returns:
+            Statistics: scanned, moved, failed, partitions (target partitions seen)
+        """
+        stats = {'scanned': 0, 'moved': 0, 'failed': 0, 'partitions': 0}
+        target_partitions = set()
+        for page, _ in self.azure_handler.iter_table_pages(self.table_name, None, page_size=page_size):
+            # Target partition -> (old keys, re-keyed entities)
+            moves: Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = {}
+            current = []
+            for entity in page:
+                partition_key = self.partition_strategy.partition_key(entity)
+                target_partitions.add(partition_key)
+                if partition_key == entity['PartitionKey']:
+                    current.append(entity)
+                else:
+                    old_keys, entities = moves.setdefault(partition_key, ([], []))
+                    old_keys.append({'PartitionKey': entity['PartitionKey'], 'RowKey': entity['RowKey']})
+                    entities.append(dict(entity, PartitionKey=partition_key))
+            stats['scanned'] += len(page)
+            
+            if dry_run:
+                stats['moved'] += sum(len(entities) for _, entities in moves.values())
+            else:
+                self._register(current)
+                for old_keys, entities in moves.values():
+                    self._register(entities)
+                    results = self.azure_handler.upsert_entities(self.table_name, entities, max_workers=1)
+                    # Only delete the old copies of entities that were written to their new partition
+                    written = [key for key, result in zip(old_keys, results) if result['success']]
+                    deleted = sum(1 for result in self.azure_handler.delete_entities(self.table_name, written)
+                                  if result['success'])
+                    stats['moved'] += deleted
+                    stats['failed'] += len(entities) - deleted
+            
+            stats['partitions'] = len(target_partitions)
+            if progress:
+                progress(dict(stats))
+        
+        logger.info(f"Repartitioned '{self.table_name}' with the '{self.partition_strategy.name}' strategy: "
+                    f"{stats['moved']} of {stats['scanned']} applications moved, {stats['failed']} failed")
+        return stats
+    
+    def export_applications(self, output: BinaryIO, format: str = 'csv', compression: str = 'gzip',
+                            select: Optional[Union[str, List[str]]] = None, filter_query: Optional[str] = None,
+                            page_size: int = 1000, include_archived: bool = False,
+                            progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Stream visa applications to a CSV, JSONL or Parquet file
+        
+        Pages are fetched with the projection and written as they arrive, so
+        memory use stays constant however large the table is.
+        
+        Args:
+            output: Writable binary stream (file, stdout buffer, ...); left open
+            format: 'csv', 'jsonl' or 'parquet'
+            compression: 'gzip' or 'none' for CSV and JSONL; 'snappy', 'zstd', 'gzip' or 'none' for Parquet
+            select: Optional projection, as for list_applications (default: EXPORT_COLUMNS)
+            filter_query: Optional OData filter query
+            page_size: Applications fetched per page
+            include_archived: Also export the archived applications, after the open ones
+            progress: Optional callback receiving the running statistics after every page
+            
+        Returns:
+            Statistics: rows, elapsed_seconds, rows_per_second
+        """
+        columns = self._resolve_projection(select) or EXPORT_COLUMNS
+        pages = self.iter_application_pages(filter_query, columns, page_size)
+        if include_archived:
+            archived_pages = (
+                page for page, _ in self.azure_handler.iter_table_pages(self.archive_table, filter_query, select=columns,
+                                                                        page_size=page_size)
+            )
+            pages = chain(pages, archived_pages)
+        stats = export_pages(
+            pages,
+            output,
+            format,
+            columns,
+            compression=compression,
+            column_types={field: 'bool' for field in BOOLEAN_PROPERTIES},
+            progress=progress
+        )
+        logger.info(f"Exported {stats['rows']} applications as {format} at {stats['rows_per_second']:.0f} rows/sec")
+        return stats
+    
+    @staticmethod
+    def _resolve_projection(select: Optional[Union[str, List[str]]]) -> Optional[List[str]]:
+        """Map a projection name to its property list"""
+        if isinstance(select, str):
+            if select not in APPLICATION_PROJECTIONS:
+                raise ValueError(f"Unknown projection '{select}'")
+            return APPLICATION_PROJECTIONS[select]
+        return select
+    
+    def import_applications(self, records: Iterable[Tuple[str, Dict[str, Any]]], batch_size: int = MAX_BATCH_SIZE,
+                            max_workers: int = 4, checkpoint_path: Optional[str] = None,
+                            progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Bulk import visa applications with transactional batches
+        
+        Records are mapped like ``create_application``, grouped by partition and
+        upserted in transactions of up to ``batch_size`` entities, with at most
+        ``max_workers`` transactions in flight. Upserts make re-imports idempotent;
+        the indexed properties of the stored applications are read first, so the
+        index rows of values a re-import changes are replaced rather than left
+        behind. Each batch's locators are written before the batch itself. Imports
+        do not maintain the pipeline counters; run ``reconcile_counters`` afterwards.
+        
+        With a checkpoint file, the resume key up to which all records are
+        imported is saved after every batch; a later run with the same file and
+        source skips the records up to that key. Keys identify records (e.g. by
+        file name) rather than their position in the stream, so files that become
+        unreadable or are added do not shift what a resume skips. Records without
+        an application number are skipped, records of failed batches are retried
+        on resume.
+        
+        Args:
+            records: (resume key, application data) pairs in increasing key order
+                (see ``util.import_functions.iter_application_data``)
+            batch_size: Entities per transaction (at most 100)
+            max_workers: Maximum number of concurrent transactions
+            checkpoint_path: Optional file used to resume an interrupted import
+            progress: Optional callback receiving the running statistics after every batch
+            
+        Returns:
+            Statistics: imported, failed, skipped, resumed_after (resume key or None),
+            elapsed_seconds, rows_per_second
+        """
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"Batch size must be between 1 and {MAX_BATCH_SIZE}")
+        
+        resumed_after = self._read_checkpoint(checkpoint_path)
+        if resumed_after is not None:
+            logger.info(f"Resuming import into '{self.table_name}' after record '{resumed_after}'")
+        
+        stats = {'imported': 0, 'failed': 0, 'skipped': 0, 'resumed_after': resumed_after,
+                 'elapsed_seconds': 0.0, 'rows_per_second': 0.0}
+        lock = threading.Lock()
+        # Ordinals of records read but not yet imported -> resume key of the record read before
+        # each; the checkpoint is that key of the lowest pending record, or the last key read
+        pending: Dict[int, Optional[str]] = {}
+        last_key = [resumed_after]
+        in_flight = threading.BoundedSemaphore(max_workers)
+        started = time.perf_counter()
+        indexed_fields = sorted({'PartitionKey', 'RowKey', *(index.field for index in self.indexes.values())})
+        
+        def checkpoint() -> None:
+            self._write_checkpoint(checkpoint_path, pending[min(pending)] if pending else last_key[0])
+        
+        def submit(batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+            try:
+                entities = [entity for _, entity in batch]
+                self._register(entities)
+                # Queries rather than point reads: new applications are not worth a warning
+                stored = self.azure_handler.query_many(
+                    self.table_name,
+                    [f"PartitionKey eq {self._quote(entity['PartitionKey'])} and RowKey eq {self._quote(entity['RowKey'])}"
+                     for entity in entities],
+                    select=indexed_fields
+                )
+                results = self.azure_handler.upsert_entities(self.table_name, entities, max_workers=1)
+                imported = [(entity, rows[0] if rows else None)
+                            for entity, rows, result in zip(entities, stored, results) if result['success']]
+                self._propagate(CHANGE_UPSERT, [entity for entity, _ in imported], [],
+                                indexed=[entity for entity, _ in imported],
+                                previous=[previous for _, previous in imported])
+            except Exception as e:
+                results = [{'RowKey': entity['RowKey'], 'success': False, 'error': str(e)} for _, entity in batch]
+            finally:
+                in_flight.release()
+            
+            failed = [result for result in results if not result['success']]
+            if failed:
+                logger.error(f"Importing {len(failed)} of {len(batch)} applications failed "
+                             f"(first: {failed[0]['RowKey']}): {failed[0]['error']}")
+            
+            with lock:
+                for (ordinal, _), result in zip(batch, results):
+                    if result['success']:
+                        stats['imported'] += 1
+                        pending.pop(ordinal, None)
+                    else:
+                        stats['failed'] += 1
+                checkpoint()
+                stats['elapsed_seconds'] = time.perf_counter() - started
+                stats['rows_per_second'] = stats['imported'] / stats['elapsed_seconds'] if stats['elapsed_seconds'] else 0.0
+                if progress:
+                    progress(dict(stats))
+        
+        unread = (
+            (key, application_data) for key, application_data in records
+            if resumed_after is None or key > resumed_after
+        )
+        partitions: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            
+            def flush(partition_key: str) -> None:
+                batch = partitions.pop(partition_key)
+                in_flight.acquire()  # Bound the number of transactions in flight
+                executor.submit(submit, batch)
+            
+            for ordinal, (key, application_data) in enumerate(unread):
+                application_number = application_data.get('application_number')
+                with lock:
+                    previous_key, last_key[0] = last_key[0], key
+                    if not application_number:
+                        stats['skipped'] += 1
+                        continue
+                    pending[ordinal] = previous_key
+                
+                entity = self._build_entity(application_number, application_data)
+                batch = partitions.setdefault(entity['PartitionKey'], [])
+                batch.append((ordinal, entity))
+                if len(batch) >= batch_size:
+                    flush(entity['PartitionKey'])
+            
+            for partition_key in list(partitions):
+                flush(partition_key)
+        
+        with lock:
+            # Records skipped at the end of the source are covered by the checkpoint too
+            checkpoint()
+        stats['elapsed_seconds'] = time.perf_counter() - started
+        stats['rows_per_second'] = stats['imported'] / stats['elapsed_seconds'] if stats['elapsed_seconds'] else 0.0
+        logger.info(f"Imported {stats['imported']} applications into '{self.table_name}' "
+                    f"({stats['failed']} failed, {stats['skipped']} skipped) "
+                    f"at {stats['rows_per_second']:.0f} rows/sec")
+        return stats
+    
+    @staticmethod
+    def _read_checkpoint(checkpoint_path: Optional[str]) -> Optional[str]:
+        """Return the resume key up to which records are imported according to a checkpoint file"""
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('after')
+    
+    @staticmethod
+    def _write_checkpoint(checkpoint_path: Optional[str], after: Optional[str]) -> None:
+        """Atomically record the resume key up to which all records are imported"""
+        if not checkpoint_path:
+            return
+        temp_path = f"{checkpoint_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'after': after, 'updated_at': datetime.utcnow().isoformat()}, f)
+        os.replace(temp_path, checkpoint_path)
@@ -0,0 +1,265 @@
+import asyncio
+import logging
+from azure.data.tables import UpdateMode, TableTransactionError
+from azure.data.tables.aio import TableServiceClient, TableClient
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError, AzureError, ResourceExistsError
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+
+from util.azure_entity_cache import account_name
+from util.azure_functions import AzureHandler
+from util.table_functions import (
+    DEFAULT_PAGE_SIZE, ChunkSubmission, batch_results, decode_continuation_token, encode_continuation_token,
+    transaction_chunks
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAzureHandler:
+    """
+    Async twin of AzureHandler built on the azure.data.tables.aio clients.
+
+    The clients are bound to the event loop they are used on, so create the
+    handler inside the coroutine that uses it and close it when done:
+
+        async with AsyncAzureHandler(connection_string) as handler:
+            entities = await handler.retrieve_entities_many(table_name, keys)
+    """
+
+    def __init__(self, connection_string: str, max_concurrency: int = 25):
+        self.connection_string = connection_string
+        self.account = account_name(connection_string)  # Scopes the entity cache
+        self.max_concurrency = max_concurrency
+        self._service_client: Optional[TableServiceClient] = None
+        self.table_clients = {}  # Cache for table clients
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncAzureHandler":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes the table clients and their connections."""
+        for table_client in self.table_clients.values():
+            await table_client.close()
+        self.table_clients = {}
+        if self._service_client is not None:
+            await self._service_client.close()
+            self._service_client = None
+
+    def _get_service_client(self) -> TableServiceClient:
+        if self._service_client is None:
+            self._service_client = TableServiceClient.from_connection_string(self.connection_string)
+        return self._service_client
+
+    def _get_table_client(self, table_name: str) -> TableClient:
+        """Returns the table client for the given table, using a cache for reuse."""
+        if table_name not in self.table_clients:
+            self.table_clients[table_name] = self._get_service_client().get_table_client(table_name)
+        return self.table_clients[table_name]
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Bounds the number of concurrent requests of the fan-out helpers."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def retrieve_entity(self, table_name: str, partition_key: str, row_key: str) -> Optional[Dict[str, Any]]:
+        """Retrieves an entity from the given table by partition and row key."""
+        try:
+            table_client = self._get_table_client(table_name)
+            return await table_client.get_entity(partition_key=partition_key, row_key=row_key)
+        except ResourceNotFoundError:
+            logger.warning(f"Entity not found in table '{table_name}' with PartitionKey: '{partition_key}' and RowKey: '{row_key}'")
+            return None
+        except AzureError as e:
+            logger.error(f"Azure error occurred while retrieving entity: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {str(e)}")
+            raise
+
+    async def retrieve_table(self, table_name: str, partition_key: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """Retrieves all entities of a partition."""
+        return await self.retrieve_table_items(table_name, f"PartitionKey eq '{partition_key}'")
+
+    async def retrieve_table_items(self, table_name: str, filter: Optional[str] = None,
+                                   select: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """Retrieves all entities matching an OData filter (all entities without a filter), optionally projected."""
+        try:
+            table_client = self._get_table_client(table_name)
+            if filter:
+                entities = table_client.query_entities(filter, select=select)
+            else:
+                entities = table_client.list_entities(select=select)
+            return [entity async for entity in entities]
+        except ResourceNotFoundError:
+            logger.warning(f"Entity not found in table '{table_name}'")
+            return None
+        except AzureError as e:
+            logger.error(f"Azure error occurred while retrieving entity: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {str(e)}")
+            raise
+
+    async def retrieve_table_page(self, table_name: str, filter: Optional[str] = None,
+                                  select: Optional[List[str]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                                  continuation_token: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Retrieves one page of entities and the opaque continuation token of the next page (None on the last page)."""
+        try:
+            table_client = self._get_table_client(table_name)
+            if filter:
+                entities = table_client.query_entities(filter, select=select, results_per_page=page_size)
+            else:
+                entities = table_client.list_entities(select=select, results_per_page=page_size)
+            pages = entities.by_page(continuation_token=decode_continuation_token(continuation_token))
+            page = []
+            async for entities_page in pages:
+                page = [entity async for entity in entities_page]
+                break
+            return page, encode_continuation_token(pages.continuation_token)
+        except ResourceNotFoundError:
+            logger.warning(f"Entity not found in table '{table_name}'")
+            return [], None
+        except AzureError as e:
+            logger.error(f"Azure error occurred while retrieving entity: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {str(e)}")
+            raise
+
+    async def retrieve_entities_many(self, table_name: str,
+                                     keys: Iterable[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieves many entities concurrently, so the total latency is close to a
+        single round trip. Returns the entities in key order, None for missing ones.
+        """
+        semaphore = self._get_semaphore()
+
+        async def fetch(partition_key: str, row_key: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.retrieve_entity(table_name, partition_key, row_key)
+
+        return await asyncio.gather(*(fetch(partition_key, row_key) for partition_key, row_key in keys))
+
+    async def query_many(self, table_name: str, filters: Iterable[str],
+                         select: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        """Runs several OData filter queries concurrently; returns one result list per filter."""
+        semaphore = self._get_semaphore()
+
+        async def query(filter: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.retrieve_table_items(table_name, filter, select) or []
+
+        return await asyncio.gather(*(query(filter) for filter in filters))
+
+    def _log_success(self, operation: str, entity: Dict[str, Any]) -> None:
+        """Logs success messages for insert/update operations."""
+        logger.info(f"{operation} entity with PartitionKey: {entity['PartitionKey']} and RowKey: {entity['RowKey']}")
+
+    # Writes drop the entities from the entity cache, as AzureHandler's do
+    _invalidate_cached = AzureHandler._invalidate_cached
+
+    async def insert_entity(self, table_name: str, entity: Dict[str, Any]) -> bool:
+        """Inserts a new entity into the given table. Returns False when it already exists."""
+        table_client = self._get_table_client(table_name)
+        try:
+            await table_client.create_entity(entity)
+            self._log_success("Inserted", entity)
+            return True
+        except ResourceExistsError:
+            logger.warning(f"Entity already exists in table '{table_name}' with PartitionKey: {entity['PartitionKey']} and RowKey: {entity['RowKey']}")
+            return False
+        finally:
+            self._invalidate_cached(table_name, entity['PartitionKey'], entity['RowKey'])
+
+    async def update_entity(self, table_name: str, entity: Dict[str, Any],
+                            etag: Optional[str] = None) -> Optional[str]:
+        """Updates (merges) an existing entity, conditionally with If-Match when an ETag is given. Returns the new ETag."""
+        table_client = self._get_table_client(table_name)
+        conditions = {'etag': etag, 'match_condition': MatchConditions.IfNotModified} if etag else {}
+        try:
+            metadata = await table_client.update_entity(entity=entity, mode=UpdateMode.MERGE, **conditions)
+        finally:
+            self._invalidate_cached(table_name, entity['PartitionKey'], entity['RowKey'])
+        self._log_success("Updated", entity)
+        return (metadata or {}).get('etag')
+
+    async def delete_entity(self, partition_key: str, table_name: str, row_key: str,
+                            etag: Optional[str] = None) -> None:
+        """Deletes an entity, conditionally with If-Match when an ETag is given."""
+        table_client = self._get_table_client(table_name)
+        conditions = {'etag': etag, 'match_condition': MatchConditions.IfNotModified} if etag else {}
+        try:
+            await table_client.delete_entity(partition_key=partition_key, row_key=row_key, **conditions)
+        finally:
+            self._invalidate_cached(table_name, partition_key, row_key)
+
+    async def upsert_entities(self, table_name: str, entities: Iterable[Dict[str, Any]],
+                              mode: UpdateMode = UpdateMode.MERGE) -> List[Dict[str, Any]]:
+        """Inserts or updates entities in transactional batches (see _submit_batched)."""
+        return await self._submit_batched(table_name, [('upsert', entity, {'mode': mode}) for entity in entities])
+
+    async def insert_entities(self, table_name: str, entities: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Inserts new entities in transactional batches; existing entities are reported as failed."""
+        return await self._submit_batched(table_name, [('create', entity, {}) for entity in entities])
+
+    async def update_entities(self, table_name: str, entities: Iterable[Dict[str, Any]],
+                              mode: UpdateMode = UpdateMode.MERGE) -> List[Dict[str, Any]]:
+        """Updates existing entities in transactional batches; missing entities are reported as failed."""
+        return await self._submit_batched(table_name, [('update', entity, {'mode': mode}) for entity in entities])
+
+    async def delete_entities(self, table_name: str, keys: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deletes entities (dicts with at least PartitionKey and RowKey) in transactional batches."""
+        operations = [('delete', {'PartitionKey': key['PartitionKey'], 'RowKey': key['RowKey']}, {}) for key in keys]
+        return await self._submit_batched(table_name, operations)
+
+    async def _submit_batched(self, table_name: str,
+                              operations: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Submits the operations as concurrent per-partition transactions of at
+        most 100 operations. Same results as AzureHandler._submit_batched.
+        """
+        results = batch_results(operations)
+        table_client = self._get_table_client(table_name)
+        semaphore = self._get_semaphore()
+
+        async def submit(chunk: List[int]) -> None:
+            submission = ChunkSubmission(results, chunk)
+            async with semaphore:
+                while submission.pending:
+                    try:
+                        await table_client.submit_transaction(submission.batch(operations))
+                    except TableTransactionError as e:
+                        submission.failed(e, e.index)
+                    except Exception as e:
+                        logger.error(f"Transaction of {len(submission.remaining)} operations on table '{table_name}' failed: {str(e)}")
+                        submission.failed(e)
+                    else:
+                        submission.succeeded()
+
+        try:
+            await asyncio.gather(*(submit(chunk) for chunk in transaction_chunks(operations)))
+        finally:
+            for _, entity, _ in operations:
+                self._invalidate_cached(table_name, entity['PartitionKey'], entity['RowKey'])
+        return results
+
+    async def check_table_exists(self, table_name: str) -> bool:
+        """Checks if a table exists in Azure Table Storage."""
+        async for table in self._get_service_client().list_tables():
+            if table.name == table_name:
+                return True
+        return False
+
+    async def create_tables(self, table_name_list) -> None:
+        for name in table_name_list:
+            try:
+                await self._get_service_client().create_table(name)
+                logger.info(f"Created table {name}")
+            except ResourceExistsError:
+                logger.info(f"Table {name} already exists")
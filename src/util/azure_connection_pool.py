@@ -0,0 +1,120 @@
+"""
+Azure Connection Pool
+One TableServiceClient per connection string and process, sharing a single
+pooled HTTP transport across all tables, handlers and Streamlit sessions, so
+TLS connections are reused instead of being opened per session and table.
+
+Configured with environment variables:
+    AZURE_POOL_SIZE: Maximum connections kept per host (default 20)
+    AZURE_POOL_KEEPALIVE_SECONDS: TCP keep-alive idle time of pooled connections (default 60, 0 disables)
+"""
+import logging
+import os
+import socket
+import threading
+from typing import Any, Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import RequestsTransport
+from azure.data.tables import TableServiceClient, TableClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 20
+DEFAULT_KEEPALIVE_SECONDS = 60
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTP adapter that enables TCP keep-alive on pooled connections"""
+
+    def __init__(self, pool_size: int, keepalive_seconds: int):
+        self.keepalive_seconds = keepalive_seconds
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.keepalive_seconds > 0:
+            from urllib3.connection import HTTPConnection
+            socket_options = list(HTTPConnection.default_socket_options)
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_seconds))
+            if hasattr(socket, 'TCP_KEEPINTVL'):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, self.keepalive_seconds // 4)))
+            kwargs['socket_options'] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class ConnectionPool:
+    """Shared HTTP session, transport and service clients of the process"""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, keepalive_seconds: int = DEFAULT_KEEPALIVE_SECONDS):
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+        self._lock = threading.Lock()
+        self._adapter = _PooledAdapter(pool_size, keepalive_seconds)
+        self._session = requests.Session()
+        self._session.mount('https://', self._adapter)
+        self._session.mount('http://', self._adapter)
+        self.transport = RequestsTransport(session=self._session, session_owner=False)
+        self._service_clients: Dict[str, TableServiceClient] = {}
+        self._table_clients: Dict[Tuple[str, str], TableClient] = {}
+
+    def get_service_client(self, connection_string: str) -> TableServiceClient:
+        """Returns the shared TableServiceClient of a connection string"""
+        with self._lock:
+            client = self._service_clients.get(connection_string)
+            if client is None:
+                client = TableServiceClient.from_connection_string(connection_string, transport=self.transport)
+                self._service_clients[connection_string] = client
+            return client
+
+    def get_table_client(self, connection_string: str, table_name: str) -> TableClient:
+        """Returns the shared TableClient of a table; it reuses the service client's transport"""
+        key = (connection_string, table_name)
+        with self._lock:
+            client = self._table_clients.get(key)
+        if client is None:
+            client = self.get_service_client(connection_string).get_table_client(table_name)
+            with self._lock:
+                client = self._table_clients.setdefault(key, client)
+        return client
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection reuse metrics over all hosts of the pool"""
+        connections = 0
+        requests_sent = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+        return {
+            'pool_size': self.pool_size,
+            'keepalive_seconds': self.keepalive_seconds,
+            'hosts': len(pools),
+            'connections_opened': connections,
+            'requests': requests_sent,
+            'reuse_ratio': 1 - connections / requests_sent if requests_sent else 0.0,
+            'service_clients': len(self._service_clients),
+            'table_clients': len(self._table_clients),
+        }
+
+
+# Process-wide connection pool
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """Get or create the process-wide connection pool, configured from the environment"""
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            pool_size = int(os.getenv("AZURE_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+            keepalive_seconds = int(os.getenv("AZURE_POOL_KEEPALIVE_SECONDS", str(DEFAULT_KEEPALIVE_SECONDS)))
+            _connection_pool = ConnectionPool(pool_size, keepalive_seconds)
+            logger.info(f"Azure connection pool: {pool_size} connections per host, keep-alive {keepalive_seconds}s")
+        return _connection_pool
@@ -0,0 +1,123 @@
+"""
+Azure Entity Cache
+Process-wide read-through cache for point reads (retrieve_entity), keyed by
+(storage account, table, PartitionKey, RowKey). Entries are served without a
+request for a short TTL; that is the only work the cache saves. Table Storage
+ignores If-None-Match on entity reads, so a stale entry is read again in full
+and its ETag compared with the response, which counts how often entries were
+still unchanged (a hint for tuning the TTL). Local writes invalidate entries.
+
+Configured with environment variables:
+    AZURE_ENTITY_CACHE_TTL_SECONDS: Seconds an entry is served without a request (default 30, 0 disables the cache)
+    AZURE_ENTITY_CACHE_MAX_MB: Approximate memory budget (default 16)
+"""
+import copy
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from services.record_cache import RecordCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_MAX_MB = 16
+
+# (account, table, PartitionKey, RowKey)
+EntityKey = Tuple[str, str, str, str]
+
+
+def account_name(connection_string: str) -> str:
+    """
+    Returns the storage account a connection string points at, to scope cache keys.
+    Connection strings without an AccountName (e.g. SAS or local) are identified by a digest.
+    """
+    for part in (connection_string or '').split(';'):
+        key, _, value = part.partition('=')
+        if key.strip().lower() == 'accountname' and value:
+            return value.strip()
+    return hashlib.sha1((connection_string or '').encode('utf-8')).hexdigest()[:16]
+
+
+def entity_etag(entity: Dict[str, Any]) -> Optional[str]:
+    """Returns the ETag of an entity returned by the Table Storage SDK."""
+    metadata = getattr(entity, 'metadata', None) or {}
+    return metadata.get('etag')
+
+
+def _estimate_size(entity: Dict[str, Any]) -> int:
+    return 64 + sum(len(str(key)) + len(str(value)) for key, value in entity.items())
+
+
+class EntityCache:
+    """LRU entity cache with TTL freshness; stale entries are re-read and compared by ETag"""
+
+    def __init__(self, ttl_seconds: float, max_bytes: int, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        # Entries are kept past their TTL (no expiry) so re-reads can be compared with them
+        self._entries = RecordCache(max_bytes, None, clock)
+        self._lock = threading.Lock()
+        self.stale_reads = 0
+        self.unchanged = 0
+
+    def lookup(self, key: EntityKey) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """Returns (copy of the entity, whether it is still fresh), or None when not cached"""
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        entity, fetched_at = cached
+        return copy.copy(entity), self._clock() - fetched_at < self.ttl_seconds
+
+    def store(self, key: EntityKey, entity: Dict[str, Any], unchanged: bool = False) -> Dict[str, Any]:
+        """Caches an entity (fresh from now on) and returns a copy for the caller"""
+        if unchanged:
+            with self._lock:
+                self.unchanged += 1
+        self._entries.put(key, (copy.copy(entity), self._clock()), _estimate_size(entity))
+        return copy.copy(entity)
+
+    def record_stale_read(self) -> None:
+        with self._lock:
+            self.stale_reads += 1
+
+    def invalidate(self, account: str, table_name: str, partition_key: str, row_key: str) -> None:
+        """Drops a single entity, e.g. after a local write"""
+        self._entries.invalidate((account, table_name, partition_key, row_key))
+
+    def invalidate_table(self, account: str, table_name: str) -> int:
+        """Drops all entities of a table"""
+        return self._entries.invalidate_where(lambda key: key[:2] == (account, table_name))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._entries.stats()
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['stale_reads'] = self.stale_reads
+        stats['unchanged'] = self.unchanged
+        return stats
+
+
+# Process-wide entity cache (None when disabled)
+_entity_cache: Optional[EntityCache] = None
+_entity_cache_configured = False
+_entity_cache_lock = threading.Lock()
+
+
+def get_entity_cache() -> Optional[EntityCache]:
+    """Get or create the process-wide entity cache; None when disabled by configuration"""
+    global _entity_cache, _entity_cache_configured
+    with _entity_cache_lock:
+        if not _entity_cache_configured:
+            ttl_seconds = float(os.getenv("AZURE_ENTITY_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+            max_mb = float(os.getenv("AZURE_ENTITY_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+            if ttl_seconds > 0:
+                _entity_cache = EntityCache(ttl_seconds, int(max_mb * 1024 * 1024))
+                logger.info(f"Entity cache: TTL {ttl_seconds:g} seconds, {max_mb:g} MB budget")
+            _entity_cache_configured = True
+        return _entity_cache
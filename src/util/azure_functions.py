@@ -1,30 +1,61 @@
 import logging
 import streamlit as st
-from azure.data.tables import TableServiceClient, UpdateMode
+from azure.data.tables import TableServiceClient, UpdateMode, TableTransactionError
+from azure.core import MatchConditions
 from azure.core.exceptions import ResourceNotFoundError, AzureError, ResourceExistsError
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 import os
 
+from util.azure_connection_pool import DEFAULT_POOL_SIZE, get_connection_pool
+from util.table_functions import (
+    DEFAULT_PAGE_SIZE, ChunkSubmission, batch_results, decode_continuation_token, encode_continuation_token,
+    transaction_chunks
+)
+from util.azure_entity_cache import account_name, entity_etag, get_entity_cache
+
 logger = logging.getLogger(__name__)
 
 class AzureHandler:
     def __init__(self, connection_string: str):
         self.connection_string = connection_string
+        self.account = account_name(connection_string)  # Scopes the entity cache
         self.table_clients = {}  # Cache for table clients
 
     def _get_table_client(self, table_name: str) -> TableServiceClient:
-        """Returns the table client for the given table, using a cache for reuse."""
+        """Returns the table client for the given table from the process-wide connection pool."""
         if table_name not in self.table_clients:
-            table_service_client = TableServiceClient.from_connection_string(self.connection_string)
-            self.table_clients[table_name] = table_service_client.get_table_client(table_name)
+            self.table_clients[table_name] = get_connection_pool().get_table_client(self.connection_string, table_name)
         return self.table_clients[table_name]
 
-    def retrieve_entity(self, table_name: str, partition_key: str, row_key: str) -> Optional[Dict[str, Any]]:
-        """Retrieves an entity from the given table by partition and row key."""
+    def retrieve_entity(self, table_name: str, partition_key: str, row_key: str,
+                        use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Retrieves an entity from the given table by partition and row key.
+
+        Reads go through the process-wide entity cache: fresh entries are served
+        without a request. Table Storage does not honor If-None-Match on entity
+        reads, so stale entries are read again in full; their ETag is compared
+        with the response only to count unchanged entries in the cache stats.
+        Returned entities are copies and may be modified.
+        """
+        cache = get_entity_cache() if use_cache else None
+        key = (self.account, table_name, partition_key, row_key)
+        cached = cache.lookup(key) if cache else None
+        if cached is not None and cached[1]:
+            return cached[0]
+
         try:
             table_client = self._get_table_client(table_name)
-            return table_client.get_entity(partition_key=partition_key, row_key=row_key)
+            entity = table_client.get_entity(partition_key=partition_key, row_key=row_key)
+            if cached is not None:
+                cache.record_stale_read()
+                etag = entity_etag(cached[0])
+                return cache.store(key, entity, unchanged=bool(etag) and etag == entity_etag(entity))
+            return cache.store(key, entity) if cache else entity
         except ResourceNotFoundError:
+            if cache:
+                cache.invalidate(self.account, table_name, partition_key, row_key)
             logger.warning(f"Entity not found in table '{table_name}' with PartitionKey: '{partition_key}' and RowKey: '{row_key}'")
             return None
         except AzureError as e:
@@ -48,10 +79,17 @@ class AzureHandler:
             logger.error(f"An unexpected error occurred: {str(e)}")
             raise
 
-    def retrieve_table_items(self, table_name: str, filter: Optional[str] = None):
+    def retrieve_table_items(self, table_name: str, filter: Optional[str] = None,
+                             select: Optional[List[str]] = None):
+        """
+        Queries entities matching an OData filter (all entities without a filter).
+        With ``select`` only the listed properties are transferred and deserialized.
+        """
         try:
             table_client = self._get_table_client(table_name)
-            return table_client.query_entities(filter)
+            if filter:
+                return table_client.query_entities(filter, select=select)
+            return table_client.list_entities(select=select)
         except ResourceNotFoundError:
             logger.warning(f"Entity not found in table '{table_name}'")
             return None
@@ -62,43 +100,194 @@ class AzureHandler:
             logger.error(f"An unexpected error occurred: {str(e)}")
             raise
 
+    def retrieve_table_page(self, table_name: str, filter: Optional[str] = None,
+                            select: Optional[List[str]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                            continuation_token: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Retrieves one page of entities matching an OData filter in a single round trip.
+
+        Returns the entities and an opaque continuation token for the next page
+        (None on the last page). Pass the token back to fetch the next page.
+        """
+        try:
+            table_client = self._get_table_client(table_name)
+            if filter:
+                entities = table_client.query_entities(filter, select=select, results_per_page=page_size)
+            else:
+                entities = table_client.list_entities(select=select, results_per_page=page_size)
+            pages = entities.by_page(continuation_token=decode_continuation_token(continuation_token))
+            page = list(next(pages, []))
+            return page, encode_continuation_token(pages.continuation_token)
+        except ResourceNotFoundError:
+            logger.warning(f"Entity not found in table '{table_name}'")
+            return [], None
+        except AzureError as e:
+            logger.error(f"Azure error occurred while retrieving entity: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {str(e)}")
+            raise
+
+    def iter_table_pages(self, table_name: str, filter: Optional[str] = None,
+                         select: Optional[List[str]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                         continuation_token: Optional[str] = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Yields (page, continuation token of the next page) until the last page, one round trip per page."""
+        while True:
+            page, continuation_token = self.retrieve_table_page(table_name, filter, select, page_size, continuation_token)
+            yield page, continuation_token
+            if continuation_token is None:
+                return
+
+    def retrieve_entities_many(self, table_name: str, keys: Iterable[Tuple[str, str]],
+                               max_concurrency: int = DEFAULT_POOL_SIZE) -> List[Optional[Dict[str, Any]]]:
+        """
+        Retrieves many entities concurrently on the pooled client, so fetching N
+        entities costs about one round trip instead of N. Reads go through the
+        entity cache like retrieve_entity. Returns the entities in key order,
+        None for missing ones.
+        """
+        keys = list(keys)
+        if not keys:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(keys)))) as executor:
+            return list(executor.map(lambda key: self.retrieve_entity(table_name, *key), keys))
+
+    def query_many(self, table_name: str, filters: Iterable[str], select: Optional[List[str]] = None,
+                   max_concurrency: int = DEFAULT_POOL_SIZE) -> List[List[Dict[str, Any]]]:
+        """Runs several OData filter queries concurrently on the pooled client; returns one result list per filter."""
+        filters = list(filters)
+        if not filters:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(filters)))) as executor:
+            return list(executor.map(
+                lambda filter: list(self.retrieve_table_items(table_name, filter, select) or []), filters
+            ))
+
     def _log_success(self, operation: str, entity: Dict[str, Any]) -> None:
         """Logs success messages for insert/update operations."""
         logger.info(f"{operation} entity with PartitionKey: {entity['PartitionKey']} and RowKey: {entity['RowKey']}")
 
-    def insert_entity(self, table_name: str, entity: Dict[str, Any]) -> None:
-        """Inserts a new entity into the given table."""
+    def insert_entity(self, table_name: str, entity: Dict[str, Any]) -> bool:
+        """Inserts a new entity into the given table. Returns False when it already exists."""
         table_client = self._get_table_client(table_name)
         try:
             table_client.create_entity(entity)
             self._log_success("Inserted", entity)
+            return True
         except ResourceExistsError:
             logger.warning(f"Entity already exists in table '{table_name}' with PartitionKey: {entity['PartitionKey']} and RowKey: {entity['RowKey']}")
+            return False
+        finally:
+            self._invalidate_cached(table_name, entity['PartitionKey'], entity['RowKey'])
 
-    def update_entity(self, table_name: str, entity: Dict[str, Any]) -> None:
-        """Updates an existing entity in the given table."""
+    def update_entity(self, table_name: str, entity: Dict[str, Any], etag: Optional[str] = None) -> Optional[str]:
+        """
+        Updates (merges) an existing entity in the given table. With an ETag the update
+        is sent with If-Match and raises ResourceModifiedError when the entity changed
+        since it was read. Returns the new ETag.
+        """
         table_client = self._get_table_client(table_name)
-        table_client.update_entity(entity=entity, mode=UpdateMode.MERGE)
+        conditions = {'etag': etag, 'match_condition': MatchConditions.IfNotModified} if etag else {}
+        try:
+            metadata = table_client.update_entity(entity=entity, mode=UpdateMode.MERGE, **conditions)
+        finally:
+            self._invalidate_cached(table_name, entity['PartitionKey'], entity['RowKey'])
         self._log_success("Updated", entity)
+        return (metadata or {}).get('etag')
 
-    def delete_entity(self, partition_key: str, table_name: str, row_key: str):
+    def delete_entity(self, partition_key: str, table_name: str, row_key: str, etag: Optional[str] = None):
+        """Deletes an entity; with an ETag only if it is unchanged, raising ResourceModifiedError otherwise."""
         table_client: TableServiceClient = self._get_table_client(table_name)
-        table_client.delete_entity(partition_key=partition_key, row_key=row_key)
+        conditions = {'etag': etag, 'match_condition': MatchConditions.IfNotModified} if etag else {}
+        try:
+            table_client.delete_entity(partition_key=partition_key, row_key=row_key, **conditions)
+        finally:
+            self._invalidate_cached(table_name, partition_key, row_key)
+
+    def _invalidate_cached(self, table_name: str, partition_key: str, row_key: str) -> None:
+        """Drops a locally written entity from the entity cache."""
+        cache = get_entity_cache()
+        if cache:
+            cache.invalidate(self.account, table_name, partition_key, row_key)
+
+
+    def upsert_entities(self, table_name: str, entities: Iterable[Dict[str, Any]],
+                        mode: UpdateMode = UpdateMode.MERGE, max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Inserts or updates entities in transactional batches (see _submit_batched)."""
+        return self._submit_batched(table_name, [('upsert', entity, {'mode': mode}) for entity in entities], max_workers)
+
+    def insert_entities(self, table_name: str, entities: Iterable[Dict[str, Any]],
+                        max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Inserts new entities in transactional batches; existing entities are reported as failed."""
+        return self._submit_batched(table_name, [('create', entity, {}) for entity in entities], max_workers)
+
+    def update_entities(self, table_name: str, entities: Iterable[Dict[str, Any]],
+                        mode: UpdateMode = UpdateMode.MERGE, max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Updates existing entities in transactional batches; missing entities are reported as failed."""
+        return self._submit_batched(table_name, [('update', entity, {'mode': mode}) for entity in entities], max_workers)
+
+    def delete_entities(self, table_name: str, keys: Iterable[Dict[str, Any]],
+                        max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Deletes entities (dicts with at least PartitionKey and RowKey) in transactional batches."""
+        operations = [('delete', {'PartitionKey': key['PartitionKey'], 'RowKey': key['RowKey']}, {}) for key in keys]
+        return self._submit_batched(table_name, operations, max_workers)
+
+    def _submit_batched(self, table_name: str, operations: List[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+                        max_workers: int) -> List[Dict[str, Any]]:
+        """
+        Groups operations by PartitionKey, splits them into transactions of at most
+        100 operations and submits the transactions in parallel.
+
+        Returns one result per operation, in input order:
+        {'PartitionKey', 'RowKey', 'success', 'error'}.
+        """
+        results = batch_results(operations)
+        chunks = transaction_chunks(operations)
+        if not chunks:
+            return results
+
+        table_client = self._get_table_client(table_name)
+
+        def submit(chunk: List[int]) -> None:
+            submission = ChunkSubmission(results, chunk)
+            while submission.pending:
+                try:
+                    table_client.submit_transaction(submission.batch(operations))
+                except TableTransactionError as e:
+                    submission.failed(e, e.index)
+                except Exception as e:
+                    logger.error(f"Transaction of {len(submission.remaining)} operations on table '{table_name}' failed: {str(e)}")
+                    submission.failed(e)
+                else:
+                    submission.succeeded()
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+                list(executor.map(submit, chunks))
+        finally:
+            for _, entity, _ in operations:
+                self._invalidate_cached(table_name, entity['PartitionKey'], entity['RowKey'])
+
+        failures = sum(1 for result in results if not result['success'])
+        logger.info(f"Submitted {len(operations)} operations to table '{table_name}' in {len(chunks)} transactions"
+                    + (f" ({failures} failed)" if failures else ""))
+        return results
     
     
     def check_table_exists(self, table_name: str) -> bool:
         """Checks if a table exists in Azure Table Storage."""
-        table_service_client = TableServiceClient.from_connection_string(self.connection_string)
+        table_service_client = get_connection_pool().get_service_client(self.connection_string)
         tables = table_service_client.list_tables()
         return any(table.name == table_name for table in tables)
     
     def create_tables(self, table_name_list):
+        # The shared service client must not be closed, so it is not used as a context manager
+        table_service_client = get_connection_pool().get_service_client(self.connection_string)
         for name in table_name_list:
-            with TableServiceClient.from_connection_string(conn_str=self.connection_string, table_name=name) as table_client:
-                try:
-                    print(name)
-                    table_item = table_client.create_table(name)
-                    print(f"Created table {table_item.table_name}!")
-                except ResourceExistsError:            
-                    print("Table already exists")
+            try:
+                print(name)
+                table_item = table_service_client.create_table(name)
+                print(f"Created table {table_item.table_name}!")
+            except ResourceExistsError:            
+                print("Table already exists")
  
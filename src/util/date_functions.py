@@ -0,0 +1,88 @@
+"""
+Vectorized Date Utilities
+Computes days in process, overdue buckets and display dates for whole columns
+of submission dates stored as day ordinals (``date.toordinal()``, 0 = missing)
+"""
+from datetime import date
+
+import numpy as np
+
+# Day ordinal of the NumPy datetime64 epoch (1970-01-01)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Overdue buckets, matching the colors of the days-in-process badges
+BUCKET_GREEN = 0   # 15 days or less
+BUCKET_ORANGE = 1  # 16 to 30 days
+BUCKET_RED = 2     # more than 30 days
+BUCKET_COLORS = np.array(["green", "orange", "red"])
+
+
+def to_day_array(submission_days):
+    """Convert a sequence of day ordinals to an int64 array"""
+    return np.asarray(submission_days, dtype=np.int64)
+
+
+def to_datetime64(submission_days):
+    """
+    Convert day ordinals to a datetime64[D] array (missing dates become NaT)
+
+    Args:
+        submission_days: Sequence or array of day ordinals
+
+    Returns:
+        datetime64[D] array
+    """
+    days = to_day_array(submission_days)
+    dates = (days - EPOCH_ORDINAL).astype('datetime64[D]')
+    dates[days <= 0] = np.datetime64('NaT')
+    return dates
+
+
+def calculate_days_in_process(submission_days, today=None):
+    """
+    Days since submission for every row in one operation
+
+    Args:
+        submission_days: Sequence or array of day ordinals
+        today: Reference date (default: today)
+
+    Returns:
+        int64 array of days in process (0 for missing dates)
+    """
+    days = to_day_array(submission_days)
+    today_ordinal = (today or date.today()).toordinal()
+    return np.where(days > 0, today_ordinal - days, 0)
+
+
+def overdue_buckets(days_in_process):
+    """
+    Bucket days in process: BUCKET_GREEN (<= 15), BUCKET_ORANGE (<= 30) or BUCKET_RED (> 30)
+
+    Use ``BUCKET_COLORS[buckets]`` to get the color names.
+    """
+    return np.digitize(days_in_process, [16, 31])
+
+
+def format_dates(submission_days, separator='/'):
+    """
+    Format day ordinals as DD/MM/YYYY strings in one operation
+
+    Args:
+        submission_days: Sequence or array of day ordinals
+        separator: Separator between day, month and year
+
+    Returns:
+        Array of formatted dates ('' for missing dates)
+    """
+    days = to_day_array(submission_days)
+    if len(days) == 0:
+        return np.array([], dtype='U10')
+
+    # Rearrange the characters of the ISO 'YYYY-MM-DD' strings to 'DD-MM-YYYY'
+    iso = np.datetime_as_string(to_datetime64(np.where(days > 0, days, EPOCH_ORDINAL)), unit='D')
+    characters = iso.astype('U10').view('U1').reshape(len(days), 10)
+    reordered = characters[:, [8, 9, 7, 5, 6, 4, 0, 1, 2, 3]]
+    formatted = np.ascontiguousarray(reordered).view('U10').ravel()
+    if separator != '-':
+        formatted = np.char.replace(formatted, '-', separator)
+    return np.where(days > 0, formatted, '')
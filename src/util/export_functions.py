@@ -0,0 +1,158 @@
+"""
+Export Utilities
+Streams pages of table entities to CSV, JSONL or Parquet, optionally
+compressed, writing each page as it arrives so memory use does not grow
+with the number of rows.
+"""
+import csv
+import gzip
+import io
+import json
+import time
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional
+
+EXPORT_FORMATS = ['csv', 'jsonl', 'parquet']
+# gzip for CSV and JSONL; Parquet compresses its column chunks itself
+EXPORT_COMPRESSIONS = {
+    'csv': ['gzip', 'none'],
+    'jsonl': ['gzip', 'none'],
+    'parquet': ['snappy', 'zstd', 'gzip', 'none'],
+}
+
+EXPORT_MIME_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def export_file_name(base_name: str, format: str, compression: str) -> str:
+    """Returns the file name for an export, e.g. 'applications.csv.gz'."""
+    suffix = '.gz' if compression == 'gzip' and format != 'parquet' else ''
+    return f"{base_name}.{format}{suffix}"
+
+
+def export_mime_type(format: str, compression: str) -> str:
+    if compression == 'gzip' and format != 'parquet':
+        return 'application/gzip'
+    return EXPORT_MIME_TYPES[format]
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class _PageWriter:
+    """Writes pages of rows in one format"""
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class _TextPageWriter(_PageWriter):
+    """CSV or JSONL through an optional gzip stream"""
+
+    def __init__(self, output: BinaryIO, format: str, columns: List[str], compression: str):
+        self._compressed = gzip.GzipFile(fileobj=output, mode='wb') if compression == 'gzip' else None
+        self._text = io.TextIOWrapper(self._compressed or output, encoding='utf-8', newline='')
+        self._columns = columns
+        self._csv = None
+        if format == 'csv':
+            self._csv = csv.DictWriter(self._text, fieldnames=columns, extrasaction='ignore')
+            self._csv.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if self._csv:
+            self._csv.writerows(rows)
+        else:
+            self._text.writelines(
+                json.dumps({column: row.get(column) for column in self._columns}, default=_json_value) + '\n'
+                for row in rows
+            )
+
+    def close(self) -> None:
+        self._text.flush()
+        self._text.detach()  # Keep the caller's stream open
+        if self._compressed:
+            self._compressed.close()
+
+
+class _ParquetPageWriter(_PageWriter):
+    """Parquet with one row group per page"""
+
+    def __init__(self, output: BinaryIO, columns: List[str], compression: str,
+                 column_types: Optional[Dict[str, str]] = None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+        types = {'bool': pa.bool_(), 'int': pa.int64(), 'float': pa.float64()}
+        self._pa = pa
+        self._columns = columns
+        self._column_types = column_types or {}
+        self._schema = pa.schema([(column, types.get(self._column_types.get(column), pa.string())) for column in columns])
+        self._writer = pq.ParquetWriter(output, self._schema, compression=compression)
+
+    def _value(self, column: str, value: Any) -> Any:
+        if value is None or value == '':
+            return None
+        return value if column in self._column_types else str(value)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        data = {column: [self._value(column, row.get(column)) for row in rows] for column in self._columns}
+        self._writer.write_table(self._pa.Table.from_pydict(data, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def export_pages(pages: Iterable[List[Dict[str, Any]]], output: BinaryIO, format: str, columns: List[str],
+                 compression: str = 'gzip', column_types: Optional[Dict[str, str]] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Stream pages of rows to a binary output
+
+    Args:
+        pages: Iterable of row lists, e.g. from AzureHandler.iter_table_pages
+        output: Writable binary stream; left open
+        format: 'csv', 'jsonl' or 'parquet'
+        columns: Columns to write, in order
+        compression: One of EXPORT_COMPRESSIONS[format]
+        column_types: Optional Parquet column types ('bool', 'int' or 'float'); other columns are strings
+        progress: Optional callback receiving the running statistics after every page
+
+    Returns:
+        Statistics: rows, elapsed_seconds, rows_per_second
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{format}', expected one of: {', '.join(EXPORT_FORMATS)}")
+    if compression not in EXPORT_COMPRESSIONS[format]:
+        raise ValueError(f"Compression '{compression}' is not supported for {format}")
+
+    if format == 'parquet':
+        writer = _ParquetPageWriter(output, columns, None if compression == 'none' else compression, column_types)
+    else:
+        writer = _TextPageWriter(output, format, columns, compression)
+
+    stats = {'rows': 0, 'elapsed_seconds': 0.0, 'rows_per_second': 0.0}
+    started = time.perf_counter()
+    try:
+        for page in pages:
+            writer.write(page)
+            stats['rows'] += len(page)
+            stats['elapsed_seconds'] = time.perf_counter() - started
+            stats['rows_per_second'] = stats['rows'] / stats['elapsed_seconds'] if stats['elapsed_seconds'] else 0.0
+            if progress:
+                progress(dict(stats))
+    finally:
+        writer.close()
+
+    stats['elapsed_seconds'] = time.perf_counter() - started
+    stats['rows_per_second'] = stats['rows'] / stats['elapsed_seconds'] if stats['elapsed_seconds'] else 0.0
+    return stats
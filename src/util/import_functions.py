@@ -0,0 +1,146 @@
+"""
+Import Utilities
+Streams visa application records from JSONL files, CSV files or a directory of
+applicant JSON files (``res/people``) and normalizes them to the input format
+of ``VisaApplicationService.create_application``
+"""
+import csv
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _line_key(number: int) -> str:
+    """Resume key of a line or row of a file; zero-padded so keys sort like the numbers"""
+    return f"{number:012d}"
+
+
+def iter_jsonl(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (resume key, record) for every non-empty line of a JSONL file; the key is the line number"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield _line_key(line_number), json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON on line {line_number} of '{path}': {str(e)}") from e
+
+
+def iter_csv(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (resume key, record) for every CSV row; the key is the row number.
+    'true'/'false' cells become booleans and empty cells are dropped.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row_number, row in enumerate(csv.DictReader(f), start=1):
+            record = {}
+            for key, value in row.items():
+                if key is None or value is None or value == '':
+                    continue
+                lowered = value.strip().lower()
+                record[key.strip()] = True if lowered == 'true' else False if lowered == 'false' else value
+            yield _line_key(row_number), record
+
+
+def iter_people_dir(people_dir: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield (file name, record) for the applicant JSON files of a directory in file name order
+
+    The file name is the resume key, so skipping an unreadable file or adding
+    files does not shift the keys of the others.
+    """
+    for filename in sorted(name for name in os.listdir(people_dir) if name.endswith('.json')):
+        try:
+            with open(os.path.join(people_dir, filename), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable applicant file '{filename}': {str(e)}")
+            continue
+        yield filename, record
+
+
+def person_to_application_data(person: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten an applicant record (``res/people`` format) to application data
+
+    Args:
+        person: Applicant record with nested address, date and place of birth
+
+    Returns:
+        Dictionary with the keys expected by ``create_application``
+    """
+    address = person.get('address') or {}
+    place_of_birth = person.get('place_of_birth') or {}
+    date_of_birth = person.get('date_of_birth') or ''
+    if isinstance(date_of_birth, dict):
+        try:
+            date_of_birth = f"{int(date_of_birth['year']):04d}-{int(date_of_birth['month']):02d}-{int(date_of_birth['day']):02d}"
+        except (KeyError, TypeError, ValueError):
+            date_of_birth = ''
+
+    return {
+        'application_number': person.get('visa_application_number'),
+        'case_type': person.get('case_type', ''),
+        'visa_type_requested': person.get('visa_type_requested', ''),
+        'application_type': person.get('application_type', ''),
+        'submission_date': person.get('submission_date', ''),
+        'intake_location': person.get('intake_location', ''),
+        'applicant_is_minor': person.get('applicant_is_minor', False),
+        'is_urgent': person.get('urgent', False),
+        'given_name': person.get('given_names', ''),
+        'surname': person.get('surname', ''),
+        'variation_in_birth_certificate': person.get('variation_in_birth_certificate', False),
+        'gender': person.get('gender', ''),
+        'country_of_nationality': person.get('country_of_nationality', ''),
+        'street_number': address.get('street_number', ''),
+        'unit_number': address.get('unit_number', ''),
+        'postal_code': address.get('postal_code', ''),
+        'city': address.get('city', ''),
+        'country': address.get('country', ''),
+        'date_of_birth': date_of_birth,
+        'state_of_birth': place_of_birth.get('state', ''),
+        'place_of_birth': place_of_birth.get('city', ''),
+        'country_of_birth': place_of_birth.get('country', ''),
+        'residency_status_in_australia': person.get('residency_status_in_australia')
+            or person.get('residency_status_in_country_of_residence', ''),
+        'civil_status': person.get('civil_status', ''),
+        'packaged_member_of_eu': person.get('packaged_member_of_eu', False),
+        'occupation': person.get('occupation', ''),
+        'status': person.get('status', 'Draft'),
+    }
+
+
+def iter_application_data(source: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream application data from a JSONL file, a CSV file or a people directory
+
+    Applicant records (recognized by ``visa_application_number``) are flattened
+    with ``person_to_application_data``; other records are passed through.
+
+    Every record comes with a resume key (the file name in a directory, the
+    zero-padded line or row number in a file); keys increase through the
+    source, so ``VisaApplicationService.import_applications`` can checkpoint
+    on the last imported key.
+
+    Args:
+        source: Path to a .jsonl/.json-lines file, a .csv file or a directory of JSON files
+
+    Returns:
+        Iterator of (resume key, application data) pairs
+    """
+    if os.path.isdir(source):
+        records = iter_people_dir(source)
+    elif source.lower().endswith('.csv'):
+        records = iter_csv(source)
+    elif source.lower().endswith(('.jsonl', '.ndjson')):
+        records = iter_jsonl(source)
+    else:
+        raise ValueError(f"Unsupported import source '{source}': expected a directory, .jsonl or .csv file")
+
+    for key, record in records:
+        yield key, person_to_application_data(record) if 'visa_application_number' in record else record
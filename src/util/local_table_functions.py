@@ -0,0 +1,450 @@
+"""
+Local Table Storage
+SQLite-backed stand-in for Azure Table Storage with the same methods as
+AzureHandler, for offline development and benchmarks without network noise.
+Select it with TABLE_BACKEND=local (see util.table_functions).
+
+Entities live in a single SQLite table keyed by (table, PartitionKey, RowKey);
+their properties are stored as JSON. Filters support the practical OData
+subset used by the services: eq, ne, gt, ge, lt, le, and, or, not and
+parentheses over string, number, boolean and datetime'...' literals.
+Datetime property values are stored as ISO strings.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
+
+from util.table_functions import (
+    DEFAULT_PAGE_SIZE, ChunkSubmission, ResourceExistsError, ResourceModifiedError, ResourceNotFoundError,
+    batch_results, decode_continuation_token, encode_continuation_token, transaction_chunks
+)
+
+logger = logging.getLogger(__name__)
+
+# Properties stored in dedicated columns rather than in the JSON document
+_KEY_COLUMNS = {'PartitionKey': 'partition_key', 'RowKey': 'row_key', 'Timestamp': 'timestamp'}
+
+_SQL_OPERATORS = {'eq': '=', 'ne': '<>', 'gt': '>', 'ge': '>=', 'lt': '<', 'le': '<='}
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<lparen>\() | (?P<rparen>\)) |
+    (?P<string>'(?:[^']|'')*') |
+    (?P<datetime>datetime'[^']*') |
+    (?P<guid>guid'[^']*') |
+    (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?[LlDdMm]?) |
+    (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+)""", re.VERBOSE)
+
+
+class LocalEntity(dict):
+    """Entity dictionary with Table Storage style metadata (etag, timestamp)"""
+
+    def __init__(self, *args, metadata: Optional[Dict[str, Any]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metadata = metadata or {}
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._metadata
+
+
+def compile_filter(filter: str) -> Tuple[str, List[Any]]:
+    """
+    Compile an OData filter expression to a SQLite WHERE clause
+
+    Args:
+        filter: OData filter, e.g. "PartitionKey eq 'VisaApplication' and IsUrgent eq true"
+
+    Returns:
+        Tuple of (SQL expression, parameters)
+    """
+    tokens = []
+    position = 0
+    filter = filter.strip()
+    while position < len(filter):
+        match = _TOKEN.match(filter, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Unsupported filter syntax at '{filter[position:]}'")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+        while position < len(filter) and filter[position].isspace():
+            position += 1
+
+    params: List[Any] = []
+    index = 0
+
+    def peek() -> Optional[Tuple[str, str]]:
+        return tokens[index] if index < len(tokens) else None
+
+    def take() -> Tuple[str, str]:
+        nonlocal index
+        if index >= len(tokens):
+            raise ValueError(f"Unexpected end of filter '{filter}'")
+        token = tokens[index]
+        index += 1
+        return token
+
+    def is_keyword(token: Optional[Tuple[str, str]], keyword: str) -> bool:
+        return token is not None and token[0] == 'word' and token[1].lower() == keyword
+
+    def operand() -> str:
+        kind, text = take()
+        if kind == 'string':
+            params.append(text[1:-1].replace("''", "'"))
+        elif kind == 'datetime':
+            params.append(text[len("datetime'"):-1])
+        elif kind == 'guid':
+            params.append(text[len("guid'"):-1])
+        elif kind == 'number':
+            number = text.rstrip('LlDdMm')
+            params.append(float(number) if any(c in number for c in '.eE') else int(number))
+        elif kind == 'word' and text.lower() in ('true', 'false'):
+            params.append(1 if text.lower() == 'true' else 0)
+        elif kind == 'word':
+            if text in _KEY_COLUMNS:
+                return _KEY_COLUMNS[text]
+            return f"json_extract(properties, '$.\"{text}\"')"
+        else:
+            raise ValueError(f"Unexpected '{text}' in filter '{filter}'")
+        return '?'
+
+    def comparison() -> str:
+        left = operand()
+        kind, text = take()
+        if kind != 'word' or text.lower() not in _SQL_OPERATORS:
+            raise ValueError(f"Unsupported operator '{text}' in filter '{filter}'")
+        right = operand()
+        return f"{left} {_SQL_OPERATORS[text.lower()]} {right}"
+
+    def unary() -> str:
+        token = peek()
+        if is_keyword(token, 'not'):
+            take()
+            return f"NOT ({unary()})"
+        if token is not None and token[0] == 'lparen':
+            take()
+            inner = expression()
+            if take()[0] != 'rparen':
+                raise ValueError(f"Missing ')' in filter '{filter}'")
+            return f"({inner})"
+        return comparison()
+
+    def conjunction() -> str:
+        parts = [unary()]
+        while is_keyword(peek(), 'and'):
+            take()
+            parts.append(unary())
+        return ' AND '.join(parts)
+
+    def expression() -> str:
+        parts = [conjunction()]
+        while is_keyword(peek(), 'or'):
+            take()
+            parts.append(conjunction())
+        return ' OR '.join(f"({part})" for part in parts) if len(parts) > 1 else parts[0]
+
+    sql = expression()
+    if index != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[index][1]}' in filter '{filter}'")
+    return sql, params
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+
+class LocalTableHandler:
+    """Drop-in replacement for AzureHandler backed by a SQLite database file"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.connection_string = f"sqlite:///{db_path}"
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tables (name TEXT PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS entities (
+                    table_name TEXT NOT NULL,
+                    partition_key TEXT NOT NULL,
+                    row_key TEXT NOT NULL,
+                    etag TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    properties TEXT NOT NULL,
+                    PRIMARY KEY (table_name, partition_key, row_key)
+                ) WITHOUT ROWID;
+            """)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection to the database."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs a write transaction on this thread's connection. BEGIN IMMEDIATE takes
+        the write lock up front, so the existence and ETag checks of _apply and the
+        write that follows cannot interleave with another writer.
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+
+    @staticmethod
+    def _to_entity(row: Tuple[str, str, str, str, str], select: Optional[List[str]] = None) -> LocalEntity:
+        partition_key, row_key, etag, timestamp, properties = row
+        entity = LocalEntity(
+            {'PartitionKey': partition_key, 'RowKey': row_key, **json.loads(properties)},
+            metadata={'etag': etag, 'timestamp': timestamp}
+        )
+        if select:
+            return LocalEntity({name: entity.get(name) for name in select}, metadata=entity.metadata)
+        return entity
+
+    @staticmethod
+    def _new_version() -> Tuple[str, str]:
+        return f'W/"{uuid.uuid4().hex}"', datetime.now(timezone.utc).isoformat()
+
+    def _read(self, conn: sqlite3.Connection, table_name: str, partition_key: str,
+              row_key: str) -> Optional[LocalEntity]:
+        row = conn.execute(
+            "SELECT partition_key, row_key, etag, timestamp, properties FROM entities "
+            "WHERE table_name = ? AND partition_key = ? AND row_key = ?",
+            (table_name, partition_key, row_key)
+        ).fetchone()
+        return self._to_entity(row) if row else None
+
+    def _write(self, conn: sqlite3.Connection, table_name: str, entity: Dict[str, Any]) -> str:
+        properties = {key: value for key, value in entity.items() if key not in _KEY_COLUMNS}
+        etag, timestamp = self._new_version()
+        conn.execute("INSERT OR IGNORE INTO tables (name) VALUES (?)", (table_name,))
+        conn.execute(
+            "INSERT OR REPLACE INTO entities (table_name, partition_key, row_key, etag, timestamp, properties) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (table_name, entity['PartitionKey'], entity['RowKey'], etag, timestamp,
+             json.dumps(properties, default=_json_default))
+        )
+        return etag
+
+    def _apply(self, conn: sqlite3.Connection, table_name: str, operation: str,
+               entity: Dict[str, Any], options: Dict[str, Any]) -> Optional[str]:
+        """
+        Applies one write operation with Table Storage semantics inside the current
+        transaction; returns the new ETag of a written entity.
+        """
+        partition_key, row_key = entity['PartitionKey'], entity['RowKey']
+        existing = self._read(conn, table_name, partition_key, row_key)
+
+        if operation == 'create':
+            if existing is not None:
+                raise ResourceExistsError(f"Entity '{partition_key}'/'{row_key}' already exists in table '{table_name}'")
+            return self._write(conn, table_name, entity)
+        elif operation in ('upsert', 'update'):
+            if operation == 'update' and existing is None:
+                raise ResourceNotFoundError(f"Entity '{partition_key}'/'{row_key}' not found in table '{table_name}'")
+            if options.get('etag') and existing is not None and existing.metadata['etag'] != options['etag']:
+                raise ResourceModifiedError(f"Entity '{partition_key}'/'{row_key}' in table '{table_name}' was modified")
+            merge = str(getattr(options.get('mode'), 'value', options.get('mode') or 'merge')).lower() == 'merge'
+            if merge and existing is not None:
+                entity = {**existing, **entity}
+            return self._write(conn, table_name, entity)
+        elif operation == 'delete':
+            if existing is None:
+                raise ResourceNotFoundError(f"Entity '{partition_key}'/'{row_key}' not found in table '{table_name}'")
+            conn.execute(
+                "DELETE FROM entities WHERE table_name = ? AND partition_key = ? AND row_key = ?",
+                (table_name, partition_key, row_key)
+            )
+        else:
+            raise ValueError(f"Unsupported operation '{operation}'")
+
+    def retrieve_entity(self, table_name: str, partition_key: str, row_key: str,
+                        use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Retrieves an entity from the given table by partition and row key."""
+        entity = self._read(self._connection(), table_name, partition_key, row_key)
+        if entity is None:
+            logger.warning(f"Entity not found in table '{table_name}' with PartitionKey: '{partition_key}' and RowKey: '{row_key}'")
+        return entity
+
+    def retrieve_table(self, table_name: str, partition_key: Optional[str]):
+        return self.retrieve_table_items(table_name, f"PartitionKey eq '{partition_key}'")
+
+    def _query(self, table_name: str, filter: Optional[str], select: Optional[List[str]],
+               after: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> List[LocalEntity]:
+        sql = ("SELECT partition_key, row_key, etag, timestamp, properties FROM entities "
+               "WHERE table_name = ?")
+        params: List[Any] = [table_name]
+        if filter:
+            filter_sql, filter_params = compile_filter(filter)
+            sql += f" AND ({filter_sql})"
+            params.extend(filter_params)
+        if after:
+            sql += " AND (partition_key, row_key) >= (?, ?)"
+            params.extend([after['PartitionKey'], after['RowKey']])
+        sql += " ORDER BY partition_key, row_key"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self._connection().execute(sql, params).fetchall()
+        return [self._to_entity(row, select) for row in rows]
+
+    def retrieve_table_items(self, table_name: str, filter: Optional[str] = None,
+                             select: Optional[List[str]] = None):
+        """Queries entities matching an OData filter (all entities without a filter)."""
+        return self._query(table_name, filter, select)
+
+    def retrieve_table_page(self, table_name: str, filter: Optional[str] = None,
+                            select: Optional[List[str]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                            continuation_token: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Retrieves one page of entities and the opaque continuation token of the next page."""
+        after = decode_continuation_token(continuation_token)
+        # Keys are needed for the continuation token even when not selected
+        rows = self._query(table_name, filter, None, after, page_size + 1)
+        next_token = None
+        if len(rows) > page_size:
+            next_row = rows.pop()
+            next_token = encode_continuation_token({'PartitionKey': next_row['PartitionKey'], 'RowKey': next_row['RowKey']})
+        if select:
+            rows = [LocalEntity({name: row.get(name) for name in select}, metadata=row.metadata) for row in rows]
+        return rows, next_token
+
+    def iter_table_pages(self, table_name: str, filter: Optional[str] = None,
+                         select: Optional[List[str]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                         continuation_token: Optional[str] = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Yields (page, continuation token of the next page) until the last page."""
+        while True:
+            page, continuation_token = self.retrieve_table_page(table_name, filter, select, page_size, continuation_token)
+            yield page, continuation_token
+            if continuation_token is None:
+                return
+
+    def retrieve_entities_many(self, table_name: str, keys: Iterable[Tuple[str, str]],
+                               max_concurrency: int = 25) -> List[Optional[Dict[str, Any]]]:
+        """Retrieves many entities; returns them in key order, None for missing ones."""
+        conn = self._connection()
+        return [self._read(conn, table_name, partition_key, row_key) for partition_key, row_key in keys]
+
+    def query_many(self, table_name: str, filters: Iterable[str], select: Optional[List[str]] = None,
+                   max_concurrency: int = 25) -> List[List[Dict[str, Any]]]:
+        """Runs several OData filter queries; returns one result list per filter."""
+        return [self._query(table_name, filter, select) for filter in filters]
+
+    def _log_success(self, operation: str, entity: Dict[str, Any]) -> None:
+        """Logs success messages for insert/update operations."""
+        logger.info(f"{operation} entity with PartitionKey: {entity['PartitionKey']} and RowKey: {entity['RowKey']}")
+
+    def insert_entity(self, table_name: str, entity: Dict[str, Any]) -> bool:
+        """Inserts a new entity into the given table. Returns False when it already exists."""
+        try:
+            with self._transaction() as conn:
+                self._apply(conn, table_name, 'create', entity, {})
+            self._log_success("Inserted", entity)
+            return True
+        except ResourceExistsError:
+            logger.warning(f"Entity already exists in table '{table_name}' with PartitionKey: {entity['PartitionKey']} and RowKey: {entity['RowKey']}")
+            return False
+
+    def update_entity(self, table_name: str, entity: Dict[str, Any], etag: Optional[str] = None) -> Optional[str]:
+        """
+        Updates (merges) an existing entity in the given table; with an ETag only if the
+        entity is unchanged, raising ResourceModifiedError otherwise. Returns the new ETag.
+        """
+        with self._transaction() as conn:
+            new_etag = self._apply(conn, table_name, 'update', entity, {'mode': 'merge', 'etag': etag})
+        self._log_success("Updated", entity)
+        return new_etag
+
+    def delete_entity(self, partition_key: str, table_name: str, row_key: str, etag: Optional[str] = None):
+        """Deletes an entity; with an ETag only if it is unchanged, raising ResourceModifiedError otherwise."""
+        with self._transaction() as conn:
+            existing = self._read(conn, table_name, partition_key, row_key) if etag else None
+            if existing is not None and existing.metadata['etag'] != etag:
+                raise ResourceModifiedError(f"Entity '{partition_key}'/'{row_key}' in table '{table_name}' was modified")
+            conn.execute(
+                "DELETE FROM entities WHERE table_name = ? AND partition_key = ? AND row_key = ?",
+                (table_name, partition_key, row_key)
+            )
+
+    def upsert_entities(self, table_name: str, entities: Iterable[Dict[str, Any]],
+                        mode: Any = 'merge', max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Inserts or updates entities in transactional batches."""
+        return self._submit_batched(table_name, [('upsert', entity, {'mode': mode}) for entity in entities], max_workers)
+
+    def insert_entities(self, table_name: str, entities: Iterable[Dict[str, Any]],
+                        max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Inserts new entities in transactional batches; existing entities are reported as failed."""
+        return self._submit_batched(table_name, [('create', entity, {}) for entity in entities], max_workers)
+
+    def update_entities(self, table_name: str, entities: Iterable[Dict[str, Any]],
+                        mode: Any = 'merge', max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Updates existing entities in transactional batches; missing entities are reported as failed."""
+        return self._submit_batched(table_name, [('update', entity, {'mode': mode}) for entity in entities], max_workers)
+
+    def delete_entities(self, table_name: str, keys: Iterable[Dict[str, Any]],
+                        max_workers: int = 4) -> List[Dict[str, Any]]:
+        """Deletes entities (dicts with at least PartitionKey and RowKey) in transactional batches."""
+        operations = [('delete', {'PartitionKey': key['PartitionKey'], 'RowKey': key['RowKey']}, {}) for key in keys]
+        return self._submit_batched(table_name, operations, max_workers)
+
+    def _submit_batched(self, table_name: str, operations: List[Tuple[str, Dict[str, Any], Dict[str, Any]]],
+                        max_workers: int) -> List[Dict[str, Any]]:
+        """
+        Applies operations in per-partition SQLite transactions of at most 100
+        operations with the same results and rollback semantics as AzureHandler.
+        """
+        results = batch_results(operations)
+
+        def submit(chunk: List[int]) -> None:
+            submission = ChunkSubmission(results, chunk)
+            while submission.pending:
+                failed = None
+                try:
+                    with self._transaction() as conn:
+                        for position, (operation, entity, options) in enumerate(submission.batch(operations)):
+                            failed = position
+                            self._apply(conn, table_name, operation, entity, options)
+                except (ResourceExistsError, ResourceNotFoundError, ResourceModifiedError) as e:
+                    submission.failed(e, failed)
+                except Exception as e:
+                    logger.error(f"Transaction of {len(submission.remaining)} operations on table '{table_name}' failed: {str(e)}")
+                    submission.failed(e)
+                else:
+                    submission.succeeded()
+
+        chunks = transaction_chunks(operations)
+        if chunks:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+                list(executor.map(submit, chunks))
+        return results
+
+    def check_table_exists(self, table_name: str) -> bool:
+        """Checks if a table exists in the local database."""
+        row = self._connection().execute("SELECT 1 FROM tables WHERE name = ?", (table_name,)).fetchone()
+        return row is not None
+
+    def create_tables(self, table_name_list):
+        with self._connection() as conn:
+            for name in table_name_list:
+                conn.execute("INSERT OR IGNORE INTO tables (name) VALUES (?)", (name,))
+                logger.info(f"Created table {name}")
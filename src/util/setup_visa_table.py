@@ -8,34 +8,36 @@ src_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(src_dir))
 
 from dotenv import load_dotenv
-from util.azure_functions import AzureHandler
+from util.table_functions import create_table_handler, use_local_tables
+from services.application_indexes import index_tables
 
 def setup_visa_applications_table():
-    """Create the VisaApplications table if it doesn't exist"""
+    """Create the VisaApplications tables if they don't exist"""
     # Load environment variables
     load_dotenv()
     
     connection_string = os.getenv("AZURE_CONNECTION_STRING")
-    if not connection_string:
+    if not connection_string and not use_local_tables():
         print("Error: AZURE_CONNECTION_STRING not found in environment variables")
         return False
     
     try:
         # Initialize Azure handler
-        azure_handler = AzureHandler(connection_string)
+        azure_handler = create_table_handler(connection_string)
         
-        # Table name
-        table_name = "VisaApplications"
-        
-        # Check if table exists
-        if azure_handler.check_table_exists(table_name):
-            print(f"✅ Table '{table_name}' already exists")
-            return True
-        
-        # Create the table
-        print(f"Creating table '{table_name}'...")
-        azure_handler.create_tables([table_name])
-        print(f"✅ Table '{table_name}' created successfully!")
+        # Applications table, the locator table used by partition strategies, the change feed,
+        # the pipeline counters, the archive and the index tables
+        for table_name in ["VisaApplications", "VisaApplicationsKeys", "VisaApplicationsChanges",
+                           "VisaApplicationsAggregates", "VisaApplicationsArchive", *index_tables("VisaApplications")]:
+            # Check if table exists
+            if azure_handler.check_table_exists(table_name):
+                print(f"✅ Table '{table_name}' already exists")
+                continue
+            
+            # Create the table
+            print(f"Creating table '{table_name}'...")
+            azure_handler.create_tables([table_name])
+            print(f"✅ Table '{table_name}' created successfully!")
         
         return True
         
@@ -0,0 +1,124 @@
+"""
+Table Storage Utilities
+Backend-independent helpers shared by AzureHandler, AsyncAzureHandler and
+LocalTableHandler, and the factory that selects the configured backend
+"""
+import base64
+import json
+import os
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError, ResourceModifiedError
+except ImportError:  # The local backend does not need the Azure SDK
+    class ResourceNotFoundError(Exception):
+        """Entity or table not found"""
+
+    class ResourceExistsError(Exception):
+        """Entity already exists"""
+
+    class ResourceModifiedError(Exception):
+        """Entity changed since it was read (If-Match precondition failed)"""
+
+# Azure Table Storage accepts at most 100 operations per transaction
+MAX_TRANSACTION_OPERATIONS = 100
+
+# Default number of entities per page of a paged query
+DEFAULT_PAGE_SIZE = 100
+
+
+def encode_continuation_token(token: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encodes a Table Storage continuation token as an opaque, URL-safe string."""
+    if not token:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(token, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_continuation_token(token: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decodes a token produced by encode_continuation_token."""
+    if not token:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid continuation token: {str(e)}") from e
+
+
+def transaction_chunks(operations: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[List[int]]:
+    """Groups operation indexes by PartitionKey (a transaction may only touch one partition) in chunks of at most 100."""
+    partitions: Dict[str, List[int]] = {}
+    for index, (_, entity, _) in enumerate(operations):
+        partitions.setdefault(entity['PartitionKey'], []).append(index)
+    return [
+        indexes[start:start + MAX_TRANSACTION_OPERATIONS]
+        for indexes in partitions.values()
+        for start in range(0, len(indexes), MAX_TRANSACTION_OPERATIONS)
+    ]
+
+
+def batch_results(operations: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """One result per operation, in input order: {'PartitionKey', 'RowKey', 'success', 'error'}"""
+    return [
+        {'PartitionKey': entity['PartitionKey'], 'RowKey': entity['RowKey'], 'success': False, 'error': None}
+        for _, entity, _ in operations
+    ]
+
+
+class ChunkSubmission:
+    """
+    Retry state of one transaction chunk (from ``transaction_chunks``), shared by the
+    handlers' batch writes. A failed transaction is rolled back as a whole: when the
+    failing operation is known it is failed alone and the rest is submitted again,
+    otherwise every remaining operation fails.
+    """
+
+    def __init__(self, results: List[Dict[str, Any]], chunk: List[int]):
+        self.results = results
+        self.remaining = list(chunk)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.remaining)
+
+    def batch(self, operations: List[Tuple[str, Dict[str, Any], Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """The operations to submit in the next attempt"""
+        return [operations[index] for index in self.remaining]
+
+    def succeeded(self) -> None:
+        for index in self.remaining:
+            self.results[index]['success'] = True
+        self.remaining = []
+
+    def failed(self, error: Exception, position: Optional[int] = None) -> None:
+        """Records a rolled-back attempt; ``position`` is the index of the failing operation in the batch"""
+        if position is None or not 0 <= position < len(self.remaining):
+            for index in self.remaining:
+                self.results[index]['error'] = str(error)
+            self.remaining = []
+        else:
+            self.results[self.remaining.pop(position)]['error'] = str(error)
+
+
+def use_local_tables() -> bool:
+    """Whether the SQLite stand-in is configured instead of Azure Table Storage (TABLE_BACKEND=local)"""
+    return os.getenv("TABLE_BACKEND", "azure").strip().lower() == "local"
+
+
+def create_table_handler(connection_string: Optional[str] = None):
+    """
+    Create the configured table handler
+
+    Returns a LocalTableHandler on the SQLite database LOCAL_TABLE_DB (default:
+    data/local_tables.db) when TABLE_BACKEND=local, otherwise an AzureHandler
+    for the connection string.
+    """
+    if use_local_tables():
+        from util.local_table_functions import LocalTableHandler
+        db_path = os.getenv("LOCAL_TABLE_DB")
+        if not db_path:
+            from config.settings import Settings
+            db_path = os.path.join(Settings().DATA_DIR, 'local_tables.db')
+        return LocalTableHandler(db_path)
+
+    from util.azure_functions import AzureHandler
+    return AzureHandler(connection_string)
@@ -93,7 +93,8 @@ def test_visa_application_service():
             'status': 'Submitted',
             'occupation': 'Employed'
         }
-        visa_service.update_application(app_number, update_data)
+        # Based on the application retrieved above: a single conditional save
+        visa_service.update_application(app_number, update_data, original=retrieved_app)
         print(f"✅ Application updated successfully!\n")
         
         # Test 4: Verify the update
@@ -0,0 +1,86 @@
+import pytest
+
+from services import change_feed
+from services.partition_strategy import SinglePartitionStrategy
+from services.visa_application_service import VisaApplicationService
+from util.local_table_functions import LocalTableHandler
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return LocalTableHandler(str(tmp_path / 'tables.db'))
+
+
+@pytest.fixture
+def service(handler):
+    service = VisaApplicationService(handler, partition_strategy=SinglePartitionStrategy())
+    service.create_application({'application_number': 'A1', 'surname': 'Smith', 'status': 'Completed',
+                                'is_urgent': True})
+    service.create_application({'application_number': 'A2', 'surname': 'Jones', 'status': 'Submitted'})
+    return service
+
+
+def table_numbers(handler, table_name):
+    return sorted(row['RowKey'] for row in handler.retrieve_table_items(table_name) or [])
+
+
+def totals(service):
+    return {status: counts['Total'] for status, counts in service.pipeline_counters().items() if counts['Total']}
+
+
+def index_rows(handler, table_name):
+    return sorted((row['PartitionKey'], row['RowKey']) for row in handler.retrieve_table_items(table_name) or [])
+
+
+def test_archive_moves_terminal_applications_out_of_the_hot_table(service, handler):
+    stats = service.archive_applications(older_than_days=0)
+
+    assert stats == {'scanned': 1, 'archived': 1, 'failed': 0}
+    assert table_numbers(handler, 'VisaApplications') == ['A2']
+    assert table_numbers(handler, 'VisaApplicationsArchive') == ['A1']
+    assert totals(service) == {'Submitted': 1}
+    assert service.pipeline_counters().get('Completed', {}).get('Urgent', 0) == 0
+
+    archived = service.get_application('A1')
+    assert archived['Status'] == 'Completed' and archived['ArchivedAt']
+    # Index rows stay, so archived applications are still found by their properties
+    assert index_rows(handler, 'VisaApplicationsByStatus') == [('Completed', 'A1'), ('Submitted', 'A2')]
+    assert [application['RowKey'] for application in service.find_by_surname('smith')] == ['A1']
+
+
+def test_archive_dry_run_and_cutoff_leave_the_tables_alone(service, handler):
+    assert service.archive_applications(older_than_days=0, dry_run=True)['archived'] == 1
+    assert service.archive_applications(older_than_days=30)['scanned'] == 0
+    assert table_numbers(handler, 'VisaApplications') == ['A1', 'A2']
+    assert table_numbers(handler, 'VisaApplicationsArchive') == []
+
+
+def test_restore_round_trip(service, handler, monkeypatch):
+    monkeypatch.setattr(change_feed, 'CHANGE_FEED_SETTLE_SECONDS', 0)
+    service.archive_applications(older_than_days=0)
+
+    assert service.restore_application('A1') is True
+    assert service.restore_application('A1') is False
+
+    assert table_numbers(handler, 'VisaApplications') == ['A1', 'A2']
+    assert table_numbers(handler, 'VisaApplicationsArchive') == []
+    restored = service.get_application('A1')
+    assert 'ArchivedAt' not in restored
+    assert (restored['Surname'], restored['IsUrgent']) == ('Smith', True)
+    assert totals(service) == {'Completed': 1, 'Submitted': 1}
+    assert service.pipeline_counters()['Completed']['Urgent'] == 1
+    assert index_rows(handler, 'VisaApplicationsByStatus') == [('Completed', 'A1'), ('Submitted', 'A2')]
+    operations = [change['operation'] for change in service.changes_since(None)[0]]
+    assert operations[-2:] == ['archive', 'restore']
+
+
+def test_update_restores_an_archived_application(service, handler):
+    service.archive_applications(older_than_days=0)
+
+    service.update_application('A1', {'status': 'Submitted'})
+
+    assert table_numbers(handler, 'VisaApplications') == ['A1', 'A2']
+    assert table_numbers(handler, 'VisaApplicationsArchive') == []
+    assert 'ArchivedAt' not in service.get_application('A1')
+    assert totals(service) == {'Submitted': 2}
+    assert index_rows(handler, 'VisaApplicationsByStatus') == [('Submitted', 'A1'), ('Submitted', 'A2')]
@@ -0,0 +1,82 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from services.visa_application_service import VisaApplicationService
+from util.export_functions import export_file_name, export_mime_type
+from util.local_table_functions import LocalTableHandler
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'tables.db')
+
+
+@pytest.fixture
+def service(db_path, monkeypatch):
+    monkeypatch.delenv('VISA_PARTITION_STRATEGY', raising=False)
+    service = VisaApplicationService(LocalTableHandler(db_path))
+    service.create_application({'application_number': 'A1', 'surname': 'Smith', 'status': 'Submitted', 'is_urgent': True})
+    service.create_application({'application_number': 'A2', 'surname': 'Jones', 'status': 'Draft'})
+    return service
+
+
+def test_export_csv_gzip(service):
+    output = io.BytesIO()
+
+    stats = service.export_applications(output, 'csv', 'gzip')
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(output.getvalue()).decode('utf-8'))))
+    assert stats['rows'] == 2
+    assert [(row['ApplicationNumber'], row['Surname'], row['IsUrgent']) for row in rows] == [
+        ('A1', 'Smith', 'True'), ('A2', 'Jones', 'False')
+    ]
+
+
+def test_export_jsonl_with_projection_and_filter(service):
+    output = io.BytesIO()
+    pages = []
+
+    service.export_applications(output, 'jsonl', 'none', select=['ApplicationNumber', 'Status'],
+                                filter_query="Status eq 'Submitted'", progress=pages.append)
+
+    assert [json.loads(line) for line in output.getvalue().splitlines()] == [
+        {'ApplicationNumber': 'A1', 'Status': 'Submitted'}
+    ]
+    assert pages[-1]['rows'] == 1
+
+
+def test_export_rejects_unsupported_compression(service):
+    with pytest.raises(ValueError):
+        service.export_applications(io.BytesIO(), 'csv', 'snappy')
+
+
+def test_export_file_names():
+    assert export_file_name('applications', 'csv', 'gzip') == 'applications.csv.gz'
+    assert export_file_name('applications', 'parquet', 'gzip') == 'applications.parquet'
+    assert export_mime_type('jsonl', 'none') == 'application/x-ndjson'
+
+
+def export_page(db_path):
+    from app_pages.admin.application_export import application_export_section
+    from util.local_table_functions import LocalTableHandler
+
+    application_export_section(LocalTableHandler(db_path))
+
+
+def test_export_page_download(service, db_path):
+    AppTest = pytest.importorskip('streamlit.testing.v1').AppTest
+    app = AppTest.from_function(export_page, kwargs={'db_path': db_path})
+    app.run()
+    app.selectbox(key='export_format').set_value('jsonl').run()
+    app.selectbox(key='export_compression').set_value('none').run()
+
+    app.button[0].click().run()
+
+    assert not app.exception
+    assert not app.error
+    assert 'Exported 2 applications' in app.success[0].value
+    assert any(element.type == 'download_button' for element in app.main)
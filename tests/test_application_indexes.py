@@ -0,0 +1,93 @@
+import pytest
+
+from services.application_indexes import application_indexes, index_tables
+from services.partition_strategy import SinglePartitionStrategy
+from services.visa_application_service import VisaApplicationService
+from util.local_table_functions import LocalTableHandler
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return LocalTableHandler(str(tmp_path / 'tables.db'))
+
+
+@pytest.fixture
+def service(handler):
+    return VisaApplicationService(handler, partition_strategy=SinglePartitionStrategy())
+
+
+def index_rows(handler, table_name):
+    return sorted((row['PartitionKey'], row['RowKey']) for row in handler.retrieve_table_items(table_name) or [])
+
+
+def numbers(applications):
+    return [application['RowKey'] for application in applications]
+
+
+def test_index_tables_are_named_after_the_applications_table():
+    assert index_tables('VisaApplications') == [
+        'VisaApplicationsByStatus', 'VisaApplicationsBySurname', 'VisaApplicationsBySubmissionDay'
+    ]
+    indexes = application_indexes('Staging')
+    assert indexes['surname'].entry({'RowKey': 'A1', 'Surname': " O'Brien Smith "}) == {
+        'PartitionKey': "o'brien-smith", 'RowKey': 'A1'
+    }
+    assert indexes['submission_day'].key({'SubmissionDate': '2025-10-22T09:30:00'}) == '2025-10-22'
+    assert indexes['submission_day'].entry({'RowKey': 'A1', 'SubmissionDate': 'soon'}) is None
+
+
+def test_create_writes_the_index_rows(service, handler):
+    service.create_application({'application_number': 'A1', 'surname': 'Smith', 'status': 'Draft',
+                                'submission_date': '2025-10-22'})
+
+    assert index_rows(handler, 'VisaApplicationsByStatus') == [('Draft', 'A1')]
+    assert index_rows(handler, 'VisaApplicationsBySurname') == [('smith', 'A1')]
+    assert index_rows(handler, 'VisaApplicationsBySubmissionDay') == [('2025-10-22', 'A1')]
+    assert numbers(service.find_by_status('Draft')) == ['A1']
+    assert numbers(service.find_by_surname('SMI', prefix=True)) == ['A1']
+    assert numbers(service.find_by_submission_day('2025-10-01', '2025-10-31')) == ['A1']
+
+
+def test_update_moves_the_index_rows(service, handler):
+    service.create_application({'application_number': 'A1', 'surname': 'Smith', 'status': 'Draft'})
+    service.create_application({'application_number': 'A2', 'surname': 'Jones', 'status': 'Draft'})
+
+    service.update_application('A1', {'status': 'Submitted', 'surname': 'Smyth'})
+    service.update_statuses({'A2': 'Submitted'})
+
+    assert index_rows(handler, 'VisaApplicationsByStatus') == [('Submitted', 'A1'), ('Submitted', 'A2')]
+    assert index_rows(handler, 'VisaApplicationsBySurname') == [('jones', 'A2'), ('smyth', 'A1')]
+    assert service.find_by_status('Draft') == []
+    assert numbers(service.find_by_status('Submitted')) == ['A1', 'A2']
+
+
+def test_delete_removes_the_index_rows(service, handler):
+    service.create_application({'application_number': 'A1', 'surname': 'Smith', 'status': 'Draft'})
+
+    service.delete_application('A1')
+
+    assert index_rows(handler, 'VisaApplicationsByStatus') == []
+    assert index_rows(handler, 'VisaApplicationsBySurname') == []
+
+
+def test_services_of_different_tables_do_not_share_indexes(handler):
+    hot = VisaApplicationService(handler, 'VisaApplications', SinglePartitionStrategy())
+    staging = VisaApplicationService(handler, 'Staging', SinglePartitionStrategy())
+    hot.create_application({'application_number': 'A1', 'status': 'Draft'})
+    staging.create_application({'application_number': 'B1', 'status': 'Draft'})
+
+    assert numbers(hot.find_by_status('Draft')) == ['A1']
+    assert numbers(staging.find_by_status('Draft')) == ['B1']
+    assert index_rows(handler, 'VisaApplicationsByStatus') == [('Draft', 'A1')]
+
+
+def test_lookups_drop_stale_rows_and_rebuild_repairs(service, handler):
+    service.create_application({'application_number': 'A1', 'surname': 'Smith', 'status': 'Draft'})
+    handler.upsert_entities('VisaApplicationsByStatus', [{'PartitionKey': 'Draft', 'RowKey': 'Gone'}])
+    handler.delete_entities('VisaApplicationsBySurname', [{'PartitionKey': 'smith', 'RowKey': 'A1'}])
+
+    assert numbers(service.find_by_status('Draft')) == ['A1']
+    assert index_rows(handler, 'VisaApplicationsByStatus') == [('Draft', 'A1')]
+
+    assert service.rebuild_indexes()['scanned'] == 1
+    assert numbers(service.find_by_surname('smith')) == ['A1']
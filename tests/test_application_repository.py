@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+from services.application_repository import ApplicationRepository
+from services.record_cache import RecordCache
+
+
+def write_person(people_dir, application_number, submission_date, **fields):
+    path = people_dir / f"{application_number}.json"
+    path.write_text(json.dumps({
+        'visa_application_number': application_number,
+        'submission_date': submission_date,
+        **fields,
+    }))
+    # Distinct mtimes, so a refresh sees rewritten files as changed
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    return path
+
+
+@pytest.fixture
+def people_dir(tmp_path):
+    people_dir = tmp_path / 'people'
+    people_dir.mkdir()
+    for number, submission_date in [
+        ('AUTO005', '2025-03-01'),
+        ('AUTO001', '2025-01-15'),
+        ('AUTO004', '2025-01-15'),
+        ('AUTO002', '2025-02-01'),
+        ('AUTO003', '2025-01-15'),
+        ('AUTO006', ''),
+        ('AUTO007', '2024-12-31'),
+    ]:
+        write_person(people_dir, number, submission_date)
+    return people_dir
+
+
+@pytest.fixture
+def repository(people_dir, tmp_path):
+    return ApplicationRepository(str(people_dir), str(tmp_path / 'people.snapshot'), RecordCache(1024 * 1024))
+
+
+def all_pages(repository, limit):
+    numbers, pages, cursor = [], 0, None
+    while True:
+        page, cursor = repository.list_by_submission(cursor, limit)
+        numbers.extend(record['visa_application_number'] for record in page)
+        pages += 1
+        if cursor is None:
+            return numbers, pages
+
+
+def test_pages_are_ordered_by_submission_date_then_number(repository):
+    numbers, pages = all_pages(repository, limit=2)
+    assert numbers == ['AUTO007', 'AUTO001', 'AUTO003', 'AUTO004', 'AUTO002', 'AUTO005']
+    assert pages == 3
+
+
+def test_last_full_page_has_no_cursor(repository):
+    page, cursor = repository.list_by_submission(limit=6)
+    assert len(page) == 6
+    assert cursor is None
+
+
+def test_cursor_continues_after_ties(repository):
+    page, cursor = repository.list_by_submission(limit=2)
+    assert [record['visa_application_number'] for record in page] == ['AUTO007', 'AUTO001']
+
+    page, _ = repository.list_by_submission(cursor, limit=2, summaries=True)
+    assert [summary['visa_application_number'] for summary in page] == ['AUTO003', 'AUTO004']
+    assert page[0]['submission_date'] == '2025-01-15'
+
+
+def test_pages_merge_changes_since_the_snapshot(repository, people_dir):
+    page, cursor = repository.list_by_submission(limit=3)
+
+    write_person(people_dir, 'AUTO008', '2025-01-20')
+    write_person(people_dir, 'AUTO002', '2024-06-01')
+    os.remove(people_dir / 'AUTO004.json')
+    repository.refresh(full_scan=True)
+
+    # A cursor taken before the refresh stays valid
+    rest, _ = repository.list_by_submission(cursor, limit=10)
+    assert [record['visa_application_number'] for record in rest] == ['AUTO008', 'AUTO005']
+
+    numbers, _ = all_pages(repository, limit=2)
+    assert numbers == ['AUTO002', 'AUTO007', 'AUTO001', 'AUTO003', 'AUTO008', 'AUTO005']
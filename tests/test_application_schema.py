@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from services.application_schema import (
+    APPLICATION_SCHEMA, BOOLEAN_PROPERTIES, UPDATABLE_FIELDS, ApplicationRecord, data_to_entity, data_to_patch,
+    entity_from_json, entity_to_data, entity_to_json,
+)
+from services.partition_strategy import SinglePartitionStrategy
+from services.visa_application_service import VisaApplicationService
+from util.local_table_functions import LocalTableHandler
+
+DATA = {
+    'application_number': 'A1', 'surname': "O'Brien", 'given_name': 'Ann', 'status': 'Submitted',
+    'is_urgent': True, 'submission_date': '2025-10-22', 'date_of_birth': '1990-01-31',
+}
+
+
+def test_data_entity_round_trip():
+    entity = data_to_entity(DATA)
+
+    assert entity['Surname'] == "O'Brien" and entity['IsUrgent'] is True
+    assert entity['ApplicantIsMinor'] is False and entity['CreatedBy'] == 'system'
+    assert list(entity) == [field.property for field in APPLICATION_SCHEMA]
+    assert entity_to_data(entity) == {field.key: DATA.get(field.key, field.default) for field in APPLICATION_SCHEMA}
+    assert entity_from_json(entity_to_json(entity)) == entity
+    assert 'IsUrgent' in BOOLEAN_PROPERTIES
+
+
+def test_patches_only_map_present_updatable_fields():
+    assert data_to_patch({'status': 'Completed', 'created_by': 'someone', 'unknown': 1}) == {'Status': 'Completed'}
+    assert 'application_number' not in UPDATABLE_FIELDS
+
+
+def test_record_entity_round_trip():
+    record = ApplicationRecord(partition_key='P', etag='W/"1"', **DATA)
+
+    entity = record.to_entity()
+    assert (entity['PartitionKey'], entity['RowKey'], entity['Surname']) == ('P', 'A1', "O'Brien")
+    loaded = ApplicationRecord.from_entity(entity)
+    assert loaded == record
+    assert loaded.partition_key == 'P' and loaded.etag is None
+    assert ApplicationRecord.from_entity({'PartitionKey': 'P', 'RowKey': 'A2'}).application_number == 'A2'
+
+
+def test_record_json_round_trip():
+    record = ApplicationRecord(**DATA)
+
+    assert json.loads(record.to_json())['surname'] == "O'Brien"
+    assert ApplicationRecord.from_json(record.to_json()) == record
+    assert ApplicationRecord.from_data(dict(DATA, unknown='ignored')) == record
+    assert record.to_data(['status', 'is_urgent']) == {'status': 'Submitted', 'is_urgent': True}
+    assert 'PartitionKey' not in record.to_entity()
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(TypeError, match='Unknown application fields: nickname'):
+        ApplicationRecord(application_number='A1', nickname='Annie')
+    with pytest.raises(AttributeError):
+        ApplicationRecord().nickname = 'Annie'
+
+
+def test_record_of_a_stored_application_keeps_its_etag(tmp_path):
+    service = VisaApplicationService(LocalTableHandler(str(tmp_path / 'tables.db')),
+                                     partition_strategy=SinglePartitionStrategy())
+    service.create_application(DATA)
+
+    record = service.get_application_record('A1')
+
+    assert record.etag == service.get_application('A1').metadata['etag']
+    assert (record.surname, record.is_urgent, record.status) == ("O'Brien", True, 'Submitted')
+    assert record.created_at and record.partition_key
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('azure.data.tables.aio')
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+from util import azure_async_functions
+from util.azure_async_functions import AsyncAzureHandler
+
+CONNECTION_STRING = 'DefaultEndpointsProtocol=https;AccountName=visacheck;AccountKey=a2V5;EndpointSuffix=core.windows.net'
+TABLE = 'VisaApplications'
+
+
+class FakeTableClient:
+    """In-memory stand-in for azure.data.tables.aio.TableClient that tracks concurrent requests"""
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+
+    async def _request(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+    async def get_entity(self, partition_key, row_key):
+        await self._request()
+        if (partition_key, row_key) not in self.entities:
+            raise ResourceNotFoundError('Not found')
+        return dict(self.entities[(partition_key, row_key)])
+
+    async def create_entity(self, entity):
+        await self._request()
+        key = (entity['PartitionKey'], entity['RowKey'])
+        if key in self.entities:
+            raise ResourceExistsError('Exists')
+        self.entities[key] = dict(entity)
+
+    def query_entities(self, filter, select=None):
+        # Filters in these tests are "Status eq '<status>'"
+        status = filter.split("'")[1]
+
+        async def matches():
+            await self._request()
+            for entity in list(self.entities.values()):
+                if entity.get('Status') == status:
+                    yield {name: entity.get(name) for name in select} if select else dict(entity)
+
+        return matches()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeServiceClient:
+    """Stand-in for azure.data.tables.aio.TableServiceClient sharing one entity store across tables"""
+
+    def __init__(self):
+        self.entities = {}
+        self.table_clients = {}
+        self.closed = False
+
+    def get_table_client(self, table_name):
+        return self.table_clients.setdefault(table_name, FakeTableClient(self.entities))
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def service_client(monkeypatch):
+    service = FakeServiceClient()
+    for number in range(10):
+        service.entities[('VisaApplication', f'A{number}')] = {
+            'PartitionKey': 'VisaApplication', 'RowKey': f'A{number}', 'Status': 'Draft' if number % 2 else 'Submitted'
+        }
+    monkeypatch.setattr(azure_async_functions.TableServiceClient, 'from_connection_string', lambda _: service)
+    return service
+
+
+def test_construction():
+    handler = AsyncAzureHandler(CONNECTION_STRING, max_concurrency=5)
+    assert handler.account == 'visacheck'
+    assert handler.max_concurrency == 5
+    assert handler.table_clients == {}
+
+
+def test_retrieve_entities_many_fans_out_within_the_concurrency_limit(service_client):
+    keys = [('VisaApplication', f'A{number}') for number in (3, 1, 4, 1, 5, 9, 2, 6)] + [('VisaApplication', 'Missing')]
+
+    async def fetch():
+        async with AsyncAzureHandler(CONNECTION_STRING, max_concurrency=3) as handler:
+            return await handler.retrieve_entities_many(TABLE, keys)
+
+    entities = asyncio.run(fetch())
+
+    assert [entity and entity['RowKey'] for entity in entities] == ['A3', 'A1', 'A4', 'A1', 'A5', 'A9', 'A2', 'A6', None]
+    assert service_client.table_clients[TABLE].max_in_flight == 3
+    assert service_client.table_clients[TABLE].closed and service_client.closed
+
+
+def test_query_many_returns_one_result_list_per_filter(service_client):
+    async def query():
+        async with AsyncAzureHandler(CONNECTION_STRING) as handler:
+            return await handler.query_many(TABLE, ["Status eq 'Draft'", "Status eq 'Submitted'", "Status eq 'Approved'"],
+                                            select=['RowKey'])
+
+    draft, submitted, approved = asyncio.run(query())
+
+    assert sorted(entity['RowKey'] for entity in draft) == ['A1', 'A3', 'A5', 'A7', 'A9']
+    assert sorted(entity['RowKey'] for entity in submitted) == ['A0', 'A2', 'A4', 'A6', 'A8']
+    assert approved == []
+    assert service_client.table_clients[TABLE].max_in_flight == 3
+
+
+def test_insert_entity_reports_existing_entity(service_client):
+    async def insert():
+        async with AsyncAzureHandler(CONNECTION_STRING) as handler:
+            return [
+                await handler.insert_entity(TABLE, {'PartitionKey': 'VisaApplication', 'RowKey': 'B1'}),
+                await handler.insert_entity(TABLE, {'PartitionKey': 'VisaApplication', 'RowKey': 'A1'}),
+            ]
+
+    assert asyncio.run(insert()) == [True, False]
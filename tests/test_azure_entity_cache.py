@@ -0,0 +1,90 @@
+import pytest
+
+from util.azure_entity_cache import EntityCache, account_name
+
+CONNECTION_STRING = 'DefaultEndpointsProtocol=https;AccountName=visacheck;AccountKey=a2V5;EndpointSuffix=core.windows.net'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_account_name():
+    assert account_name(CONNECTION_STRING) == 'visacheck'
+    sas = 'TableEndpoint=https://visacheck.table.core.windows.net;SharedAccessSignature=sv=2024'
+    assert account_name(sas) == account_name(sas) != account_name(sas + 'x')
+
+
+def test_entries_are_fresh_for_the_ttl():
+    clock = Clock()
+    cache = EntityCache(30, 1024 * 1024, clock)
+    key = ('visacheck', 'VisaApplications', 'VisaApplication', 'A1')
+
+    returned = cache.store(key, {'RowKey': 'A1', 'Status': 'Draft'})
+    returned['Status'] = 'Changed by the caller'
+
+    assert cache.lookup(key) == ({'RowKey': 'A1', 'Status': 'Draft'}, True)
+    clock.now = 31
+    assert cache.lookup(key) == ({'RowKey': 'A1', 'Status': 'Draft'}, False)
+
+
+def test_invalidation_is_scoped_to_the_account():
+    cache = EntityCache(30, 1024 * 1024)
+    cache.store(('one', 'T', 'P', 'A1'), {'RowKey': 'A1'})
+    cache.store(('two', 'T', 'P', 'A1'), {'RowKey': 'A1'})
+    cache.store(('two', 'T', 'P', 'A2'), {'RowKey': 'A2'})
+
+    cache.invalidate('one', 'T', 'P', 'A1')
+    assert cache.lookup(('one', 'T', 'P', 'A1')) is None
+    assert cache.lookup(('two', 'T', 'P', 'A1')) is not None
+
+    cache.invalidate_table('two', 'T')
+    assert cache.lookup(('two', 'T', 'P', 'A2')) is None
+
+
+class FakeEntity(dict):
+    def __init__(self, etag, **properties):
+        super().__init__(**properties)
+        self.metadata = {'etag': etag}
+
+
+class FakeTableClient:
+    def __init__(self, entity):
+        self.entity = entity
+        self.reads = []
+
+    def get_entity(self, partition_key, row_key, **kwargs):
+        self.reads.append(kwargs)
+        return FakeEntity(self.entity.metadata['etag'], **self.entity)
+
+
+def test_stale_entries_are_read_again_and_compared(monkeypatch):
+    pytest.importorskip('azure.data.tables')
+    pytest.importorskip('streamlit')
+    from util import azure_functions
+
+    clock = Clock()
+    cache = EntityCache(30, 1024 * 1024, clock)
+    table_client = FakeTableClient(FakeEntity('W/"1"', PartitionKey='P', RowKey='A1', Status='Draft'))
+    monkeypatch.setattr(azure_functions, 'get_entity_cache', lambda: cache)
+    monkeypatch.setattr(azure_functions.AzureHandler, '_get_table_client', lambda self, table_name: table_client)
+    handler = azure_functions.AzureHandler(CONNECTION_STRING)
+
+    handler.retrieve_entity('T', 'P', 'A1')
+    handler.retrieve_entity('T', 'P', 'A1')
+    assert len(table_client.reads) == 1
+
+    clock.now = 31
+    handler.retrieve_entity('T', 'P', 'A1')
+    table_client.entity = FakeEntity('W/"2"', PartitionKey='P', RowKey='A1', Status='Submitted')
+    clock.now = 62
+    assert handler.retrieve_entity('T', 'P', 'A1')['Status'] == 'Submitted'
+
+    # Every stale read is a plain full read
+    assert table_client.reads == [{}, {}, {}]
+    stats = cache.stats()
+    assert (stats['stale_reads'], stats['unchanged']) == (2, 1)
@@ -0,0 +1,78 @@
+import pytest
+
+from services import change_feed
+from services.change_feed import CHANGE_CREATE, CHANGE_UPDATE, ChangeFeed
+from services.partition_strategy import SinglePartitionStrategy
+from services.visa_application_service import VisaApplicationService
+from util.local_table_functions import LocalTableHandler
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return LocalTableHandler(str(tmp_path / 'tables.db'))
+
+
+@pytest.fixture
+def service(handler, monkeypatch):
+    monkeypatch.setattr(change_feed, 'CHANGE_FEED_SETTLE_SECONDS', 0)
+    return VisaApplicationService(handler, partition_strategy=SinglePartitionStrategy())
+
+
+def operations(changes):
+    return [(change['operation'], change['application_number']) for change in changes]
+
+
+def test_changes_are_read_in_commit_order_across_pages(service):
+    service.create_application({'application_number': 'A1', 'surname': 'Smith', 'status': 'Draft'})
+    service.create_application({'application_number': 'A2', 'surname': 'Jones', 'status': 'Draft'})
+    service.update_application('A1', {'status': 'Submitted'})
+
+    first, cursor = service.changes_since(None, limit=2)
+    second, cursor = service.changes_since(cursor, limit=2)
+    third, last_cursor = service.changes_since(cursor, limit=2)
+
+    assert operations(first) == [('create', 'A1'), ('create', 'A2')]
+    assert operations(second) == [('update', 'A1')]
+    assert second[0]['changes']['Status'] == 'Submitted'
+    assert second[0]['previous'] == {'Status': 'Draft'}
+    assert third == [] and last_cursor == cursor
+
+
+def test_latest_cursor_skips_earlier_changes(service):
+    service.create_application({'application_number': 'A1', 'status': 'Draft'})
+    cursor = service.latest_change_cursor()
+    service.update_application('A1', {'status': 'Submitted'})
+
+    changes, _ = service.changes_since(cursor)
+
+    assert operations(changes) == [('update', 'A1')]
+
+
+def test_changes_within_the_settle_window_are_held_back(service, monkeypatch):
+    service.create_application({'application_number': 'A1', 'status': 'Draft'})
+    monkeypatch.setattr(change_feed, 'CHANGE_FEED_SETTLE_SECONDS', 60)
+
+    changes, cursor = service.changes_since(None)
+    assert changes == [] and cursor == ''
+
+    monkeypatch.setattr(change_feed, 'CHANGE_FEED_SETTLE_SECONDS', 0)
+    changes, cursor = service.changes_since(cursor)
+    assert operations(changes) == [('create', 'A1')]
+
+
+def test_cursor_reads_on_into_later_hour_partitions(handler, monkeypatch):
+    monkeypatch.setattr(change_feed, 'CHANGE_FEED_SETTLE_SECONDS', 0)
+    feed = ChangeFeed(handler, 'Changes')
+    hour_ns = 3600 * 10 ** 9
+    ids = iter([f"{ns:020d}-0000000{i}" for i, ns in enumerate([hour_ns * 400000, hour_ns * 400000 + 1,
+                                                                  hour_ns * 400001 + 5])])
+    monkeypatch.setattr(change_feed, 'new_change_id', lambda: next(ids))
+    feed.append(CHANGE_CREATE, [{'PartitionKey': 'P', 'RowKey': 'A1'}, {'PartitionKey': 'P', 'RowKey': 'A2'}])
+    feed.append(CHANGE_UPDATE, [{'PartitionKey': 'P', 'RowKey': 'A1', 'Status': 'Submitted'}])
+
+    changes, cursor = feed.changes_since(None, limit=1)
+    changes, cursor = feed.changes_since(cursor)
+
+    assert operations(changes) == [('create', 'A2'), ('update', 'A1')]
+    assert [change['partition'] for change in changes] == ['P', 'P']
+    assert changes[1]['timestamp'].hour != changes[0]['timestamp'].hour
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from services.partition_strategy import SinglePartitionStrategy
+from services.visa_application_service import VisaApplicationService
+from util.import_functions import iter_application_data
+from util.local_table_functions import LocalTableHandler
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return LocalTableHandler(str(tmp_path / 'tables.db'))
+
+
+@pytest.fixture
+def service(handler):
+    return VisaApplicationService(handler, partition_strategy=SinglePartitionStrategy())
+
+
+def write_person(people_dir, filename, number, surname='Smith', status='Draft'):
+    with open(people_dir / filename, 'w', encoding='utf-8') as f:
+        json.dump({'visa_application_number': number, 'surname': surname, 'status': status}, f)
+
+
+def index_rows(handler, table_name):
+    return sorted((row['PartitionKey'], row['RowKey']) for row in handler.retrieve_table_items(table_name) or [])
+
+
+def stored_numbers(handler):
+    return sorted(row['RowKey'] for row in handler.retrieve_table_items('VisaApplications') or [])
+
+
+def test_records_are_keyed_by_file_name_and_line_number(tmp_path):
+    people_dir = tmp_path / 'people'
+    people_dir.mkdir()
+    write_person(people_dir, 'b.json', 'A2')
+    write_person(people_dir, 'a.json', 'A1')
+    (people_dir / 'c.json').write_text('{not json', encoding='utf-8')
+    jsonl = tmp_path / 'applications.jsonl'
+    jsonl.write_text('{"application_number": "A1"}\n\n{"application_number": "A2"}\n', encoding='utf-8')
+
+    assert [(key, data['application_number']) for key, data in iter_application_data(str(people_dir))] == [
+        ('a.json', 'A1'), ('b.json', 'A2')
+    ]
+    assert [key for key, _ in iter_application_data(str(jsonl))] == ['000000000001', '000000000003']
+
+
+def test_checkpoint_records_the_last_imported_key(service, tmp_path):
+    checkpoint_path = str(tmp_path / 'import.checkpoint')
+    records = [('a.json', {'application_number': 'A1'}), ('b.json', {}), ('c.json', {'application_number': 'A3'})]
+
+    stats = service.import_applications(records, batch_size=1, checkpoint_path=checkpoint_path)
+
+    assert (stats['imported'], stats['skipped'], stats['resumed_after']) == (2, 1, None)
+    with open(checkpoint_path, encoding='utf-8') as f:
+        assert json.load(f)['after'] == 'c.json'
+
+
+def test_resume_is_not_shifted_by_skipped_or_added_files(service, handler, tmp_path):
+    people_dir = tmp_path / 'people'
+    people_dir.mkdir()
+    checkpoint_path = str(tmp_path / 'import.checkpoint')
+    write_person(people_dir, 'a.json', 'A1')
+    write_person(people_dir, 'c.json', 'A3')
+    service.import_applications(iter_application_data(str(people_dir)), checkpoint_path=checkpoint_path)
+
+    # An imported file becomes unreadable and a new one is added; counting records
+    # would skip d.json, since only two files are readable now
+    (people_dir / 'a.json').write_text('{not json', encoding='utf-8')
+    write_person(people_dir, 'd.json', 'A4')
+    stats = service.import_applications(iter_application_data(str(people_dir)), checkpoint_path=checkpoint_path)
+
+    assert stats['resumed_after'] == 'c.json'
+    assert stats['imported'] == 1
+    assert stored_numbers(handler) == ['A1', 'A3', 'A4']
+
+
+def test_reimport_replaces_the_index_rows_of_changed_values(service, handler):
+    service.import_applications([('1', {'application_number': 'A1', 'surname': 'Smith', 'status': 'Draft'}),
+                                 ('2', {'application_number': 'A2', 'surname': 'Jones', 'status': 'Draft'})])
+
+    service.import_applications([('1', {'application_number': 'A1', 'surname': 'Smyth', 'status': 'Submitted'}),
+                                 ('2', {'application_number': 'A2', 'surname': 'Jones', 'status': 'Draft'})])
+
+    assert index_rows(handler, 'VisaApplicationsByStatus') == [('Draft', 'A2'), ('Submitted', 'A1')]
+    assert index_rows(handler, 'VisaApplicationsBySurname') == [('jones', 'A2'), ('smyth', 'A1')]
+    assert service.find_by_status('Draft')[0]['RowKey'] == 'A2'
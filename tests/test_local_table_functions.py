@@ -0,0 +1,109 @@
+import pytest
+
+from util.local_table_functions import LocalTableHandler, compile_filter
+from util.table_functions import ResourceModifiedError, ResourceNotFoundError
+
+TABLE = 'VisaApplications'
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return LocalTableHandler(str(tmp_path / 'tables.db'))
+
+
+def entity(row_key='A1', **properties):
+    return {'PartitionKey': 'VisaApplication', 'RowKey': row_key, **properties}
+
+
+@pytest.mark.parametrize('filter, sql, params', [
+    ("PartitionKey eq 'VisaApplication'", 'partition_key = ?', ['VisaApplication']),
+    ("Status ne 'Draft'", "json_extract(properties, '$.\"Status\"') <> ?", ['Draft']),
+    ("Score gt 5", "json_extract(properties, '$.\"Score\"') > ?", [5]),
+    ("Score le 2.5", "json_extract(properties, '$.\"Score\"') <= ?", [2.5]),
+    ("IsUrgent eq true", "json_extract(properties, '$.\"IsUrgent\"') = ?", [1]),
+    ("Surname eq 'O''Brien'", "json_extract(properties, '$.\"Surname\"') = ?", ["O'Brien"]),
+    ("Timestamp ge datetime'2025-01-01T00:00:00Z'", 'timestamp >= ?', ['2025-01-01T00:00:00Z']),
+    ("RowKey ge 'A' and RowKey lt 'B'", 'row_key >= ? AND row_key < ?', ['A', 'B']),
+    ("RowKey eq 'A' or RowKey eq 'B'", '(row_key = ?) OR (row_key = ?)', ['A', 'B']),
+    ("not (RowKey eq 'A' or IsUrgent eq false)", 'NOT (((row_key = ?) OR (json_extract(properties, \'$."IsUrgent"\') = ?)))', ['A', 0]),
+])
+def test_compile_filter(filter, sql, params):
+    assert compile_filter(filter) == (sql, params)
+
+
+@pytest.mark.parametrize('filter', [
+    "RowKey eq",
+    "RowKey like 'A'",
+    "(RowKey eq 'A'",
+    "RowKey eq 'A' 'B'",
+    "RowKey eq 'A' ; drop",
+])
+def test_compile_filter_rejects_unsupported_syntax(filter):
+    with pytest.raises(ValueError):
+        compile_filter(filter)
+
+
+def test_filters_match_table_storage_semantics(handler):
+    handler.upsert_entities(TABLE, [
+        entity('A1', Status='Draft', IsUrgent=True),
+        entity('A2', Status='Submitted', IsUrgent=False),
+        entity('B1', Status='Submitted', IsUrgent=True),
+    ])
+
+    def row_keys(filter):
+        return sorted(e['RowKey'] for e in handler.retrieve_table_items(TABLE, filter=filter))
+
+    assert row_keys("Status eq 'Submitted' and IsUrgent eq true") == ['B1']
+    assert row_keys("RowKey lt 'B' and not (Status eq 'Draft')") == ['A2']
+    assert row_keys("Status eq 'Draft' or RowKey ge 'B'") == ['A1', 'B1']
+
+
+def test_insert_entity_reports_existing_entity(handler):
+    assert handler.insert_entity(TABLE, entity(Status='Draft'))
+    assert not handler.insert_entity(TABLE, entity(Status='Submitted'))
+    assert handler.retrieve_entity(TABLE, 'VisaApplication', 'A1')['Status'] == 'Draft'
+
+
+def test_update_entity_with_current_etag(handler):
+    handler.insert_entity(TABLE, entity(Status='Draft', Surname='Smith'))
+    etag = handler.retrieve_entity(TABLE, 'VisaApplication', 'A1').metadata['etag']
+
+    new_etag = handler.update_entity(TABLE, entity(Status='Submitted'), etag=etag)
+
+    stored = handler.retrieve_entity(TABLE, 'VisaApplication', 'A1')
+    assert new_etag != etag
+    assert stored.metadata['etag'] == new_etag
+    # Updates merge into the stored entity
+    assert (stored['Status'], stored['Surname']) == ('Submitted', 'Smith')
+
+
+def test_update_entity_with_stale_etag(handler):
+    handler.insert_entity(TABLE, entity(Status='Draft'))
+    etag = handler.retrieve_entity(TABLE, 'VisaApplication', 'A1').metadata['etag']
+    handler.update_entity(TABLE, entity(Status='Submitted'), etag=etag)
+
+    with pytest.raises(ResourceModifiedError):
+        handler.update_entity(TABLE, entity(Status='Rejected'), etag=etag)
+    assert handler.retrieve_entity(TABLE, 'VisaApplication', 'A1')['Status'] == 'Submitted'
+
+
+def test_update_entity_without_etag_is_unconditional(handler):
+    handler.insert_entity(TABLE, entity(Status='Draft'))
+    handler.update_entity(TABLE, entity(Status='Submitted'))
+    handler.update_entity(TABLE, entity(Status='Approved'))
+    assert handler.retrieve_entity(TABLE, 'VisaApplication', 'A1')['Status'] == 'Approved'
+
+
+def test_update_entity_missing(handler):
+    with pytest.raises(ResourceNotFoundError):
+        handler.update_entity(TABLE, entity(Status='Submitted'))
+
+
+def test_batch_reports_failed_operations(handler):
+    handler.insert_entity(TABLE, entity('A2', Status='Draft'))
+
+    results = handler.insert_entities(TABLE, [entity('A1'), entity('A2'), entity('A3')])
+
+    assert [(r['RowKey'], r['success']) for r in results] == [('A1', True), ('A2', False), ('A3', True)]
+    assert 'already exists' in results[1]['error']
+    assert handler.retrieve_entity(TABLE, 'VisaApplication', 'A2')['Status'] == 'Draft'
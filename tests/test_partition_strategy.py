@@ -0,0 +1,67 @@
+import pytest
+
+from services.partition_strategy import (
+    DEFAULT_PARTITION, IntakeMonthPartitionStrategy, SinglePartitionStrategy, get_partition_strategy, sanitize_key
+)
+from services.visa_application_service import ApplicationExistsError, VisaApplicationService
+from util.local_table_functions import LocalTableHandler
+
+
+def test_sanitize_key():
+    assert sanitize_key(' Chennai FO/North#1 ') == 'Chennai-FO-North-1'
+
+
+@pytest.mark.parametrize('entity, partition_key', [
+    ({'IntakeLocation': 'Chennai FO', 'SubmissionDate': '2025-10-22'}, 'Chennai-FO_2025-10'),
+    ({'IntakeLocation': 'Chennai FO', 'SubmissionDate': ''}, 'Chennai-FO_Undated'),
+    ({'IntakeLocation': '', 'SubmissionDate': '2025-10-22T09:00:00'}, 'Unknown_2025-10'),
+])
+def test_intake_month_partition_key(entity, partition_key):
+    assert IntakeMonthPartitionStrategy().partition_key(entity) == partition_key
+
+
+def test_get_partition_strategy(monkeypatch):
+    monkeypatch.delenv('VISA_PARTITION_STRATEGY', raising=False)
+    assert isinstance(get_partition_strategy(), SinglePartitionStrategy)
+    assert get_partition_strategy().partition_key({}) == DEFAULT_PARTITION
+
+    monkeypatch.setenv('VISA_PARTITION_STRATEGY', 'Intake_Month')
+    assert isinstance(get_partition_strategy(), IntakeMonthPartitionStrategy)
+
+    with pytest.raises(ValueError):
+        get_partition_strategy('by_colour')
+
+
+@pytest.fixture
+def service(tmp_path):
+    return VisaApplicationService(LocalTableHandler(str(tmp_path / 'tables.db')),
+                                  partition_strategy=IntakeMonthPartitionStrategy())
+
+
+def test_applications_are_located_across_partitions(service):
+    service.create_application({'application_number': 'A1', 'intake_location': 'Chennai FO', 'submission_date': '2025-10-22'})
+    service.create_application({'application_number': 'A2', 'intake_location': 'Delhi FO', 'submission_date': '2025-11-02'})
+
+    assert service.get_application('A1')['PartitionKey'] == 'Chennai-FO_2025-10'
+    assert service.get_application('A2')['PartitionKey'] == 'Delhi-FO_2025-11'
+    assert sorted(service.partitions()) == ['Chennai-FO_2025-10', 'Delhi-FO_2025-11']
+    assert sorted(entity['RowKey'] for entity in service.list_applications()) == ['A1', 'A2']
+
+
+def test_update_moves_application_to_its_new_partition(service):
+    service.create_application({'application_number': 'A1', 'intake_location': 'Chennai FO', 'submission_date': '2025-10-22'})
+
+    service.update_application('A1', {'submission_date': '2025-12-01'})
+
+    assert service.get_application('A1')['PartitionKey'] == 'Chennai-FO_2025-12'
+    assert [entity['RowKey'] for entity in service.list_applications()] == ['A1']
+
+
+def test_duplicate_create_keeps_the_claimed_partition(service):
+    service.create_application({'application_number': 'A1', 'intake_location': 'Chennai FO', 'submission_date': '2025-10-22'})
+
+    with pytest.raises(ApplicationExistsError):
+        service.create_application({'application_number': 'A1', 'intake_location': 'Delhi FO', 'submission_date': '2025-11-02'})
+
+    assert service.get_application('A1')['PartitionKey'] == 'Chennai-FO_2025-10'
+    assert [entity['RowKey'] for entity in service.list_applications()] == ['A1']
@@ -0,0 +1,116 @@
+from datetime import date, timedelta
+
+import pytest
+
+from services.pipeline_counters import COUNTER_FIELDS, application_counts, transition_deltas
+from services.visa_application_service import ApplicationExistsError, VisaApplicationService
+from util.local_table_functions import LocalTableHandler
+
+TODAY = date.today()
+
+
+def application(status, urgent=False, submitted=None):
+    return {'Status': status, 'IsUrgent': urgent, 'SubmissionDate': submitted.isoformat() if submitted else ''}
+
+
+def test_application_counts():
+    submitted = date(2025, 1, 1)
+    status, counts = application_counts(application('Submitted', True, submitted), today=date(2025, 3, 1))
+    assert status == 'Submitted'
+    assert counts == {'Total': 1, 'Urgent': 1, 'Overdue': 1, 'Dated': 1, 'SubmissionDaySum': submitted.toordinal()}
+
+
+def test_application_counts_without_submission_date():
+    _, counts = application_counts({'Status': 'Draft', 'SubmissionDate': 'not a date'})
+    assert counts == {'Total': 1, 'Urgent': 0, 'Overdue': 0, 'Dated': 0, 'SubmissionDaySum': 0}
+
+
+def test_transition_deltas_of_status_change():
+    before = application('Submitted', urgent=True, submitted=TODAY)
+    after = dict(before, Status='Approved')
+
+    deltas = transition_deltas([(before, after)])
+
+    day = TODAY.toordinal()
+    assert deltas == {
+        'Submitted': {'Total': -1, 'Urgent': -1, 'Overdue': 0, 'Dated': -1, 'SubmissionDaySum': -day},
+        'Approved': {'Total': 1, 'Urgent': 1, 'Overdue': 0, 'Dated': 1, 'SubmissionDaySum': day},
+    }
+
+
+def test_transition_deltas_of_create_and_delete():
+    created = application('Draft')
+    deleted = application('Rejected', urgent=True)
+
+    deltas = transition_deltas([(None, created), (deleted, None)])
+
+    assert deltas['Draft'] == dict(dict.fromkeys(COUNTER_FIELDS, 0), Total=1)
+    assert deltas['Rejected'] == dict(dict.fromkeys(COUNTER_FIELDS, 0), Total=-1, Urgent=-1)
+
+
+def test_transition_deltas_drop_unchanged_statuses():
+    entity = application('Submitted', submitted=TODAY)
+    # Editing a field the counters do not depend on
+    assert transition_deltas([(entity, dict(entity, Surname='Smith'))]) == {}
+    # Two transitions cancelling out
+    moved = dict(entity, Status='Approved')
+    assert transition_deltas([(entity, moved), (moved, entity)]) == {}
+
+
+def test_transition_deltas_leave_overdue_to_reconcile():
+    overdue = application('Submitted', submitted=TODAY - timedelta(days=45))
+
+    deltas = transition_deltas([(overdue, dict(overdue, Status='Approved'))])
+
+    assert (deltas['Submitted']['Total'], deltas['Submitted']['Overdue']) == (-1, 0)
+    assert (deltas['Approved']['Total'], deltas['Approved']['Overdue']) == (1, 0)
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.delenv('VISA_PARTITION_STRATEGY', raising=False)
+    return VisaApplicationService(LocalTableHandler(str(tmp_path / 'tables.db')))
+
+
+def totals(service):
+    return {status: fields['Total'] for status, fields in service.pipeline_counters().items() if fields['Total']}
+
+
+def test_counters_follow_application_writes(service):
+    service.create_application({'application_number': 'A1', 'status': 'Draft'})
+    service.create_application({'application_number': 'A2', 'status': 'Draft', 'is_urgent': True})
+    assert totals(service) == {'Draft': 2}
+
+    service.update_application('A1', {'status': 'Submitted'})
+    service.update_statuses({'A2': 'Submitted'})
+    assert totals(service) == {'Submitted': 2}
+    assert service.pipeline_counters()['Submitted']['Urgent'] == 1
+
+    service.delete_application('A1')
+    assert totals(service) == {'Submitted': 1}
+
+
+def test_duplicate_create_does_not_count_twice(service):
+    service.create_application({'application_number': 'A1', 'status': 'Draft'})
+
+    with pytest.raises(ApplicationExistsError):
+        service.create_application({'application_number': 'A1', 'status': 'Submitted'})
+
+    assert totals(service) == {'Draft': 1}
+    assert service.get_application('A1')['Status'] == 'Draft'
+
+
+def test_reconcile_sets_overdue(service):
+    submitted = (TODAY - timedelta(days=45)).isoformat()
+    service.create_application({'application_number': 'A1', 'status': 'Submitted', 'submission_date': submitted})
+    service.create_application({'application_number': 'A2', 'status': 'Submitted', 'submission_date': TODAY.isoformat()})
+    service.update_statuses({'A1': 'Approved'})
+    assert all(fields['Overdue'] == 0 for fields in service.pipeline_counters().values())
+
+    stats = service.reconcile_counters()
+
+    assert stats['scanned'] == 2
+    assert stats['drift'] == {'Approved': dict(dict.fromkeys(COUNTER_FIELDS, 0), Overdue=1)}
+    counters = service.pipeline_counters()
+    assert (counters['Approved']['Overdue'], counters['Submitted']['Overdue']) == (1, 0)
+    assert service.reconcile_counters()['drift'] == {}
@@ -0,0 +1,52 @@
+import pytest
+
+from util.local_table_functions import LocalTableHandler
+from util.table_functions import decode_continuation_token, encode_continuation_token, transaction_chunks
+
+TABLE = 'VisaApplications'
+
+
+def test_continuation_token_round_trip():
+    token = {'PartitionKey': 'Chennai-FO_2025-10', 'RowKey': 'AUTO/001'}
+    encoded = encode_continuation_token(token)
+    assert '/' not in encoded and '+' not in encoded
+    assert decode_continuation_token(encoded) == token
+
+
+def test_empty_continuation_token():
+    assert encode_continuation_token(None) is None
+    assert encode_continuation_token({}) is None
+    assert decode_continuation_token(None) is None
+    assert decode_continuation_token('') is None
+
+
+def test_invalid_continuation_token():
+    with pytest.raises(ValueError):
+        decode_continuation_token('not a token')
+
+
+def test_transaction_chunks_group_by_partition():
+    operations = [('upsert', {'PartitionKey': 'P1' if i % 3 else 'P2', 'RowKey': str(i)}, {}) for i in range(250)]
+
+    chunks = transaction_chunks(operations)
+
+    assert sorted(index for chunk in chunks for index in chunk) == list(range(250))
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(len({operations[index][1]['PartitionKey'] for index in chunk}) == 1 for chunk in chunks)
+
+
+def test_pages_follow_continuation_tokens(tmp_path):
+    handler = LocalTableHandler(str(tmp_path / 'tables.db'))
+    handler.upsert_entities(TABLE, [
+        {'PartitionKey': partition_key, 'RowKey': f'{number:03d}', 'Status': 'Draft'}
+        for partition_key in ('P1', 'P2') for number in range(5)
+    ])
+
+    pages = list(handler.iter_table_pages(TABLE, select=['Status'], page_size=4))
+
+    assert [len(page) for page, _ in pages] == [4, 4, 2]
+    assert pages[-1][1] is None
+    assert all(list(entity) == ['Status'] for page, _ in pages for entity in page)
+
+    page, _ = handler.retrieve_table_page(TABLE, page_size=4, continuation_token=pages[0][1])
+    assert [(e['PartitionKey'], e['RowKey']) for e in page] == [('P1', '004'), ('P2', '000'), ('P2', '001'), ('P2', '002')]
@@ -0,0 +1,112 @@
+import pytest
+
+from services.partition_strategy import IntakeMonthPartitionStrategy, SinglePartitionStrategy
+from services.visa_application_service import ApplicationConflictError, VisaApplicationService
+from util.local_table_functions import LocalTableHandler
+
+
+class CountingHandler(LocalTableHandler):
+    """LocalTableHandler counting the point reads of the applications table"""
+
+    reads = 0
+
+    def retrieve_entity(self, table_name, partition_key, row_key, use_cache=True):
+        if table_name == 'VisaApplications':
+            self.reads += 1
+        return super().retrieve_entity(table_name, partition_key, row_key, use_cache)
+
+
+@pytest.fixture
+def handler(tmp_path):
+    return CountingHandler(str(tmp_path / 'tables.db'))
+
+
+@pytest.fixture
+def service(handler):
+    service = VisaApplicationService(handler, partition_strategy=SinglePartitionStrategy())
+    service.create_application({'application_number': 'A1', 'surname': 'Smith', 'status': 'Draft'})
+    return service
+
+
+def test_update_with_original_does_not_read_first(service, handler):
+    original = service.get_application('A1')
+    handler.reads = 0
+
+    etag = service.update_application('A1', {'status': 'Submitted'}, original=original)
+
+    assert handler.reads == 0
+    updated = service.get_application('A1')
+    assert updated['Status'] == 'Submitted'
+    assert updated.metadata['etag'] == etag
+
+
+def test_update_with_record_original(service, handler):
+    record = service.get_application_record('A1')
+    record.status = 'Submitted'
+    handler.reads = 0
+
+    service.update_application('A1', record, original=service.get_application_record('A1'))
+
+    assert handler.reads == 1  # get_application_record for the original only
+    assert service.get_application('A1')['Status'] == 'Submitted'
+
+
+def test_update_without_original_reads_the_base(service, handler):
+    handler.reads = 0
+    service.update_application('A1', {'status': 'Submitted'})
+    assert handler.reads == 1
+
+
+def test_stale_original_is_merged_with_other_fields(service):
+    original = service.get_application('A1')
+    service.update_application('A1', {'occupation': 'Engineer'})
+
+    service.update_application('A1', {'status': 'Submitted'}, original=original)
+
+    updated = service.get_application('A1')
+    assert (updated['Status'], updated['Occupation']) == ('Submitted', 'Engineer')
+
+
+def test_stale_original_conflicts_on_the_same_field(service):
+    original = service.get_application('A1')
+    service.update_application('A1', {'status': 'Submitted'})
+
+    with pytest.raises(ApplicationConflictError) as error:
+        service.update_application('A1', {'status': 'Withdrawn'}, original=original)
+
+    assert error.value.fields == ['Status']
+    assert service.get_application('A1')['Status'] == 'Submitted'
+
+
+def test_unchanged_patch_is_not_written(service):
+    original = service.get_application('A1')
+    assert service.update_application('A1', {'surname': 'Smith'}, original=original) == original.metadata['etag']
+
+
+def test_partition_move_does_not_overwrite_a_concurrent_save(handler):
+    service = VisaApplicationService(handler, partition_strategy=IntakeMonthPartitionStrategy())
+    service.create_application({'application_number': 'A1', 'intake_location': 'Chennai FO',
+                                'submission_date': '2025-10-22', 'surname': 'Smith'})
+    original = service.get_application('A1')
+    service.update_application('A1', {'surname': 'Smyth'})
+
+    service.update_application('A1', {'submission_date': '2025-12-01'}, original=original)
+
+    moved = service.get_application('A1')
+    assert (moved['PartitionKey'], moved['Surname']) == ('Chennai-FO_2025-12', 'Smyth')
+    assert [entity['RowKey'] for entity in service.list_applications()] == ['A1']
+
+
+def test_partition_move_conflicts_on_the_same_field(handler):
+    service = VisaApplicationService(handler, partition_strategy=IntakeMonthPartitionStrategy())
+    service.create_application({'application_number': 'A1', 'intake_location': 'Chennai FO',
+                                'submission_date': '2025-10-22'})
+    original = service.get_application('A1')
+    service.update_application('A1', {'submission_date': '2025-11-05'})
+
+    with pytest.raises(ApplicationConflictError):
+        service.update_application('A1', {'submission_date': '2025-12-01'}, original=original)
+
+    current = service.get_application('A1')
+    assert (current['PartitionKey'], current['SubmissionDate']) == ('Chennai-FO_2025-11', '2025-11-05')
+    assert [entity['RowKey'] for entity in service.list_applications()] == ['A1']